@@ -1,67 +1,737 @@
 # -*- coding: utf-8 -*-
-import os, json, glob, shlex, subprocess, threading, sys, traceback
-import customtkinter as ctk
-import tkinter as tk  # <-- ใช้ตั้ง iconphoto/iconbitmap
-from tkinter import filedialog, messagebox
-from queue import Queue
+import os, re, json, glob, shlex, signal, atexit, subprocess, threading, sys, traceback, time, random, hashlib
+import tempfile
+import math, mmap, struct, bisect, sqlite3
+from array import array
+from calendar import timegm
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, wait as futures_wait, FIRST_COMPLETED
+_T_START = time.perf_counter()  # fallback ของ process_age_ms() บน OS ที่อ่านเวลาสร้าง process ไม่ได้
 
 # --- crash logger ---
 def _excepthook(exctype, value, tb):
-    with open("launcher_error.log", "w", encoding="utf-8") as f:
+    with open("launcher_error.log", "a", encoding="utf-8") as f:  # ต่อท้าย ไม่ทับ crash ครั้งก่อน
+        f.write(f"===== {time.strftime('%Y-%m-%d %H:%M:%S')} =====\n")
         traceback.print_exception(exctype, value, tb, file=f)
+    if sys.stderr is not None:  # CLI/console เห็น traceback ด้วย (exe แบบ windowed ไม่มี stderr)
+        sys.__excepthook__(exctype, value, tb)
 sys.excepthook = _excepthook
 
 # ===================== Config =====================
 CONFIG_FILE = "ue_gitaware_launcher_config.json"
+BUILD_CACHE_FILE = "ue_gitaware_build_cache.json"  # fingerprint index ของ build inputs
+STATUS_SNAPSHOT_FILE = "ue_gitaware_status_snapshot.json"  # ผล git check ล่าสุดต่อ .uproject (แสดงทันทีตอนเปิด)
 CHECK_INTERVAL_MS = 60000  # auto-check Git interval (ms)
+WATCH_POLL_MS = 2000       # stat-poll interval for .git/HEAD, refs, packed-refs, FETCH_HEAD
+CHECK_MAX_BACKOFF_MS = 15 * 60 * 1000  # cap for retry backoff after failed checks
+LOG_FLUSH_MS = 33          # log sink flush rate (~30 fps)
+LOG_MAX_LINES = 20000      # max lines kept in the log widget
+DASHBOARD_WORKERS = 4      # จำนวน repo ที่เช็คพร้อมกันในโหมด multi-project
+DASHBOARD_TIMEOUT_S = 120  # timeout ต่อ repo
+CMD_TIMEOUT_S = 120        # timeout ของคำสั่ง git ทั่วไป (local)
+GIT_NET_TIMEOUT_S = 60     # timeout ของ ls-remote
+GIT_NET_IDLE_S = 300       # fetch/pull/push ไม่มี output นานเท่านี้ = ค้าง
+UBT_IDLE_S = 1800          # UBT ไม่มี output นานเท่านี้ = ค้าง (link ใหญ่ ๆ เงียบได้นาน)
+KILL_GRACE_S = 3.0         # รอหลัง SIGTERM ก่อน SIGKILL ทั้ง process tree
+COMMIT_CACHE_FILE = "ue_gitaware_commit_cache.jsonl"  # commit ที่ parse แล้ว (append-only, key = SHA)
+COMMIT_PAGE_SIZE = 200     # commit ต่อหน้าใน commit browser
+LOG_DIR = "launcher_logs"  # log ทุก session (git/UBT output) แบบหมุนไฟล์
+LOG_FILE_MAX_BYTES = 64 * 1024 * 1024  # ขนาดสูงสุดต่อไฟล์ก่อนหมุนไปไฟล์ถัดไป
+LOG_MAX_FILES = 40         # เก็บไฟล์ log ล่าสุดไม่เกินเท่านี้ (ไฟล์เก่าสุดถูกลบ)
+LOG_INDEX_STRIDE = 256     # .idx เก็บ byte offset ทุก ๆ N บรรทัด
+LOG_SEARCH_LIMIT = 2000    # จำนวนบรรทัดที่เจอสูงสุดต่อการค้นหา
+HISTORY_DB = "launcher_history.sqlite3"  # ประวัติเวลาแต่ละ check/open run
+HISTORY_WINDOW = 10        # จำนวน run ก่อนหน้าที่ใช้เป็น baseline ตอนหา regression
+HISTORY_THRESHOLD = 0.25   # ช้ากว่า median ของ baseline เกินสัดส่วนนี้ = regression
+HISTORY_WATCH = ("build", "generate", "launch", "total",  # stage ที่ตรวจ regression
+                 "asset_registry", "shaders", "map_load")  # phase ของ editor startup
+BUILD_TIMING_DIR = "build_timings"  # histogram เวลา compile ต่อ build
+PREBUILD_SUFFIX = ".prebuild"  # worktree เงาอยู่ข้าง repo (<repo>.prebuild) -> volume เดียวกัน rename Binaries ได้ทันที
+PREBUILD_NICE = 10         # nice ของ UBT ที่ prebuild (Windows ใช้ BELOW_NORMAL_PRIORITY_CLASS)
+STARTUP_PROFILE_DIR = "startup_profiles"  # milestone ของ editor startup ต่อการเปิดหนึ่งครั้ง
+STARTUP_POLL_S = 0.25      # รอบอ่าน Saved/Logs/<Project>.log ระหว่าง editor กำลังเปิด
+STARTUP_TIMEOUT_S = 1800   # เลิกรอ ready หลังจากนี้ (เปิดครั้งแรกที่ต้อง compile shader ทั้งหมดอาจนาน)
+TRACE_DIR = "launcher_traces"  # Chrome trace (chrome://tracing / Perfetto) ต่อการเปิดโปรเจกต์หนึ่งครั้ง
+# cold-start budget ของโหมด headless (ไม่ import UI) วัดจาก process เริ่ม: interpreter ~70 ms + import ~60 ms
+# + compile ไฟล์นี้ ~90 ms เมื่อรันเป็นสคริปต์ (exe/`-m` ใช้ bytecode cache) -> `status --json` วัดได้ 150-270 ms
+CLI_STARTUP_BUDGET_MS = 300
+
+# ===================== Tracing =====================
+class Tracer:
+    """เก็บ span (เวลาเริ่ม/จบ, คำสั่ง, exit code, bytes) ของการรันหนึ่งครั้ง แล้ว export เป็น Chrome trace JSON"""
+    def __init__(self, name):
+        self.name = name
+        self.t0 = time.perf_counter()
+        self.started_at = time.time()
+        self.events = []
+        self.meta = {}  # ข้อมูลของ run (uproject, head ก่อน/หลัง, generate/build รันไหม) สำหรับ launch history
+        self._lock = threading.Lock()
+
+    def add(self, name, cat, start, end, args):
+        ev = {"name": name, "cat": cat, "ph": "X", "pid": os.getpid(), "tid": threading.get_ident(),
+              "ts": round((start - self.t0) * 1e6), "dur": round((end - start) * 1e6), "args": args}
+        with self._lock:
+            self.events.append(ev)
+
+    def to_chrome(self):
+        with self._lock:
+            events = list(self.events)
+        meta = {"name": "process_name", "ph": "M", "pid": os.getpid(), "args": {"name": f"RNDLauncher {self.name}"}}
+        return {"traceEvents": [meta] + events, "displayTimeUnit": "ms",
+                "otherData": dict(self.meta, run=self.name, started_at=self.started_at)}
+
+    def write(self, trace_dir=None):
+        trace_dir = trace_dir or TRACE_DIR
+        os.makedirs(trace_dir, exist_ok=True)
+        stamp = time.strftime("%Y%m%d_%H%M%S", time.localtime(self.started_at))
+        path = os.path.join(trace_dir, f"trace_{self.name}_{stamp}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_chrome(), f, ensure_ascii=False)
+        return path
+
+    def summary(self):
+        """สรุปสั้น: เวลารวม (ไม่นับช่วงรอผู้ใช้), stage/node แต่ละตัว และผลรวมของคำสั่งที่รัน"""
+        with self._lock:
+            events = list(self.events)
+        total, wait = trace_total(events)
+        parts = [f"{self.name} {total - wait:.2f}s" + (f" (+รอผู้ใช้ {wait:.2f}s)" if wait else "")]
+        parts += [f"{e['name']} {e['dur'] / 1e6:.2f}s" for e in events if e["cat"] in ("stage", "node")]
+        cmds = [e for e in events if e["cat"] == "cmd"]
+        if cmds:
+            parts.append(f"{len(cmds)} cmd {sum(e['dur'] for e in cmds) / 1e6:.2f}s")
+        return " | ".join(parts)
+
+def trace_total(events):
+    """(เวลารวมของ run, เวลาที่รอผู้ใช้ตอบ dialog) จาก span; span ที่มี args user_wait=True คือช่วงรอผู้ใช้"""
+    total = max([(e["ts"] + e["dur"]) for e in events] or [0]) / 1e6
+    wait = sum(e["dur"] for e in events if e["args"].get("user_wait")) / 1e6
+    return total, wait
+
+_trace_local = threading.local()  # trace ของแต่ละ thread: งานเบื้องหลัง (auto-check, prebuild) ไม่ปนกับ run ที่กำลัง trace
+
+@contextmanager
+def trace_scope(tracer):
+    """span ที่เกิดใน thread นี้ระหว่าง scope ถูกบันทึกลง tracer (None = ไม่บันทึก)"""
+    prev = getattr(_trace_local, "tracer", None)
+    _trace_local.tracer = tracer
+    try:
+        yield tracer
+    finally:
+        _trace_local.tracer = prev
+
+def current_tracer():
+    return getattr(_trace_local, "tracer", None)
+
+def begin_trace(name):
+    """เริ่ม trace ของ thread นี้ (thread/pool อื่นต้องรับต่อผ่าน scoped() หรือ TaskGraph)"""
+    tracer = _trace_local.tracer = Tracer(name)
+    return tracer
+
+def end_trace(tracer, logbox=None):
+    """ปิด trace, เขียนไฟล์, บันทึกลง launch history และ log สรุปเวลา; คืน summary"""
+    if current_tracer() is tracer:
+        _trace_local.tracer = None
+    summary = tracer.summary()
+    try:
+        path = tracer.write()
+        log_append(logbox, f"[trace] {summary}  ({path})")
+    except OSError:
+        log_append(logbox, f"[trace] {summary}")
+    record_trace_history(tracer, logbox)
+    return summary
+
+def trace_meta(**kw):
+    """เติมข้อมูลของ run ให้ trace ของ thread นี้ (ไม่มี trace = ไม่ทำอะไร)"""
+    tracer = current_tracer()
+    if tracer is not None:
+        with tracer._lock:
+            tracer.meta.update(kw)
+
+@contextmanager
+def trace_span(name, cat="stage", **args):
+    """span รอบงานหนึ่งชิ้น; ถ้า thread นี้ไม่มี trace จะไม่บันทึกอะไร
+    yield dict ของ args ให้ผู้เรียกเติม exit_code/bytes ได้"""
+    tracer = current_tracer()
+    start = time.perf_counter()
+    try:
+        yield args
+    finally:
+        if tracer is not None:
+            tracer.add(name, cat, start, time.perf_counter(), args)
 
-# ---- UE-like palette ----
-UE_BG          = "#1b1b1c"
-UE_PANEL       = "#202225"
-UE_BTN         = "#2a2e33"
-UE_BTN_HOVER   = "#32363c"
-UE_BORDER      = "#3b4046"
-UE_TEXT        = "#e6e6e6"
-UE_TEXT_MUTED  = "#a4a9ae"
-UE_ACCENT      = "#2ea3ff"
+def _cmd_label(cmd):
+    return cmd if isinstance(cmd, str) else " ".join(str(c) for c in cmd)
 
-ctk.set_appearance_mode("dark")
-ctk.set_default_color_theme("dark-blue")
-ctk.set_widget_scaling(1.0)
+def _cmd_name(cmd):
+    first = cmd.split()[0] if isinstance(cmd, str) and cmd.split() else (cmd[0] if cmd else "")
+    return os.path.basename(str(first))
 
-# ===================== Utils =====================
-def resource_path(relative):
-    """รองรับทั้งรันจากโค้ดและจากไฟล์ .exe (PyInstaller)"""
-    if hasattr(sys, "_MEIPASS"):
-        return os.path.join(sys._MEIPASS, relative)
-    return os.path.join(os.path.abspath("."), relative)
-
-def set_window_icon(win, ico_rel="assets/logo.ico", png_rel="assets/logo.png"):
-    """ตั้งโลโก้กลมสำหรับ Titlebar/Taskbar"""
-    ico = resource_path(ico_rel)
-    png = resource_path(png_rel)
+# ===================== Process Supervisor =====================
+RC_TIMEOUT = 124    # exit code เมื่อถูก kill เพราะ timeout / ไม่มี output (แบบ coreutils timeout)
+RC_CANCELLED = 130  # exit code เมื่อถูกยกเลิก
+
+_cancel_local = threading.local()
+
+@contextmanager
+def cancel_scope(event):
+    """คำสั่งที่รันใน thread นี้ระหว่าง scope จะถูก kill ทั้ง tree เมื่อ event ถูก set"""
+    prev = getattr(_cancel_local, "event", None)
+    _cancel_local.event = event
     try:
-        if os.name == "nt" and os.path.isfile(ico):
-            win.iconbitmap(ico)  # Taskbar (Windows)
-        if os.path.isfile(png):
-            win.iconphoto(True, tk.PhotoImage(file=png))  # Titlebar (ทุกแพลตฟอร์ม)
-    except Exception:
+        yield event
+    finally:
+        _cancel_local.event = prev
+
+def current_cancel():
+    return getattr(_cancel_local, "event", None)
+
+def scoped(fn):
+    """ผูก cancel_scope และ trace ของ thread ปัจจุบันไปกับ fn ที่จะถูกส่งไปรันใน thread/pool อื่น"""
+    event, tracer = current_cancel(), current_tracer()
+    def _run(*args, **kwargs):
+        with cancel_scope(event), trace_scope(tracer):
+            return fn(*args, **kwargs)
+    return _run
+
+def _lower_priority():
+    """preexec_fn (POSIX): ลด priority ของ process ลูกก่อน exec; ทั้ง tree ที่มันสร้างต่อจะสืบทอด nice นี้"""
+    try: os.nice(PREBUILD_NICE)
+    except OSError: pass
+
+_win_k32 = None
+
+def _kernel32():
+    global _win_k32
+    if _win_k32 is None:
+        import ctypes
+        k32 = ctypes.WinDLL("kernel32", use_last_error=True)  # instance แยก ไม่แก้ prototype ของ ctypes.windll
+        k32.CreateJobObjectW.restype = ctypes.c_void_p
+        k32.CreateJobObjectW.argtypes = (ctypes.c_void_p, ctypes.c_wchar_p)
+        k32.AssignProcessToJobObject.argtypes = (ctypes.c_void_p, ctypes.c_void_p)
+        k32.TerminateJobObject.argtypes = (ctypes.c_void_p, ctypes.c_uint)
+        k32.CloseHandle.argtypes = (ctypes.c_void_p,)
+        _win_k32 = k32
+    return _win_k32
+
+def _job_for(p):
+    """Windows: ใส่ process ลง Job Object ของมันเอง ลูกหลานที่สร้างต่อจากนี้อยู่ใน job เดียวกัน
+    -> kill ได้ครบแม้ leader ออกไปแล้ว (taskkill /T เดิน tree จาก leader ที่ยังมีชีวิตเท่านั้น)"""
+    try:
+        k32 = _kernel32()
+        job = k32.CreateJobObjectW(None, None)
+        if job and k32.AssignProcessToJobObject(job, int(p._handle)):
+            return job
+        if job:
+            k32.CloseHandle(job)
+    except (OSError, AttributeError):
         pass
+    return None
 
-def run_cmd(cmd, cwd=None):
+def kill_process_tree(p, grace=None, job=None):
+    """ปิดทั้ง process tree: POSIX ส่ง SIGTERM -> SIGKILL ให้ทั้ง process group
+    Windows ปิดทั้ง Job Object (ถ้ามี) ไม่งั้น taskkill /T"""
+    grace = KILL_GRACE_S if grace is None else grace
+    if os.name == "nt":
+        if job is not None and _kernel32().TerminateJobObject(job, 1):
+            return
+        if p.poll() is None:
+            subprocess.run(["taskkill", "/PID", str(p.pid), "/T", "/F"],
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        return
+    try:
+        os.killpg(p.pid, signal.SIGTERM)
+    except OSError:
+        return
     try:
-        if isinstance(cmd, str):
-            cmd_list = cmd if os.name == "nt" else shlex.split(cmd)
+        p.wait(grace)
+    except subprocess.TimeoutExpired:
+        pass
+    try:
+        os.killpg(p.pid, signal.SIGKILL)  # ลูกหลานที่ไม่สน SIGTERM หรือยังถือ pipe อยู่
+    except OSError:
+        pass
+
+class SupervisedProc:
+    def __init__(self, p, label, cancel, timeout, idle_timeout):
+        now = time.monotonic()
+        self.p, self.label, self.cancel = p, label, cancel
+        self.timeout = timeout
+        self.deadline = now + timeout if timeout else None
+        self.idle_timeout = idle_timeout
+        self.last_output = now
+        self.reason = None  # "timeout ..." / "no output ..." / "cancelled"
+        self.job = None     # Windows Job Object ของ tree นี้
+        self._job_lock = threading.Lock()
+
+    def touch(self):
+        self.last_output = time.monotonic()
+
+    def kill_tree(self, grace=None):
+        with self._job_lock:
+            kill_process_tree(self.p, grace, self.job)
+
+    def close(self):
+        with self._job_lock:  # ไม่ปิด handle ระหว่างที่ thread อื่นกำลัง kill ด้วย job นี้
+            if self.job is not None:
+                _kernel32().CloseHandle(self.job)
+                self.job = None
+
+    @property
+    def rc_override(self):
+        if self.reason is None:
+            return None
+        return RC_CANCELLED if self.reason.startswith("cancel") else RC_TIMEOUT
+
+class ProcessSupervisor:
+    """ทะเบียน child process ทุกตัวที่ launcher สั่งรัน (ยกเว้น editor ที่ตั้งใจให้อยู่ต่อ)
+    thread เดียวคอยดู cancel event, timeout รวม และเวลาที่ไม่มี output แล้ว kill ทั้ง process tree"""
+    def __init__(self, poll_s=0.1):
+        self.poll_s = poll_s
+        self._lock = threading.Lock()
+        self._procs = set()
+        self._wake = threading.Event()
+        self._thread = None
+
+    def spawn(self, cmd_list, cancel=None, timeout=None, idle_timeout=None, low_priority=False, **popen_kw):
+        if os.name == "nt":
+            flags = subprocess.CREATE_NEW_PROCESS_GROUP
+            if low_priority:
+                flags |= subprocess.BELOW_NORMAL_PRIORITY_CLASS  # ลูก (cl.exe, link.exe) สืบทอด class นี้
+            popen_kw.setdefault("creationflags", flags)
         else:
-            cmd_list = cmd
-        p = subprocess.Popen(cmd_list, cwd=cwd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
-        out, err = p.communicate()
-        return p.returncode, (out or "").strip(), (err or "").strip()
-    except Exception as e:
-        return 1, "", str(e)
+            popen_kw.setdefault("start_new_session", True)  # pgid = pid -> killpg ได้ทั้ง tree
+            if low_priority:
+                popen_kw.setdefault("preexec_fn", _lower_priority)
+        p = subprocess.Popen(cmd_list, **popen_kw)
+        sp = SupervisedProc(p, _cmd_label(cmd_list), cancel if cancel is not None else current_cancel(),
+                            timeout, idle_timeout)
+        if os.name == "nt":
+            sp.job = _job_for(p)
+        with self._lock:
+            self._procs.add(sp)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._loop, name="proc-supervisor", daemon=True)
+                self._thread.start()
+        self._wake.set()
+        return sp
+
+    def release(self, sp):
+        with self._lock:
+            self._procs.discard(sp)
+        sp.close()
+
+    def active(self):
+        """คำสั่งที่ผู้เรียกยังรอผลอยู่"""
+        with self._lock:
+            return list(self._procs)
+
+    def kill(self, sp, reason):
+        if sp.reason is None:
+            sp.reason = reason
+        threading.Thread(target=sp.kill_tree, daemon=True).start()
+
+    def cancel_all(self, reason="cancelled"):
+        """kill ทุกคำสั่งที่ยังรันอยู่; คืนจำนวนที่ kill"""
+        procs = self.active()
+        for sp in procs:
+            self.kill(sp, reason)
+        return len(procs)
+
+    def shutdown(self):
+        """เรียกตอนปิดโปรแกรม: kill ทุก tree แบบ synchronous"""
+        for sp in self.active():
+            sp.reason = sp.reason or "cancelled (exit)"
+            sp.kill_tree(grace=1.0)
+
+    def _loop(self):
+        while True:
+            with self._lock:
+                procs = list(self._procs)
+            if not procs:
+                self._wake.wait(1.0)
+                self._wake.clear()
+                continue
+            now = time.monotonic()
+            for sp in procs:
+                if sp.reason is not None:  # leader ออกแล้วแต่ลูกหลานยังถือ pipe อยู่ก็ยังนับ
+                    continue
+                if sp.cancel is not None and sp.cancel.is_set():
+                    self.kill(sp, "cancelled")
+                elif sp.deadline is not None and now > sp.deadline:
+                    self.kill(sp, f"timeout after {sp.timeout:.0f}s")
+                elif sp.idle_timeout and now - sp.last_output > sp.idle_timeout:
+                    self.kill(sp, f"no output for {sp.idle_timeout:.0f}s (hang)")
+            time.sleep(self.poll_s)
+
+SUPERVISOR = ProcessSupervisor()
+atexit.register(SUPERVISOR.shutdown)
+
+# ===================== Log Store =====================
+def prune_logs(log_dir, max_files):
+    """ลบไฟล์ .log (+ .idx) ที่เก่าสุดจนเหลือ max_files"""
+    try:
+        logs = sorted((e for e in os.scandir(log_dir) if e.name.endswith(".log")),
+                      key=lambda e: (e.stat().st_mtime_ns, e.name), reverse=True)  # mtime เท่ากัน: part ใหม่กว่าชนะ
+    except OSError:
+        return
+    for e in logs[max_files:]:
+        for path in (e.path, e.path[:-4] + ".idx"):
+            try: os.remove(path)
+            except OSError: pass
+
+def list_log_files(log_dir=None):
+    """ไฟล์ log ใหม่สุดก่อน: [(path, bytes, mtime)]"""
+    try:
+        entries = [e for e in os.scandir(log_dir or LOG_DIR) if e.name.endswith(".log")]
+    except OSError:
+        return []
+    rows = [(e.path, e.stat().st_size, e.stat().st_mtime) for e in entries]
+    return sorted(rows, key=lambda r: r[2], reverse=True)
+
+class LogStore:
+    """เขียน log ทุกบรรทัดของ session ลงดิสก์: ไฟล์ละไม่เกิน max_bytes (เต็มแล้วหมุนไปไฟล์ถัดไป)
+    และเก็บไว้ไม่เกิน max_files ไฟล์; คู่กับแต่ละ .log มี .idx = [stride] + byte offset ของทุก ๆ stride บรรทัด (uint64)
+    ไฟล์ถูกสร้างตอนเขียนบรรทัดแรก"""
+    def __init__(self, name="session", log_dir=None, max_bytes=None, max_files=None, stride=None):
+        self.name = name
+        self.log_dir = log_dir or LOG_DIR
+        self.max_bytes = max_bytes or LOG_FILE_MAX_BYTES
+        self.max_files = max_files or LOG_MAX_FILES
+        self.stride = stride or LOG_INDEX_STRIDE
+        self.stamp = time.strftime("%Y%m%d_%H%M%S")
+        self.path = None
+        self._f = self._idx = None
+        self._part = self._size = self._lines = 0
+        self._closed = False
+        self._lock = threading.Lock()
+
+    def _rotate_locked(self):
+        self._close_files_locked()
+        os.makedirs(self.log_dir, exist_ok=True)
+        self._part += 1
+        base = os.path.join(self.log_dir, f"{self.name}_{self.stamp}_{os.getpid()}.{self._part:03d}")
+        self.path = base + ".log"
+        self._f = open(self.path, "wb")
+        self._idx = open(base + ".idx", "wb")
+        self._idx.write(struct.pack("<Q", self.stride))
+        self._size = self._lines = 0
+        prune_logs(self.log_dir, self.max_files)
+
+    def write(self, text):
+        with self._lock:
+            if self._closed:
+                return
+            try:
+                if self._f is None or self._size >= self.max_bytes:
+                    self._rotate_locked()
+                for line in str(text).split("\n"):
+                    if self._lines % self.stride == 0:
+                        self._idx.write(struct.pack("<Q", self._size))
+                    data = (line + "\n").encode("utf-8", "replace")
+                    self._f.write(data)
+                    self._size += len(data)
+                    self._lines += 1
+            except OSError:
+                self._closed = True  # ดิสก์เต็ม/ไม่มีสิทธิ์เขียน: หยุดเก็บ แต่ไม่ให้ log บน UI พัง
+
+    def flush(self):
+        with self._lock:
+            for f in (self._f, self._idx):
+                if f is not None:
+                    try: f.flush()
+                    except OSError: pass
+
+    def _close_files_locked(self):
+        for f in (self._f, self._idx):
+            if f is not None:
+                try: f.close()
+                except OSError: pass
+        self._f = self._idx = None
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            self._close_files_locked()
+
+def _count_newlines(buf, start, end, chunk=8 * 1024 * 1024):
+    n = 0
+    while start < end:
+        stop = min(end, start + chunk)
+        n += buf[start:stop].count(b"\n")
+        start = stop
+    return n
+
+class LogFile:
+    """อ่านไฟล์ log ผ่าน mmap (ไม่โหลดทั้งไฟล์เข้าหน่วยความจำ): ค้นหา และกระโดดไปบรรทัดใด ๆ ด้วย .idx
+    ใช้กับ log ภายนอกที่ไม่มี .idx ได้ (สร้าง index ในหน่วยความจำครั้งแรกที่กระโดด)"""
+    def __init__(self, path):
+        self.path = path
+        self._fh = open(path, "rb")
+        self.size = os.fstat(self._fh.fileno()).st_size
+        self.mm = mmap.mmap(self._fh.fileno(), 0, access=mmap.ACCESS_READ) if self.size else b""
+        self.stride, self.offsets = 0, None
+        try:
+            with open(path[:-4] + ".idx", "rb") as f:
+                idx = array("Q")
+                idx.frombytes(f.read())
+            if sys.byteorder != "little":
+                idx.byteswap()
+            if len(idx) > 1:
+                self.stride, self.offsets = idx[0], idx[1:]
+        except (OSError, ValueError):
+            pass
 
-def log_append(textbox: ctk.CTkTextbox, text: str):
+    def _ensure_index(self):
+        if self.offsets is not None:
+            return
+        self.stride, offsets, line, pos = LOG_INDEX_STRIDE, array("Q", [0]), 0, 0
+        while True:
+            pos = self.mm.find(b"\n", pos) + 1
+            if pos <= 0 or pos >= self.size:
+                break
+            line += 1
+            if line % self.stride == 0:
+                offsets.append(pos)
+        self.offsets = offsets
+
+    def offset_of_line(self, line):
+        self._ensure_index()
+        k = min(line // self.stride, len(self.offsets) - 1)
+        pos = self.offsets[k]
+        for _ in range(line - k * self.stride):
+            nxt = self.mm.find(b"\n", pos)
+            if nxt < 0:
+                return self.size
+            pos = nxt + 1
+        return pos
+
+    def line_of_offset(self, offset):
+        self._ensure_index()
+        k = max(0, bisect.bisect_right(self.offsets, offset) - 1)
+        return k * self.stride + _count_newlines(self.mm, self.offsets[k], offset)
+
+    def lines(self, start, count):
+        """[(line_no, text)] ตั้งแต่บรรทัด start (เริ่มที่ 0)"""
+        start = max(0, start)
+        pos, out = self.offset_of_line(start), []
+        while len(out) < count and pos < self.size:
+            end = self.mm.find(b"\n", pos)
+            end = self.size if end < 0 else end
+            out.append((start + len(out), self.mm[pos:end].decode("utf-8", "replace").rstrip("\r")))
+            pos = end + 1
+        return out
+
+    def search(self, pattern, regex=False, ignore_case=True, limit=None):
+        """[(line_no, text)] ของบรรทัดที่ตรง pattern (บรรทัดละครั้ง) ไล่จากต้นไฟล์"""
+        limit = limit or LOG_SEARCH_LIMIT
+        pat = pattern.encode("utf-8")
+        rx = re.compile(pat if regex else re.escape(pat), re.MULTILINE | (re.IGNORECASE if ignore_case else 0))  # ^/$ = ต้น/ท้ายบรรทัด
+        hits, line, counted_to, last_start = [], 0, 0, -1
+        if not self.size:
+            return hits
+        for m in rx.finditer(self.mm):
+            start = self.mm.rfind(b"\n", 0, m.start()) + 1
+            if start == last_start:
+                continue
+            line += _count_newlines(self.mm, counted_to, start)
+            counted_to = last_start = start
+            end = self.mm.find(b"\n", m.end())
+            end = self.size if end < 0 else end
+            hits.append((line, self.mm[start:end].decode("utf-8", "replace").rstrip("\r")))
+            if len(hits) >= limit:
+                break
+        return hits
+
+    def close(self):
+        if self.size:
+            self.mm.close()
+        self._fh.close()
+
+# ===================== Utils =====================
+def _split_cmd(cmd):
+    if isinstance(cmd, str):
+        return cmd if os.name == "nt" else shlex.split(cmd)
+    return cmd
+
+def run_cmd(cmd, cwd=None, strip=True, timeout=None, cancel=None):
+    """รันคำสั่งแล้วคืน (rc, out, err); timeout เป็นวินาที (None = CMD_TIMEOUT_S, 0 = ไม่จำกัด)
+    เกิน timeout/ถูก cancel -> kill ทั้ง process tree, rc = RC_TIMEOUT/RC_CANCELLED"""
+    timeout = CMD_TIMEOUT_S if timeout is None else timeout
+    with trace_span(_cmd_name(cmd), "cmd", cmd=_cmd_label(cmd), cwd=cwd) as span:
+        sp = None
+        try:
+            sp = SUPERVISOR.spawn(_split_cmd(cmd), cancel=cancel, timeout=timeout, cwd=cwd,
+                                  stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+            out, err = sp.p.communicate()
+            rc = sp.p.returncode if sp.rc_override is None else sp.rc_override
+            if sp.reason:
+                err = f"{err or ''}\n[{sp.reason}] {sp.label}".strip()
+                span["killed"] = sp.reason
+            span["exit_code"] = rc
+            span["bytes"] = len(out or "") + len(err or "")
+            if not strip:  # porcelain/-z output: ช่องว่างนำหน้ามีความหมาย
+                return rc, out or "", err or ""
+            return rc, (out or "").strip(), (err or "").strip()
+        except Exception as e:
+            span["exit_code"] = 1
+            span["error"] = str(e)
+            return 1, "", str(e)
+        finally:
+            if sp is not None:
+                SUPERVISOR.release(sp)
+
+def run_cmd_stream(cmd, cwd=None, on_line=None, tail_lines=200, cancel=None, timeout=None, idle_timeout=None,
+                   low_priority=False):
+    """รันคำสั่งแล้วอ่าน stdout+stderr ทีละบรรทัดส่งให้ on_line ทันที
+    เก็บเฉพาะ `tail_lines` บรรทัดท้ายไว้ใน ring buffer (หน่วยความจำคงที่ไม่ว่า output จะยาวแค่ไหน)
+    cancel (threading.Event, default = cancel_scope ของ thread นี้) ถูก set, เกิน timeout
+    หรือไม่มี output นาน idle_timeout วินาที -> kill ทั้ง process tree; low_priority = งานเบื้องหลัง (prebuild)
+    คืน (returncode, [tail lines])"""
+    tail = deque(maxlen=tail_lines)
+    with trace_span(_cmd_name(cmd), "cmd", cmd=_cmd_label(cmd), cwd=cwd) as span:
+        nbytes = 0
+        sp = None
+        try:
+            sp = SUPERVISOR.spawn(_split_cmd(cmd), cancel=cancel, timeout=timeout, idle_timeout=idle_timeout,
+                                  low_priority=low_priority, cwd=cwd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                  text=True, errors="replace", bufsize=1)
+            for line in sp.p.stdout:
+                sp.touch()
+                nbytes += len(line)
+                line = line.rstrip("\r\n")
+                tail.append(line)
+                if on_line:
+                    try: on_line(line)
+                    except Exception: pass
+            sp.p.stdout.close()
+            rc = sp.p.wait()
+            if sp.reason:
+                rc = sp.rc_override
+                msg = f"[{sp.reason}] {sp.label}"
+                tail.append(msg)
+                span["killed"] = sp.reason
+                if on_line:
+                    try: on_line(msg)
+                    except Exception: pass
+            span["exit_code"], span["bytes"] = rc, nbytes
+            return rc, list(tail)
+        except Exception as e:
+            span["exit_code"], span["bytes"], span["error"] = 1, nbytes, str(e)
+            tail.append(str(e))
+            return 1, list(tail)
+        finally:
+            if sp is not None:
+                SUPERVISOR.release(sp)
+
+def log_tail_errors(logbox, tail, fallback, limit=20):
+    """สรุปบรรทัด error จาก tail ตอนคำสั่งล้มเหลว"""
+    errs = [l for l in tail if "error" in l.lower()][-limit:]
+    log_append(logbox, fallback)
+    for l in errs:
+        log_append(logbox, f"  {l}")
+
+class LogSink:
+    """ตัวรวม log ที่ worker thread เขียนได้โดยไม่บล็อก แล้ว flush เป็นก้อนเข้า textbox ทุก LOG_FLUSH_MS
+    เก็บบรรทัดใน widget ไม่เกิน max_lines (บรรทัดเก่าถูกลบทิ้ง)"""
+    def __init__(self, textbox, max_lines=None, flush_ms=None, store=None):
+        self.textbox = textbox
+        self.store = store  # LogStore: เก็บทุกบรรทัดลงดิสก์ (รวมบรรทัดที่ถูกข้ามบนจอ)
+        self.max_lines = max_lines or LOG_MAX_LINES
+        self.flush_ms = flush_ms or LOG_FLUSH_MS
+        self._lock = threading.Lock()
+        self._pending = deque()
+        self._dropped = 0
+        self._job = None
+        self._closed = False
+        self.schedule()
+
+    def write(self, text):
+        if self.store is not None:
+            self.store.write(text)
+        lines = str(text).split("\n")
+        with self._lock:
+            self._pending.extend(lines)
+            over = len(self._pending) - self.max_lines
+            if over > 0:  # ยังไม่ทันแสดงก็หลุดจากหน้าต่างอยู่ดี ทิ้งตั้งแต่ในคิว
+                for _ in range(over):
+                    self._pending.popleft()
+                self._dropped += over
+
+    def drain(self):
+        """คืน (text, dropped) ที่ค้างอยู่และล้างคิว"""
+        with self._lock:
+            if not self._pending and not self._dropped:
+                return "", 0
+            lines, dropped = self._pending, self._dropped
+            self._pending, self._dropped = deque(), 0
+        if dropped and len(lines) >= self.max_lines:
+            lines.popleft()  # เว้นที่ให้บรรทัดแจ้งจำนวนที่ข้าม ไม่ให้ถูกตัดออกจากหน้าต่างทันที
+            dropped += 1
+        return "\n".join(lines) + "\n", dropped
+
+    def flush(self):
+        if self.store is not None:
+            self.store.flush()
+        text, dropped = self.drain()
+        if not text and not dropped:
+            return
+        tb = self.textbox
+        try:
+            tb.configure(state="normal")
+            if dropped:
+                tb.insert("end", f"... ({dropped} บรรทัดถูกข้าม)\n")
+            tb.insert("end", text)
+            count = int(str(tb.index("end-1c")).split(".")[0]) - 1  # end-1c อยู่บนบรรทัดว่างหลัง "\n" สุดท้าย
+            if count > self.max_lines:
+                tb.delete("1.0", f"{count - self.max_lines + 1}.0")
+            tb.see("end")
+            tb.configure(state="disabled")
+        except Exception:
+            pass
+
+    def schedule(self):
+        if self._closed: return
+        def _tick():
+            self.flush()
+            self.schedule()
+        try:
+            self._job = self.textbox.after(self.flush_ms, _tick)
+        except Exception:
+            self._job = None
+
+    def close(self):
+        self._closed = True
+        if self._job:
+            try: self.textbox.after_cancel(self._job)
+            except Exception: pass
+            self._job = None
+        if self.store is not None:
+            self.store.close()
+
+class ConsoleLog:
+    """logbox สำหรับโหมด headless: เขียนออก stream ทีละบรรทัด"""
+    def __init__(self, stream=None, quiet=False, store=None):
+        self.stream = stream or sys.stdout
+        self.quiet = quiet
+        self.store = store
+        self._lock = threading.Lock()
+
+    def write(self, text):
+        if self.store is not None:
+            self.store.write(text)
+        if self.quiet: return
+        with self._lock:
+            self.stream.write(str(text) + "\n")
+            self.stream.flush()
+
+def log_append(textbox, text: str):
     """Thread-safe UI update."""
+    if textbox is None:
+        return
+    if isinstance(textbox, (LogSink, ConsoleLog)):
+        textbox.write(text)
+        return
     def _do():
         try:
             textbox.configure(state="normal")
@@ -75,16 +745,36 @@ def log_append(textbox: ctk.CTkTextbox, text: str):
     except Exception:
         _do()
 
+SETTINGS_KEYS = ("engine_dir", "uproject", "autobuild", "autogen", "auto_check", "prebuild", "ubt", "editor", "projects",
+                 "engines")
+DEFAULT_SETTINGS = {
+    "engine_dir": "",
+    "uproject": "",
+    "autobuild": False,
+    "autogen": True,
+    "auto_check": False,
+    "prebuild": False,  # build upstream ล่วงหน้าใน worktree เงาเมื่อ auto-check เจอ commit ใหม่
+    "ubt": "",
+    "editor": "",
+    "projects": [],
+    "engines": []  # engine install ที่ลงทะเบียนไว้ ค้นหาเครื่องมือพร้อมกันด้วย autodetect_tools_many
+}
+
+class ListVar:
+    """ตัวแปรแบบ list ที่มี get/set เหมือนตัวแปร Tk (ใช้เก็บรายการ .uproject ใน ctx)"""
+    def __init__(self, value=None):
+        self._value = list(value or [])
+    def get(self):
+        return list(self._value)
+    def set(self, value):
+        self._value = list(value or [])
+
+def settings_snapshot(state_like):
+    """แปลง ctx (ตัวแปร Tk) เป็น dict ค่าธรรมดา"""
+    return {k: state_like[k].get() for k in SETTINGS_KEYS}
+
 def save_settings(state_like):
-    data = {
-        "engine_dir": state_like["engine_dir"].get(),
-        "uproject": state_like["uproject"].get(),
-        "autobuild": state_like["autobuild"].get(),
-        "autogen": state_like["autogen"].get(),
-        "auto_check": state_like["auto_check"].get(),
-        "ubt": state_like["ubt"].get(),
-        "editor": state_like["editor"].get()
-    }
+    data = settings_snapshot(state_like)
     with open(CONFIG_FILE, "w", encoding="utf-8") as f:
         json.dump(data, f, ensure_ascii=False, indent=2)
 
@@ -95,15 +785,7 @@ def load_settings():
                 return json.load(f)
         except:
             pass
-    return {
-        "engine_dir": "",
-        "uproject": "",
-        "autobuild": False,
-        "autogen": True,
-        "auto_check": False,
-        "ubt": "",
-        "editor": ""
-    }
+    return dict(DEFAULT_SETTINGS)
 
 def find_file_case_insensitive(root, patterns):
     for pat in patterns:
@@ -113,458 +795,2429 @@ def find_file_case_insensitive(root, patterns):
             return hits[0]
     return None
 
+TOOL_SPECS = {
+    # known: ตำแหน่งมาตรฐานที่ probe ก่อน, roots/depth: ขอบเขต walk สำรอง, parent: ชื่อโฟลเดอร์แม่ที่ต้องตรง
+    "ubt": {"name": "UnrealBuildTool.exe",
+            "known": ["Engine/Binaries/DotNET/UnrealBuildTool/UnrealBuildTool.exe",
+                      "Engine/Binaries/DotNET/UnrealBuildTool.exe"],
+            "roots": ["Engine/Binaries/DotNET"], "depth": 4, "parent": None},
+    "editor": {"name": "UnrealEditor.exe",
+               "known": ["Engine/Binaries/Win64/UnrealEditor.exe"],
+               "roots": ["Engine"], "depth": 6, "parent": "win64"},
+}
+TOOL_WALK_PRUNE = {"content", "source", "intermediate", "saved", "deriveddatacache", "documentation",
+                   "shaders", "extras", "config", "build", "platforms", "programs", ".git"}
+
+_tool_cache = {}  # abs engine_dir -> (stamp, {"ubt": path, "editor": path})
+_tool_cache_lock = threading.Lock()
+
+def find_tool_walk(root, name, max_depth, parent=None, prune=TOOL_WALK_PRUNE):
+    """BFS ด้วย os.scandir จำกัดความลึก ตัดโฟลเดอร์ที่ไม่มีทางเจอ binary และหยุดที่ hit แรก
+    (BFS = เจอ path ตื้นสุดก่อน ใกล้เคียงกับ glob แล้ว sort ตามความยาว)"""
+    name, level = name.lower(), [root]
+    for depth in range(max_depth + 1):
+        nxt = []
+        for d in level:
+            try:
+                entries = sorted(os.scandir(d), key=lambda e: e.name.lower())
+            except OSError:
+                continue
+            for e in entries:
+                try:
+                    if e.is_dir(follow_symlinks=False):
+                        if e.name.lower() not in prune: nxt.append(e.path)
+                    elif e.name.lower() == name and (parent is None or os.path.basename(d).lower() == parent):
+                        return e.path
+                except OSError:
+                    continue
+        if not nxt: break
+        level = nxt
+    return None
+
+def _tool_cache_stamp(engine_dir):
+    stamp = []
+    for rel in ("", "Engine/Binaries", "Engine/Binaries/DotNET", "Engine/Binaries/Win64"):
+        try: stamp.append(os.stat(os.path.join(engine_dir, rel)).st_mtime_ns)
+        except OSError: stamp.append(None)
+    return tuple(stamp)
+
+def discover_tool(engine_dir, spec):
+    for rel in spec["known"]:
+        p = os.path.join(engine_dir, rel)
+        if os.path.isfile(p):
+            return p
+    for rel in spec["roots"]:
+        hit = find_tool_walk(os.path.join(engine_dir, rel), spec["name"], spec["depth"], spec["parent"])
+        if hit:
+            return hit
+    return None
+
 def autodetect_tools(engine_dir):
-    ubt = editor = None
     if not engine_dir or not os.path.isdir(engine_dir):
         return None, None
-    ubt = find_file_case_insensitive(engine_dir, [
-        "Engine/Binaries/DotNET/UnrealBuildTool/UnrealBuildTool.exe",
-        "Engine/Binaries/DotNET/UnrealBuildTool.exe",
-        "Engine/Binaries/DotNET/**/UnrealBuildTool.exe",
-    ])
-    editor = find_file_case_insensitive(engine_dir, [
-        "Engine/Binaries/Win64/UnrealEditor.exe",
-        "Engine/**/Win64/UnrealEditor.exe",
-    ])
-    return ubt, editor
+    key = os.path.normcase(os.path.abspath(engine_dir))
+    stamp = _tool_cache_stamp(key)
+    with _tool_cache_lock:
+        hit = _tool_cache.get(key)
+    if hit and hit[0] == stamp and all(p is None or os.path.isfile(p) for p in hit[1].values()):
+        tools = hit[1]
+    else:
+        tools = {k: discover_tool(engine_dir, spec) for k, spec in TOOL_SPECS.items()}
+        with _tool_cache_lock:
+            _tool_cache[key] = (stamp, tools)
+    return tools["ubt"], tools["editor"]
+
+def autodetect_tools_many(engine_dirs):
+    """ลงทะเบียน/ค้นหาหลาย engine install พร้อมกัน คืน {engine_dir: (ubt, editor)}"""
+    dirs = [d for d in dict.fromkeys(engine_dirs) if d]
+    if not dirs:
+        return {}
+    with ThreadPoolExecutor(max_workers=min(8, len(dirs))) as pool:
+        return dict(zip(dirs, pool.map(autodetect_tools, dirs)))
+
+_repo_root_cache = {}  # abs dir ของ .uproject -> repo root
 
 def get_repo_root_from_uproject(uproject_path):
+    """เดินขึ้นจากโฟลเดอร์ของ .uproject หา .git (โฟลเดอร์ หรือไฟล์ 'gitdir:' ของ worktree/submodule)
+    cache ผลไว้ รอบถัดไปแค่ stat ว่า .git ยังอยู่"""
     if not uproject_path:
         return None
-    d = os.path.abspath(os.path.dirname(uproject_path))
+    start = os.path.abspath(os.path.dirname(uproject_path))
+    root = _repo_root_cache.get(start)
+    if root and os.path.exists(os.path.join(root, ".git")):
+        return root
+    d = start
     for _ in range(10):
-        if os.path.isdir(os.path.join(d, ".git")):
+        if os.path.exists(os.path.join(d, ".git")):
+            _repo_root_cache[start] = d
             return d
         parent = os.path.abspath(os.path.join(d, ".."))
         if parent == d: break
         d = parent
+    _repo_root_cache.pop(start, None)
     return None
 
+def git_dir_of(repo):
+    """git dir จริงของ repo: .git เอง หรือ path ในไฟล์ .git ('gitdir: ...', relative กับ repo ได้)"""
+    if not repo:
+        return None
+    dot = os.path.join(repo, ".git")
+    if os.path.isdir(dot):
+        return dot
+    try:
+        with open(dot, "r", encoding="utf-8", errors="replace") as f:
+            line = f.readline().strip()
+    except OSError:
+        return None
+    if not line.startswith("gitdir:"):
+        return None
+    return os.path.normpath(os.path.join(repo, line[len("gitdir:"):].strip()))
+
+def git_common_dir(git_dir):
+    """ที่เก็บ refs/packed-refs/config ร่วม (worktree ชี้ผ่านไฟล์ commondir; repo ปกติ = git_dir)"""
+    try:
+        with open(os.path.join(git_dir, "commondir"), "r", encoding="utf-8") as f:
+            return os.path.normpath(os.path.join(git_dir, f.read().strip()))
+    except OSError:
+        return git_dir
+
+def read_git_ref(git_dir, ref="HEAD"):
+    """sha ของ ref จากไฟล์ใน git dir โดยตรง (ไม่ spawn git): loose ref -> packed-refs, ตาม symbolic ref
+    คืน (sha หรือ None, ชื่อ ref สุดท้าย)"""
+    common = git_common_dir(git_dir)
+    for _ in range(5):
+        base = git_dir if not ref.startswith("refs/") else common  # HEAD เป็นของแต่ละ worktree
+        try:
+            with open(os.path.join(base, *ref.split("/")), "r", encoding="utf-8") as f:
+                value = f.read().strip()
+        except OSError:
+            value = None
+        if value is None and ref.startswith("refs/"):
+            try:
+                with open(os.path.join(common, "packed-refs"), "r", encoding="utf-8") as f:
+                    for line in f:  # "<sha> <ref>" (ข้าม "# pack-refs" และบรรทัด peeled "^<sha>")
+                        parts = line.split()
+                        if len(parts) == 2 and parts[1] == ref:
+                            value = parts[0]
+                            break
+            except OSError:
+                pass
+        if value and value.startswith("ref:"):
+            ref = value[4:].strip()
+            continue
+        return value, ref
+    return None, ref
+
 # ===================== Git Helpers =====================
+def _log_line(logbox):
+    return lambda line: log_append(logbox, line)
+
 def git_fetch_all(repo, logbox):
-    rc, out, err = run_cmd(["git", "fetch", "--all", "--prune"], cwd=repo)
-    if out: log_append(logbox, out)
-    if rc != 0: log_append(logbox, err or "git fetch failed")
+    rc, _ = run_cmd_stream(["git", "fetch", "--all", "--prune"], cwd=repo, on_line=_log_line(logbox),
+                           idle_timeout=GIT_NET_IDLE_S)
+    if rc != 0: log_append(logbox, "git fetch failed")
     return rc == 0
 
-def git_current_branch(repo):
-    rc, out, _ = run_cmd(["git", "rev-parse", "--abbrev-ref", "HEAD"], cwd=repo)
-    return out if rc == 0 else None
-
-def git_has_remote(repo, name):
+def git_ls_remote(repo, remote, branches):
+    """ขอ ref advertisement ของ HEAD + branches จาก remote (เบากว่า fetch มาก)
+    คืน (ok, default_branch, {refname: sha})"""
+    cmd = ["git", "ls-remote", "--symref", remote, "HEAD"] + [f"refs/heads/{b}" for b in branches]
+    rc, out, _ = run_cmd(cmd, cwd=repo, timeout=GIT_NET_TIMEOUT_S)
+    if rc != 0:
+        return False, None, {}
+    head, adv = None, {}
+    for line in out.splitlines():
+        left, _, ref = line.partition("\t")
+        if left.startswith("ref: refs/heads/") and ref == "HEAD":
+            head = left[len("ref: refs/heads/"):]
+        elif ref:
+            adv[ref] = left
+    return True, head, adv
+
+def _fetch_remote_if_changed(repo, remote, branches, info, logbox, silent=False):
+    """fetch เฉพาะ branch ที่ sha ฝั่ง remote ไม่ตรงกับ refs/remotes ที่มีอยู่; คืน (ok, spawns)"""
+    log = lambda line: log_append(logbox, f"[{remote}] {line}")
+    spawns = 1
+    ok, head, adv = git_ls_remote(repo, remote, sorted(branches))
+    if not ok:
+        rc, _ = run_cmd_stream(["git", "fetch", "--prune", remote], cwd=repo, on_line=log, idle_timeout=GIT_NET_IDLE_S)
+        return rc == 0, spawns + 1
+    wanted = set(branches) | ({head} if head else set())
+    stale, gone = [], False
+    for b in sorted(wanted):
+        local = info["shas"].get(f"refs/remotes/{remote}/{b}")
+        remote_sha = adv.get(f"refs/heads/{b}")
+        if remote_sha is None:
+            gone = gone or bool(local)
+        elif remote_sha != local:
+            stale.append(b)
+    rc = 0
+    if gone:
+        spawns += 1
+        rc, _ = run_cmd_stream(["git", "fetch", "--prune", remote], cwd=repo, on_line=log, idle_timeout=GIT_NET_IDLE_S)
+    elif stale:
+        spawns += 1
+        specs = [f"+refs/heads/{b}:refs/remotes/{remote}/{b}" for b in stale]
+        rc, _ = run_cmd_stream(["git", "fetch", remote] + specs, cwd=repo, on_line=log, idle_timeout=GIT_NET_IDLE_S)
+    elif not silent:
+        log("ไม่มีอะไรเปลี่ยน ข้าม fetch")
+    if rc == 0 and head and info["remote_heads"].get(remote) != f"{remote}/{head}" \
+            and (head in stale or f"refs/remotes/{remote}/{head}" in info["refs"]):
+        # ตั้ง refs/remotes/<remote>/HEAD ไว้ probe จะได้ไม่ต้องยิง `git remote show` ผ่าน network
+        spawns += 1
+        run_cmd(["git", "symbolic-ref", f"refs/remotes/{remote}/HEAD", f"refs/remotes/{remote}/{head}"], cwd=repo)
+    return rc == 0, spawns
+
+def git_fetch_smart(repo, logbox, silent=False):
+    """fetch แบบมีเงื่อนไข: เทียบ ls-remote กับ ref ที่รู้ล่าสุดก่อน, ดึงเฉพาะ refspec ที่ do_git_check ใช้
+    (default branch ของ upstream และ origin/<branch>) และ fetch upstream/origin พร้อมกัน
+    silent=True (auto-check เบื้องหลัง) ไม่ log กรณีไม่มีอะไรเปลี่ยน; คืน (ok, spawns)"""
+    info = git_read_refs(repo)
     rc, out, _ = run_cmd(["git", "remote"], cwd=repo)
-    return (rc == 0) and (name in out.splitlines())
-
-def git_default_remote_branch(repo, remote):
-    rc, out, _ = run_cmd(["git", "symbolic-ref", "-q", "--short", f"refs/remotes/{remote}/HEAD"], cwd=repo)
-    if rc == 0 and out: return out
-    rc, out, _ = run_cmd(["git", "remote", "show", remote], cwd=repo)
+    if not info or rc != 0:
+        return git_fetch_all(repo, logbox), 3
+    spawns = 2
+    remotes = set(out.splitlines())
+    branch = info["branch"] if info["branch"] not in (None, "HEAD") else None
+    jobs = {r: ({branch} if branch else set()) for r in ("upstream", "origin") if r in remotes}
+    if not jobs:
+        return True, spawns
+    with ThreadPoolExecutor(max_workers=len(jobs)) as pool:
+        futs = [pool.submit(scoped(_fetch_remote_if_changed), repo, r, b, info, logbox, silent)
+                for r, b in jobs.items()]
+        results = [f.result() for f in futs]
+    ok = all(r[0] for r in results)
+    spawns += sum(r[1] for r in results)
+    if not ok: log_append(logbox, "git fetch failed")
+    return ok, spawns
+
+def git_remote_show_head(repo, remote):
+    rc, out, _ = run_cmd(["git", "remote", "show", remote], cwd=repo, timeout=GIT_NET_TIMEOUT_S)
     if rc == 0:
         for line in out.splitlines():
             s = line.strip().lower()
             if s.startswith("head branch:"):
                 head = line.split(":",1)[1].strip()
-                return f"{remote}/{head}"
+                if head and head != "(unknown)":  # remote HEAD ชี้ branch ที่ไม่มีอยู่จริง
+                    return f"{remote}/{head}"
     return None
 
-def git_ahead_behind(repo, left, right):
-    rc, out, _ = run_cmd(["git", "rev-list", "--left-right", "--count", f"{left}...{right}"], cwd=repo)
-    if rc != 0 or not out: return None, None
-    try:
-        behind, ahead = out.split()
-        return int(behind), int(ahead)
-    except: return None, None
-
-def git_list_commits(repo, rev_range, limit=5):
-    rc, out, _ = run_cmd(["git", "log", "--oneline", rev_range, f"-n{limit}"], cwd=repo)
-    return out.splitlines() if rc == 0 and out else []
-
-def do_pull(repo, remote, branch, logbox):
-    rc, out, err = run_cmd(["git", "pull", "--rebase", remote, branch], cwd=repo)
-    if out: log_append(logbox, out)
-    if rc != 0: log_append(logbox, err or "git pull failed")
+_default_head_cache = {}  # (repo, remote) -> "remote/branch" จาก `git remote show` (network)
+
+def git_read_refs(repo):
+    """อ่าน branch ปัจจุบัน, remotes และ remote HEAD ทั้งหมดด้วย for-each-ref ครั้งเดียว"""
+    rc, out, _ = run_cmd(["git", "for-each-ref", "--format=%(refname)%09%(HEAD)%09%(objectname)%09%(symref)",
+                          "refs/heads", "refs/remotes"], cwd=repo)
+    if rc != 0:
+        return None
+    info = {"branch": None, "has_heads": False, "refs": set(), "shas": {}, "remotes": set(), "remote_heads": {}}
+    for line in out.splitlines():
+        ref, mark, sha, symref = (line.split("\t") + ["", "", ""])[:4]  # run_cmd strip() กินแท็บท้ายบรรทัดสุดท้าย
+        if not ref: continue
+        info["refs"].add(ref)
+        info["shas"][ref] = sha
+        if ref.startswith("refs/heads/"):
+            info["has_heads"] = True
+            if mark == "*":
+                info["branch"] = ref[len("refs/heads/"):]
+        elif ref.startswith("refs/remotes/"):
+            remote, _, name = ref[len("refs/remotes/"):].partition("/")
+            info["remotes"].add(remote)
+            if name == "HEAD" and symref.startswith("refs/remotes/"):
+                info["remote_heads"][remote] = symref[len("refs/remotes/"):]
+    if info["branch"] is None and info["has_heads"]:
+        info["branch"] = "HEAD"  # detached HEAD (ตรงกับ rev-parse --abbrev-ref)
+    return info
+
+def git_range_summary(repo, rev_range, limit=5):
+    """นับ commit ใน rev_range และคืน `limit` บรรทัดแรกแบบ "%h %s" ผ่าน CommitLog: rev-list ครั้งเดียว
+    + parse เฉพาะ commit ที่ยังไม่อยู่ใน commit cache (check รอบถัดไปที่ range เดิม/โตขึ้นไม่ต้อง format ทั้ง range ใหม่)
+    คืน (count หรือ None, lines, spawns)"""
+    clog = CommitLog(repo, rev_range)
+    if not clog.refresh():
+        return None, [], 1
+    rows = clog.rows(0, limit) if limit > 0 else []
+    return len(clog), [f"{c['short']} {c['subject']}" for c in rows], 1 + (1 if clog.parsed else 0)
+
+def git_status_probe(repo, limit=5):
+    """สถานะ branch/remote/ahead/behind แบบรวบ process: for-each-ref 1 ครั้ง + rev-list 1 ครั้งต่อเป้าหมาย
+    (+ git log เฉพาะเมื่อ commit ที่แสดงยังไม่อยู่ใน commit cache)
+    คืน dict ฟิลด์เดียวกับ do_git_check พร้อม 'spawns' = จำนวน process ที่ใช้"""
+    res = {"branch": None, "behind_upstream": 0, "ahead_origin": 0,
+           "upstream_target": None, "origin_target": None,
+           "behind_list": [], "ahead_list": [], "has_upstream": False, "spawns": 1}
+    info = git_read_refs(repo)
+    if not info or not info["branch"]:
+        return res
+    branch = info["branch"]
+    res["branch"] = branch
+
+    def _exists(target):
+        return f"refs/remotes/{target}" in info["refs"]
+
+    if "upstream" in info["remotes"]:
+        res["has_upstream"] = True
+        target = info["remote_heads"].get("upstream")
+        if not target:
+            key = (repo, "upstream")
+            target = _default_head_cache.get(key)
+            if target is None:
+                res["spawns"] += 1
+                target = git_remote_show_head(repo, "upstream")
+                if target:  # ล้มเหลว (offline/timeout) ไม่ cache -> check รอบหน้าถามใหม่
+                    _default_head_cache[key] = target
+        target = target or f"upstream/{branch}"
+        res["upstream_target"] = target
+        if _exists(target):
+            behind, lst, spawns = git_range_summary(repo, f"HEAD..{target}", limit)
+            res["spawns"] += spawns
+            if behind is not None:
+                res["behind_upstream"], res["behind_list"] = behind, lst
+
+    origin_target = f"origin/{branch}"
+    res["origin_target"] = origin_target
+    if _exists(origin_target):
+        ahead, lst, spawns = git_range_summary(repo, f"{origin_target}..HEAD", limit)
+        res["spawns"] += spawns
+        if ahead is not None:
+            res["ahead_origin"], res["ahead_list"] = ahead, lst
+    return res
+
+def do_pull(repo, remote, branch, logbox, autostash=False):
+    cmd = ["git", "pull", "--rebase"] + (["--autostash"] if autostash else []) + [remote, branch]
+    rc, _ = run_cmd_stream(cmd, cwd=repo, on_line=_log_line(logbox), idle_timeout=GIT_NET_IDLE_S)
+    if rc != 0: log_append(logbox, "git pull failed")
     return rc == 0
 
 def do_push(repo, remote, branch, logbox):
-    rc, out, err = run_cmd(["git", "push", remote, branch], cwd=repo)
-    if out: log_append(logbox, out)
-    if rc != 0: log_append(logbox, err or "git push failed")
+    rc, _ = run_cmd_stream(["git", "push", remote, branch], cwd=repo, on_line=_log_line(logbox),
+                           idle_timeout=GIT_NET_IDLE_S)
+    if rc != 0: log_append(logbox, "git push failed")
     return rc == 0
 
+# ===================== Working Tree Status =====================
+_git_version = None
+
+def git_version():
+    """(major, minor) ของ git ที่ติดตั้ง อ่านครั้งเดียวต่อ process"""
+    global _git_version
+    if _git_version is None:
+        rc, out, _ = run_cmd(["git", "version"])
+        m = re.search(r"(\d+)\.(\d+)", out) if rc == 0 else None
+        _git_version = (int(m.group(1)), int(m.group(2))) if m else (0, 0)
+    return _git_version
+
+def git_fsmonitor_usable(repo):
+    """builtin fsmonitor (git >= 2.36, Windows/macOS) และ repo ไม่ได้ตั้ง core.fsmonitor (เช่น hook ของ watchman) เอง"""
+    if git_version() < (2, 36) or not (os.name == "nt" or sys.platform == "darwin"):
+        return False
+    try:
+        with open(os.path.join(git_common_dir(git_dir_of(repo) or os.path.join(repo, ".git")), "config"),
+                  "r", encoding="utf-8", errors="replace") as f:
+            return "fsmonitor" not in f.read().lower()
+    except OSError:
+        return True
+
+def git_fast_status_cmd(repo, untracked=True):
+    """git status แบบเร็วสำหรับ checkout ใหญ่: porcelain v2, untracked cache, ไม่หา rename,
+    fsmonitor ถ้าใช้ได้; untracked=False = ดูแค่ index/ไฟล์ที่ track (ข้ามการเดิน Content/ หาไฟล์ใหม่)"""
+    cmd = ["git", "-c", "core.untrackedCache=true", "-c", "core.preloadIndex=true", "-c", "index.threads=true"]
+    if git_fsmonitor_usable(repo):
+        cmd += ["-c", "core.fsmonitor=true"]
+    return cmd + ["status", "--porcelain=v2", "-z", "--no-renames", "--ignore-submodules=dirty",
+                  "--untracked-files=" + ("normal" if untracked else "no")]
+
+def parse_status_v2(out, sample=5):
+    """นับ staged/unstaged/untracked/conflicted จาก `git status --porcelain=v2 -z`"""
+    res = {"staged": 0, "unstaged": 0, "untracked": 0, "conflicted": 0, "paths": []}
+    parts, i = out.split("\0"), 0
+    while i < len(parts):
+        rec = parts[i]
+        i += 1
+        kind = rec[:1]
+        if kind in ("1", "2"):
+            fields = rec.split(" ", 8 if kind == "1" else 9)
+            xy, path = fields[1], fields[-1]
+            if kind == "2":
+                i += 1  # path เดิมของ rename/copy
+            if xy[0] != ".": res["staged"] += 1
+            if xy[1] != ".": res["unstaged"] += 1
+        elif kind == "u":
+            res["conflicted"] += 1
+            path = rec.split(" ", 10)[-1]
+        elif kind == "?":
+            res["untracked"] += 1
+            path = rec[2:]
+        else:
+            continue
+        if len(res["paths"]) < sample:
+            res["paths"].append(path)
+    return res
+
+def git_worktree_status(repo, untracked=True, sample=5):
+    """สถานะ working tree: dict staged/unstaged/untracked/conflicted, dirty (= มีไฟล์ที่ track แก้อยู่) และ seconds"""
+    t0 = time.perf_counter()
+    rc, out, err = run_cmd(git_fast_status_cmd(repo, untracked), cwd=repo, strip=False)
+    if rc != 0:
+        return {"ok": False, "error": err.strip(), "seconds": time.perf_counter() - t0}
+    res = parse_status_v2(out, sample)
+    res["ok"] = True
+    res["dirty"] = bool(res["staged"] or res["unstaged"] or res["conflicted"])
+    res["seconds"] = round(time.perf_counter() - t0, 4)
+    return res
+
+def format_worktree(wt):
+    if not wt or not wt.get("ok"):
+        return "working tree: ตรวจไม่ได้"
+    if not (wt["dirty"] or wt["untracked"]):
+        return "working tree: สะอาด"
+    return (f"working tree: staged {wt['staged']}, unstaged {wt['unstaged']}, "
+            f"untracked {wt['untracked']}, conflicted {wt['conflicted']}")
+
+def compare_status_timing(repo, repeat=3):
+    """เวลา median ของ `git status` ปกติ (ไม่มี untracked cache/fsmonitor) เทียบกับ git_worktree_status"""
+    def median_of(fn):
+        times = []
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            fn()
+            times.append(time.perf_counter() - t0)
+        return sorted(times)[len(times) // 2]
+    plain = median_of(lambda: run_cmd(["git", "-c", "core.untrackedCache=false", "-c", "core.fsmonitor=false",
+                                       "status"], cwd=repo))
+    git_worktree_status(repo)  # รอบแรกเขียน untracked cache ลง index
+    fast = median_of(lambda: git_worktree_status(repo))
+    index_only = median_of(lambda: git_worktree_status(repo, untracked=False))
+    return {"plain": round(plain, 4), "fast": round(fast, 4), "index_only": round(index_only, 4),
+            "speedup": round(plain / fast, 2) if fast else None}
+
+# ===================== Commit Browser =====================
+COMMIT_FORMAT = "%H%x1f%h%x1f%an%x1f%at%x1f%s%x1e"
+
+class CommitCache:
+    """commit ที่ parse แล้ว sha -> [short, author, unix time, subject] ในหน่วยความจำ
+    และบนดิสก์แบบ append-only (โหลดครั้งแรกที่ใช้) -> เปิด view ใหม่/check หลัง fetch parse เฉพาะ commit ใหม่"""
+    def __init__(self, path=None):
+        self.path = path or COMMIT_CACHE_FILE
+        self._data = None
+        self._lock = threading.Lock()
+
+    def _load_locked(self):
+        if self._data is not None:
+            return
+        self._data = {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        sha, *rest = json.loads(line)
+                        self._data[sha] = rest
+                    except Exception:
+                        continue  # บรรทัดที่เขียนไม่จบตอนโปรแกรมปิด
+        except OSError:
+            pass
+
+    def get_many(self, shas):
+        with self._lock:
+            self._load_locked()
+            return {sha: self._data[sha] for sha in shas if sha in self._data}
+
+    def add_many(self, rows):
+        """rows: [[sha, short, author, time, subject], ...]"""
+        with self._lock:
+            self._load_locked()
+            new = [r for r in rows if r[0] not in self._data]
+            for r in new:
+                self._data[r[0]] = r[1:]
+            if not new:
+                return
+            try:
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write("".join(json.dumps(r, ensure_ascii=False) + "\n" for r in new))
+            except OSError:
+                pass
+
+    def __len__(self):
+        with self._lock:
+            self._load_locked()
+            return len(self._data)
+
+_commit_cache = None
+
+def commit_cache():
+    global _commit_cache
+    if _commit_cache is None:
+        _commit_cache = CommitCache()
+    return _commit_cache
+
+def git_parse_commits(repo, shas, chunk=COMMIT_PAGE_SIZE):
+    """parse commit ตาม SHA ที่ให้ (ลำดับเดิม) ด้วย git log --no-walk; แบ่ง chunk ไม่ให้ command line ยาวเกิน"""
+    rows = []
+    for i in range(0, len(shas), chunk):
+        rc, out, _ = run_cmd(["git", "log", "--no-walk=unsorted", f"--format={COMMIT_FORMAT}"] + shas[i:i + chunk],
+                             cwd=repo, strip=False)
+        if rc != 0:
+            break
+        for rec in out.split("\x1e"):
+            parts = rec.strip("\n").split("\x1f")
+            if len(parts) == 5:
+                sha, short, author, ts, subject = parts
+                rows.append([sha, short, author, int(ts or 0), subject])
+    return rows
+
+class CommitLog:
+    """commit ใน rev_range แบบแบ่งหน้า: rev-list ครั้งเดียวได้ SHA ทั้งหมด (ถูกแม้หลายหมื่น commit)
+    แล้ว parse เฉพาะหน้าที่ถูกขอและยังไม่อยู่ใน cache"""
+    def __init__(self, repo, rev_range, cache=None, page_size=COMMIT_PAGE_SIZE):
+        self.repo, self.rev_range = repo, rev_range
+        self.cache = cache if cache is not None else commit_cache()  # cache ว่างมี len 0 (falsy)
+        self.page_size = page_size
+        self.shas = []
+        self.parsed = 0  # จำนวน commit ที่ต้อง parse จาก git จริง (ไม่เจอใน cache)
+
+    def refresh(self):
+        rc, out, _ = run_cmd(["git", "rev-list", self.rev_range], cwd=self.repo)
+        if rc != 0:
+            return False
+        self.shas = out.split()
+        return True
+
+    def __len__(self):
+        return len(self.shas)
+
+    def rows(self, start, count=None):
+        """commit dict ของช่วง [start, start+count)"""
+        shas = self.shas[start:start + (count or self.page_size)]
+        have = self.cache.get_many(shas)
+        missing = [sha for sha in shas if sha not in have]
+        if missing:
+            parsed = git_parse_commits(self.repo, missing)
+            self.parsed += len(parsed)
+            self.cache.add_many(parsed)
+            have.update((r[0], r[1:]) for r in parsed)
+        return [{"sha": sha, "short": have[sha][0], "author": have[sha][1], "time": have[sha][2],
+                 "subject": have[sha][3]} for sha in shas if sha in have]
+
+    def page(self, index):
+        return self.rows(index * self.page_size)
+
+def format_commit(c):
+    when = time.strftime("%Y-%m-%d", time.localtime(c["time"])) if c["time"] else "?"
+    return f"{c['short']}  {when}  {c['author'][:16]:<16}  {c['subject']}"
+
 # ===================== Build / Open =====================
-def generate_project_files(ubt_path, uproject, logbox):
+def generate_project_files(ubt_path, uproject, logbox, cancel=None, low_priority=False):
     cmd = [ubt_path, "-ProjectFiles", f"-Project={uproject}", "-game", "-engine"]
     log_append(logbox, " ".join(cmd))
-    rc, out, err = run_cmd(cmd, cwd=os.path.dirname(uproject))
-    if out: log_append(logbox, out)
-    if rc != 0: log_append(logbox, err or "Generate Project Files failed")
+    rc, tail = run_cmd_stream(cmd, cwd=os.path.dirname(uproject), on_line=_log_line(logbox), cancel=cancel,
+                              idle_timeout=UBT_IDLE_S, low_priority=low_priority)
+    if rc != 0: log_tail_errors(logbox, tail, f"Generate Project Files failed (exit {rc})")
     return rc == 0
 
-def build_editor(ubt_path, uproject, logbox):
+def build_editor(ubt_path, uproject, logbox, cancel=None, analyzer=None, low_priority=False):
     proj_name = os.path.splitext(os.path.basename(uproject))[0]
     cmd = [ubt_path, f"{proj_name}Editor", "Win64", "Development",
            f"-Project={uproject}", "-WaitMutex", "-NoHotReloadFromIDE"]
     log_append(logbox, " ".join(cmd))
-    rc, out, err = run_cmd(cmd, cwd=os.path.dirname(uproject))
-    if out: log_append(logbox, out)
-    if rc != 0: log_append(logbox, err or "Build Editor failed")
+    on_line = _log_line(logbox)
+    if analyzer is not None:
+        log_line = on_line
+        def on_line(line):
+            analyzer.feed(line)
+            log_line(line)
+    rc, tail = run_cmd_stream(cmd, cwd=os.path.dirname(uproject), on_line=on_line, cancel=cancel,
+                              idle_timeout=UBT_IDLE_S, low_priority=low_priority)
+    if rc != 0: log_tail_errors(logbox, tail, f"Build Editor failed (exit {rc})")
     return rc == 0
 
-def open_project(editor_exe, uproject, logbox):
+def open_project(editor_exe, uproject, logbox, profiler=None):
+    """เปิด editor (ไม่ผูกกับ SUPERVISOR: ปิด launcher แล้ว editor ต้องอยู่ต่อ)
+    profiler (EditorStartupProfiler ที่สร้างก่อนเรียก) -> เริ่ม tail log ของ process นี้"""
     if not os.path.isfile(editor_exe):
         log_append(logbox, "UnrealEditor.exe not found")
         return False
     cmd = [editor_exe, uproject]
     log_append(logbox, " ".join(cmd))
     try:
-        subprocess.Popen(cmd, cwd=os.path.dirname(uproject))
+        p = subprocess.Popen(cmd, cwd=os.path.dirname(uproject))
+        if profiler is not None:
+            profiler.start(p)
         return True
     except Exception as e:
         log_append(logbox, f"Failed to launch editor: {e}")
         return False
 
-# ===================== UI Components =====================
-def big_button(master, text, cmd):
-    return ctk.CTkButton(
-        master, text=text, command=cmd,
-        fg_color=UE_BTN, hover_color=UE_BTN_HOVER, text_color=UE_TEXT,
-        corner_radius=10, border_width=1, border_color=UE_BORDER,
-        height=40, font=ctk.CTkFont(size=13, weight="bold")
-    )
-
-def small_button(master, text, cmd):
-    return ctk.CTkButton(
-        master, text=text, command=cmd,
-        fg_color=UE_BTN, hover_color=UE_BTN_HOVER, text_color=UE_TEXT,
-        corner_radius=10, border_width=1, border_color=UE_BORDER,
-        height=34, font=ctk.CTkFont(size=12)
-    )
-
-class SettingsDialog(ctk.CTkToplevel):
-    def __init__(self, parent, state_like, on_saved):
-        super().__init__(parent)
-        self.title("Settings")
-        self.geometry("860x420")
-        self.configure(fg_color=UE_PANEL)
-        set_window_icon(self)  # << ไอคอนกลม
-        self.grab_set()
-        self.state_like = state_like
-        self.on_saved = on_saved
-
-        self.vars = {
-            "engine_dir": ctk.StringVar(value=state_like["engine_dir"].get()),
-            "uproject":   ctk.StringVar(value=state_like["uproject"].get()),
-            "ubt":        ctk.StringVar(value=state_like["ubt"].get()),
-            "editor":     ctk.StringVar(value=state_like["editor"].get()),
-            "autogen":    ctk.BooleanVar(value=state_like["autogen"].get()),
-            "autobuild":  ctk.BooleanVar(value=state_like["autobuild"].get()),
-            "auto_check": ctk.BooleanVar(value=state_like["auto_check"].get()),
-        }
-
-        frm = ctk.CTkFrame(self, fg_color=UE_PANEL, border_color=UE_BORDER, border_width=1, corner_radius=12)
-        frm.pack(fill="both", expand=True, padx=12, pady=12)
-        frm.grid_columnconfigure(1, weight=1)
-
-        row = 0
-        def add_row(label, var, browse=None, placeholder=""):
-            nonlocal row
-            ctk.CTkLabel(frm, text=label, text_color=UE_TEXT_MUTED).grid(row=row, column=0, sticky="w", padx=12, pady=(10,0))
-            entry = ctk.CTkEntry(frm, textvariable=var, placeholder_text=placeholder,
-                                 fg_color=UE_BG, border_color=UE_BORDER, text_color=UE_TEXT, corner_radius=8)
-            entry.grid(row=row, column=1, sticky="we", padx=8, pady=(10,0))
-            if browse:
-                small_button(frm, "Browse", browse).grid(row=row, column=2, padx=8, pady=(10,0))
-            row += 1
-            return entry
-
-        add_row("Engine Folder (UE_5.4.x):", self.vars["engine_dir"],
-                browse=self.browse_engine, placeholder="E:/UE_5.4")
-
-        add_row(".uproject:", self.vars["uproject"],
-                browse=self.browse_uproject, placeholder="E:/Project/MyProj.uproject")
-
-        add_row("UnrealBuildTool.exe:", self.vars["ubt"], placeholder=".../UnrealBuildTool.exe")
-        small_button(frm, "Detect", self.detect_tools).grid(row=row-1, column=2, padx=8, pady=(10,0))
-
-        add_row("UnrealEditor.exe:", self.vars["editor"], placeholder=".../UnrealEditor.exe")
-
-        toggles = ctk.CTkFrame(frm, fg_color=UE_PANEL)
-        toggles.grid(row=row, column=0, columnspan=3, sticky="we", padx=8, pady=(10,0))
-        row += 1
-        for tvar, text in [
-            (self.vars["autogen"],   "Generate Project Files ก่อนเปิด"),
-            (self.vars["autobuild"], "Build Editor ก่อนเปิด"),
-            (self.vars["auto_check"], f"Auto-check Git ทุก {CHECK_INTERVAL_MS//1000} วิ"),
-        ]:
-            sw = ctk.CTkSwitch(toggles, text=text, variable=tvar,
-                               fg_color=UE_BORDER, progress_color=UE_ACCENT,
-                               button_color=UE_BTN, button_hover_color=UE_BTN_HOVER,
-                               text_color=UE_TEXT)
-            sw.pack(side="left", padx=10)
-
-        footer = ctk.CTkFrame(self, fg_color=UE_PANEL)
-        footer.pack(fill="x", pady=(0,12))
-        small_button(footer, "Save", self.save).pack(side="right", padx=(0,10))
-        small_button(footer, "Cancel", self.destroy).pack(side="right", padx=10)
-
-    # ---- actions ----
-    def browse_engine(self):
-        d = filedialog.askdirectory(title="Select UE Engine Folder")
-        if d: self.vars["engine_dir"].set(d)
-
-    def browse_uproject(self):
-        f = filedialog.askopenfilename(title="Select .uproject", filetypes=[("Unreal Project", "*.uproject")])
-        if f: self.vars["uproject"].set(f)
-
-    def detect_tools(self):
-        ubt, editor = autodetect_tools(self.vars["engine_dir"].get())
-        if ubt: self.vars["ubt"].set(ubt)
-        if editor: self.vars["editor"].set(editor)
-        messagebox.showinfo("Detect", "ตรวจพบเครื่องมือแล้ว (ถ้ามี)")
-
-    def save(self):
-        for k, v in self.vars.items():
-            self.state_like[k].set(v.get())
-        save_settings(self.state_like)
-        if self.on_saved: self.on_saved()
-        self.destroy()
-
-# ===================== App =====================
-class App(ctk.CTk):
-    def __init__(self):
-        super().__init__()
-        self.title("Rewind and Desires Launcher")  # << เปลี่ยนชื่อโปรแกรมที่ Titlebar
-        self.geometry("900x560")
-        self.configure(fg_color=UE_BG)
-        set_window_icon(self)  # << โลโก้กลม
-
-        # ---- shared ctx (อย่าใช้ชื่อ 'state') ----
-        self.ctx = {
-            "engine_dir": ctk.StringVar(),
-            "uproject":   ctk.StringVar(),
-            "autobuild":  ctk.BooleanVar(),
-            "autogen":    ctk.BooleanVar(),
-            "auto_check": ctk.BooleanVar(),
-            "ubt":        ctk.StringVar(),
-            "editor":     ctk.StringVar(),
-            "bg_job":     None,
-        }
-        for k, v in load_settings().items():
-            if k in self.ctx:
-                if isinstance(self.ctx[k], ctk.BooleanVar):
-                    self.ctx[k].set(bool(v))
-                else:
-                    self.ctx[k].set(v)
-
-        # ---- top bar ----
-        top = ctk.CTkFrame(self, fg_color=UE_PANEL, border_color=UE_BORDER, border_width=1, corner_radius=12)
-        top.pack(fill="x", padx=12, pady=12)
-
-        big_button(top, "Open Project", self.do_open_sequence).pack(side="left", padx=8, pady=8)
-        big_button(top, "Check Git Now", self.do_check_now).pack(side="left", padx=8, pady=8)
-        big_button(top, "Settings", self.open_settings).pack(side="right", padx=8, pady=8)
-
-        # ---- log box ----
-        self.log = ctk.CTkTextbox(self, fg_color=UE_PANEL, border_color=UE_BORDER,
-                                  border_width=1, corner_radius=12, text_color=UE_TEXT)
-        self.log.pack(fill="both", expand=True, padx=12, pady=(0,12))
-        self.log.configure(state="disabled")
-
-        if not self.ctx["uproject"].get() or not self.ctx["editor"].get():
-            self.after(300, self.open_settings)
+# ===================== Build Timing =====================
+UBT_ACTION_RE = re.compile(r"^\s*\[(\d+)/(\d+)\]\s+(\w+)\s+(?:\[[^\]]*\]\s+)?(.+?)\s*$")
+UBT_TOTAL_RE = re.compile(r"^\s*(Total time in .+?|Total execution time):\s*([\d.]+)\s*seconds", re.I)
+
+def ubt_source_modules(project_dir):
+    """{ชื่อไฟล์ (lower): module} ของ source ใต้ Source/ และ Plugins/ โดย module = โฟลเดอร์ที่มี <Module>.Build.cs
+    ใช้แปลงบรรทัด UBT ที่มีแต่ชื่อไฟล์ (adaptive unity/ไฟล์ที่แก้อยู่) กลับเป็น module"""
+    index, dir_module = {}, {}
+    for top in ("Source", "Plugins"):
+        for dirpath, dirnames, filenames in os.walk(os.path.join(project_dir, top)):  # top-down: แม่มาก่อนลูก
+            dirnames[:] = [d for d in dirnames if d.lower() not in FP_SKIP_DIRS]
+            build_cs = [f for f in filenames if f.endswith(".Build.cs")]
+            module = build_cs[0][:-len(".Build.cs")] if build_cs else dir_module.get(os.path.dirname(dirpath))
+            if module is None:
+                continue
+            dir_module[dirpath] = module
+            for f in filenames:
+                if os.path.splitext(f)[1].lower() in (".cpp", ".c", ".cc", ".h", ".hpp", ".inl", ".ispc"):
+                    index.setdefault(f.lower(), module)
+    return index
+
+def ubt_module_of(action, item, source_modules=None):
+    """module ของ item ใน output ของ UBT: จาก path (Source/<Module>/..., Intermediate/.../<Module>/<file>)
+    -> ชื่อไฟล์ที่ UBT ตั้งตาม module (Module.X.N.cpp, SharedPCH.X..., UnrealEditor-X.dll)
+    -> ค้นชื่อไฟล์ใน source_modules; ไม่รู้ = "?" (ไม่เดาจากชื่อไฟล์)"""
+    parts = [p for p in re.split(r"[\\/]+", item.strip('"')) if p]
+    lower = [p.lower() for p in parts]
+    if "source" in lower[:-1]:
+        i = len(lower) - 1 - lower[::-1].index("source")
+        if lower[i + 1] in ("runtime", "editor", "developer", "programs", "thirdparty"):
+            i += 1  # Engine/Source/Runtime/<Module>/...
+        if i + 2 < len(parts):  # Source/<Module>/<...>/file (ไม่ใช่ Source/<file>)
+            return parts[i + 1]
+    if "intermediate" in lower[:-1] and len(parts) - lower.index("intermediate") > 3:
+        return parts[-2]  # UBT วาง object/response ไว้ในโฟลเดอร์ของ module
+    base = parts[-1] if parts else ""
+    m = re.match(r"^(?:Module|SharedPCH|PCH)\.([A-Za-z0-9_]+)", base)
+    if m:
+        return m.group(1)
+    m = re.match(r"^(?:UnrealEditor|UE4Editor|UE5Editor)-([A-Za-z0-9_]+?)(?:-Win64-\w+)?\.(?:dll|lib|exe)$", base, re.I)
+    if m:
+        return m.group(1)
+    return (source_modules or {}).get(base.lower(), "?")
+
+class UbtBuildAnalyzer:
+    """อ่าน output ของ UBT ระหว่าง stream: ความคืบหน้า [n/m] + ETA และ completion interval ต่อไฟล์/ต่อ module
+    UBT พิมพ์ [n/m] ตอน action เสร็จ (หลาย action รันขนานกัน) ตัวเลขต่อไฟล์จึงเป็น "ช่วงห่างจาก action ก่อนหน้าเสร็จ"
+    ไม่ใช่เวลา compile ของไฟล์นั้น: ใช้ดูว่าส่วนไหนของ build กินเวลา wall-clock ไม่ใช่จับเวลา compiler"""
+    metric = "completion_interval"
+
+    def __init__(self, on_progress=None, clock=time.monotonic, source_modules=None):
+        self.on_progress = on_progress
+        self.clock = clock
+        self.source_modules = source_modules or {}
+        self.t0 = clock()
+        self._last = self.t0
+        self.done = self.total = 0
+        self.files = {}    # item -> วินาที (completion interval)
+        self.modules = {}  # module -> วินาที (completion interval)
+        self.kinds = {}    # Compile/Link/... -> count
+        self.totals = {}   # บรรทัด Total time ของ UBT
+
+    def feed(self, line):
+        m = UBT_ACTION_RE.match(line)
+        if m:
+            now = self.clock()
+            dt, self._last = now - self._last, now
+            n, total, kind, item = int(m.group(1)), int(m.group(2)), m.group(3), m.group(4)
+            self.done, self.total = max(self.done, n), max(self.total, total)
+            self.files[item] = self.files.get(item, 0.0) + dt
+            mod = ubt_module_of(kind, item, self.source_modules)
+            self.modules[mod] = self.modules.get(mod, 0.0) + dt
+            self.kinds[kind] = self.kinds.get(kind, 0) + 1
+            if self.on_progress:
+                try: self.on_progress(self.done, self.total, self.eta())
+                except Exception: pass
+            return
+        m = UBT_TOTAL_RE.match(line)
+        if m:
+            self.totals[m.group(1)] = float(m.group(2))
+
+    def eta(self):
+        if not self.done or not self.total:
+            return None
+        elapsed = self.clock() - self.t0
+        return elapsed / self.done * max(0, self.total - self.done)
+
+    def report(self, top=None):
+        files = sorted(self.files.items(), key=lambda kv: -kv[1])
+        mods = sorted(self.modules.items(), key=lambda kv: -kv[1])
+        return {"finished_at": time.time(), "elapsed": round(self.clock() - self.t0, 3), "metric": self.metric,
+                "actions": self.done, "total_actions": self.total, "kinds": self.kinds, "ubt_totals": self.totals,
+                "modules": [[k, round(v, 3)] for k, v in mods[:top]],
+                "files": [[k, round(v, 3)] for k, v in files[:top]]}
+
+def save_build_timing(report, uproject, timing_dir=None):
+    timing_dir = os.path.join(timing_dir or BUILD_TIMING_DIR, os.path.splitext(os.path.basename(uproject))[0])
+    os.makedirs(timing_dir, exist_ok=True)
+    path = os.path.join(timing_dir, time.strftime("build_%Y%m%d_%H%M%S.json", time.localtime(report["finished_at"])))
+    save_json_file(path, report)
+    return path
+
+def load_build_timings(uproject, timing_dir=None, limit=2):
+    """report ล่าสุด `limit` ตัว (ใหม่สุดก่อน)"""
+    timing_dir = os.path.join(timing_dir or BUILD_TIMING_DIR, os.path.splitext(os.path.basename(uproject))[0])
+    try:
+        names = sorted((n for n in os.listdir(timing_dir) if n.endswith(".json")), reverse=True)
+    except OSError:
+        return []
+    return [load_json_file(os.path.join(timing_dir, n), {}) for n in names[:limit]]
+
+def compare_build_timings(prev, cur, key="files", top=10, min_delta=0.1):
+    """รายการที่เวลาเพิ่มขึ้นมากสุดจาก prev -> cur: [(name, prev_s, cur_s, delta)] (ตัด noise < min_delta วินาที)"""
+    before = dict(prev.get(key, []))
+    rows = [(name, before.get(name, 0.0), sec, sec - before.get(name, 0.0)) for name, sec in cur.get(key, [])]
+    rows.sort(key=lambda r: -r[3])
+    return [r for r in rows[:top] if r[3] >= min_delta]
+
+def format_build_histogram(report, key="modules", top=10, width=30):
+    rows = report.get(key, [])[:top]
+    if not rows:
+        return ""
+    peak = max(sec for _, sec in rows) or 1.0
+    name_w = max(len(name) for name, _ in rows)
+    return "\n".join(f"{name.ljust(name_w)} {sec:8.2f}s {'#' * max(1, int(width * sec / peak))}" for name, sec in rows)
+
+def log_build_timing(report, prev, logbox):
+    log_append(logbox, f"=== Build timing: {report['actions']}/{report['total_actions']} actions, {report['elapsed']:.1f}s ===")
+    hist = format_build_histogram(report)
+    if hist:
+        log_append(logbox, "module ตาม completion interval (ช่วงห่างระหว่าง action เสร็จ ไม่ใช่เวลา compile):")
+        log_append(logbox, hist)
+    if prev:
+        slower = compare_build_timings(prev, report)
+        if slower:
+            log_append(logbox, "ไฟล์ที่ completion interval ยาวขึ้นจาก build ก่อน:")
+            for name, before, after, delta in slower:
+                log_append(logbox, f"  {name}: {before:.2f}s -> {after:.2f}s (+{delta:.2f}s)")
+
+# ===================== Build Fingerprint =====================
+FP_SKIP_DIRS = {"binaries", "intermediate", "saved", "content", "deriveddatacache", ".git", ".vs"}
+
+def load_json_file(path, default):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception:
+        return default
 
-        self.after(1000, self.schedule_auto_check)
-        self.protocol("WM_DELETE_WINDOW", self.on_close)
+def save_json_file(path, data):
+    """เขียนแบบ atomic ผ่านไฟล์ชั่วคราวชื่อไม่ซ้ำในโฟลเดอร์เดียวกัน (ผู้เขียนหลายคนไม่ทับ .tmp ของกันและกัน)"""
+    fd, tmp = tempfile.mkstemp(prefix=os.path.basename(path) + ".", suffix=".tmp",
+                               dir=os.path.dirname(os.path.abspath(path)))
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp, path)
+    except BaseException:
+        try: os.remove(tmp)
+        except OSError: pass
+        raise
+
+_json_edit_lock = threading.RLock()  # open graph กับ prebuild thread แก้ build cache ไฟล์เดียวกัน
+
+@contextmanager
+def edit_json_file(path):
+    """load -> ผู้เรียกแก้ dict -> save ภายใต้ lock เดียว (ไม่ให้สอง thread ทับ entry ของกันและกัน)
+    อย่าทำงานหนักใน block นี้: thread อื่นที่จะแก้ไฟล์ต้องรอ"""
+    with _json_edit_lock:
+        data = load_json_file(path, {})
+        yield data
+        try: save_json_file(path, data)
+        except OSError: pass
+
+def iter_build_inputs(uproject):
+    """ไฟล์ที่มีผลต่อ build: .uproject, Source/**, Plugins/**/Source/**, *.uplugin (path แบบ relative)"""
+    proj_dir = os.path.dirname(os.path.abspath(uproject))
+    yield os.path.basename(uproject)
+    def walk(top, want=None):
+        for root, dirs, files in os.walk(top):
+            dirs[:] = sorted(d for d in dirs if d.lower() not in FP_SKIP_DIRS)
+            for f in sorted(files):
+                if want is None or f.lower().endswith(want):
+                    yield os.path.relpath(os.path.join(root, f), proj_dir).replace("\\", "/")
+    yield from walk(os.path.join(proj_dir, "Source"))
+    plugins = os.path.join(proj_dir, "Plugins")
+    for root, dirs, files in os.walk(plugins):
+        dirs[:] = sorted(d for d in dirs if d.lower() not in FP_SKIP_DIRS)
+        for f in sorted(files):
+            if f.lower().endswith(".uplugin"):
+                yield os.path.relpath(os.path.join(root, f), proj_dir).replace("\\", "/")
+        if "Source" in dirs:
+            dirs.remove("Source")
+            yield from walk(os.path.join(root, "Source"))
+
+def _hash_file(path):
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+def build_fingerprint(uproject, engine_key, index=None):
+    """fingerprint ของ build inputs + engine; rehash เฉพาะไฟล์ที่ mtime/size เปลี่ยน
+    คืน (fingerprint, index ใหม่, จำนวนไฟล์ที่ rehash)"""
+    proj_dir = os.path.dirname(os.path.abspath(uproject))
+    index = index or {}
+    new_index, rehashed = {}, 0
+    h = hashlib.sha1(f"engine={engine_key}\n".encode("utf-8"))
+    for rel in iter_build_inputs(uproject):
+        path = os.path.join(proj_dir, rel)
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        old = index.get(rel)
+        if old and old[0] == st.st_mtime_ns and old[1] == st.st_size:
+            digest = old[2]
+        else:
+            try: digest = _hash_file(path)
+            except OSError: continue
+            rehashed += 1
+        new_index[rel] = [st.st_mtime_ns, st.st_size, digest]
+        h.update(f"{rel}\0{digest}\n".encode("utf-8"))
+    return h.hexdigest(), new_index, rehashed
+
+def build_up_to_date(uproject, engine_key, cache_file=None):
+    """คืน (up_to_date, fingerprint) และบันทึก index ล่าสุดไว้ให้รอบหน้าเช็คเร็ว"""
+    cache_file = cache_file or BUILD_CACHE_FILE
+    key = os.path.normcase(os.path.abspath(uproject))
+    with _json_edit_lock:
+        entry = load_json_file(cache_file, {}).get(key, {})
+    fp, index, _ = build_fingerprint(uproject, engine_key, entry.get("index"))  # hash นอก lock
+    with edit_json_file(cache_file) as cache:
+        entry = cache.setdefault(key, {})
+        entry["index"] = index
+    has_source = any(rel.startswith("Source/") for rel in index)
+    binaries = os.path.join(os.path.dirname(os.path.abspath(uproject)), "Binaries")
+    ok = entry.get("last_ok") == fp and (not has_source or os.path.isdir(binaries))
+    return ok, fp
+
+def record_build_ok(uproject, fingerprint, cache_file=None):
+    cache_file = cache_file or BUILD_CACHE_FILE
+    key = os.path.normcase(os.path.abspath(uproject))
+    with edit_json_file(cache_file) as cache:
+        cache.setdefault(key, {})["last_ok"] = fingerprint
+
+# ===================== Project Files Decision =====================
+def git_head_sha(repo):
+    rc, out, _ = run_cmd(["git", "rev-parse", "HEAD"], cwd=repo)
+    return out if rc == 0 and out else None
+
+def _project_pathspecs(repo, uproject):
+    prefix = os.path.relpath(os.path.dirname(os.path.abspath(uproject)), repo).replace("\\", "/")
+    prefix = "" if prefix == "." else prefix + "/"
+    return [f"{prefix}Source", f"{prefix}Plugins", f"{prefix}*.uproject"]
+
+def git_changed_paths(repo, base, head, pathspecs):
+    """[(status, path)] ระหว่างสอง commit (status = A/D/M/R...) หรือ None ถ้า diff ไม่ได้"""
+    rc, out, _ = run_cmd(["git", "diff", "--name-status", "-z", "-M", base, head, "--"] + pathspecs, cwd=repo, strip=False)
+    if rc != 0:
+        return None
+    parts, entries, i = out.split("\0"), [], 0
+    while i < len(parts):
+        st = parts[i][:1]
+        if not st: i += 1; continue
+        if st in "RC":
+            entries.append((st, parts[i + 2] if i + 2 < len(parts) else ""))
+            i += 3
+        else:
+            entries.append((st, parts[i + 1] if i + 1 < len(parts) else ""))
+            i += 2
+    return entries
+
+def git_dirty_paths(repo, pathspecs):
+    """[(status, path)] ของ working tree (untracked นับเป็น A)"""
+    rc, out, _ = run_cmd(["git", "status", "--porcelain=v1", "-z", "--untracked-files=all", "--"] + pathspecs, cwd=repo, strip=False)
+    if rc != 0:
+        return []
+    parts, entries, i = out.split("\0"), [], 0
+    while i < len(parts):
+        rec = parts[i]
+        i += 1
+        if len(rec) < 4: continue
+        xy, path = rec[:2], rec[3:]
+        if "R" in xy or "C" in xy:
+            i += 1  # ชื่อเดิมของไฟล์ที่ถูก rename
+        st = "A" if xy == "??" or "A" in xy else "D" if "D" in xy else "R" if "R" in xy else "M"
+        entries.append((st, path))
+    return entries
+
+def classify_project_changes(entries):
+    """คืนรายการเหตุผลที่ต้อง generate project files ใหม่ (ว่าง = ไม่ต้อง)"""
+    reasons = {}
+    for st, path in entries:
+        lp = "/" + path.lower()
+        if lp.endswith((".build.cs", ".target.cs")):
+            label = ".Build.cs/.Target.cs เปลี่ยน"
+        elif lp.endswith(".uplugin"):
+            label = "เพิ่ม plugin" if st == "A" else "ลบ plugin" if st == "D" else ".uplugin เปลี่ยน"
+        elif lp.endswith(".uproject"):
+            label = ".uproject เปลี่ยน"
+        elif st in ("A", "D", "R") and "/source/" in lp:
+            label = "เพิ่ม/ลบไฟล์ใน Source"
+        else:
+            continue
+        reasons.setdefault(label, path)
+    return [f"{label} ({path})" for label, path in reasons.items()]
+
+def project_files_needed(uproject, pull_range=None, cache_file=None):
+    """ตัดสินว่าต้องรัน UBT -ProjectFiles ไหม จาก diff ตั้งแต่ generate ครั้งล่าสุด (หรือช่วงที่ pull)
+    และไฟล์ที่เปลี่ยนใน working tree; คืน (needed, reason, state สำหรับ record_project_files)"""
+    repo = get_repo_root_from_uproject(uproject)
+    if not repo:
+        return True, "ไม่พบ git repo", None
+    proj_dir = os.path.dirname(os.path.abspath(uproject))
+    head = git_head_sha(repo)
+    specs = _project_pathspecs(repo, uproject)
+    dirty = sorted(f"{st} {p}" for st, p in git_dirty_paths(repo, specs)
+                   if classify_project_changes([(st, p)]))
+    state = {"sha": head, "dirty": dirty}
+    if not any(f.lower().endswith((".sln", ".xcworkspace", ".code-workspace")) for f in os.listdir(proj_dir)):
+        return True, "ยังไม่มีไฟล์ project/solution", state
+    key = os.path.normcase(os.path.abspath(uproject))
+    gen = load_json_file(cache_file or BUILD_CACHE_FILE, {}).get(key, {}).get("gen", {})
+    base = gen.get("sha") or (pull_range[0] if pull_range else None)
+    if not base or not head:
+        return True, "ไม่มีประวัติการ generate", state
+    reasons = []
+    prev_dirty = set(gen.get("dirty", []))
+    if base != head:
+        changed = git_changed_paths(repo, base, head, specs)
+        if changed is None:
+            return True, f"diff {base[:10]}..{head[:10]} ไม่ได้", state
+        # ไฟล์ที่ generate ไปแล้วตอนยังเป็น local change ไม่ต้องนับซ้ำเมื่อถูก commit
+        reasons += classify_project_changes([(st, p) for st, p in changed if f"{st} {p}" not in prev_dirty])
+    new_dirty = [d.split(" ", 1) for d in dirty if d not in prev_dirty]
+    reasons += [f"working tree: {r}" for r in classify_project_changes(new_dirty)]
+    if reasons:
+        return True, "; ".join(reasons), state
+    return False, f"module layout ไม่เปลี่ยน ({base[:10]}..{head[:10]})", state
+
+def record_project_files(uproject, state, cache_file=None):
+    if not state: return
+    cache_file = cache_file or BUILD_CACHE_FILE
+    key = os.path.normcase(os.path.abspath(uproject))
+    with edit_json_file(cache_file) as cache:
+        cache.setdefault(key, {})["gen"] = state
+
+# ===================== Shadow Prebuild =====================
+def shadow_worktree_dir(repo):
+    return os.path.normpath(repo).rstrip("\\/") + PREBUILD_SUFFIX
+
+def git_rev_sha(repo, rev):
+    rc, out, _ = run_cmd(["git", "rev-parse", "--verify", "-q", f"{rev}^{{commit}}"], cwd=repo)
+    return out if rc == 0 and out else None
+
+def ensure_shadow_worktree(repo, uproject, sha, logbox=None):
+    """สร้าง/ย้าย worktree เงา (detached) ไปที่ sha โดยไม่แตะ working tree ของผู้ใช้
+    checkout แบบ sparse เฉพาะ Source/Plugins/Config + ไฟล์ราก (Content หลาย GB ไม่มีผลกับ build)
+    คืน path ของ .uproject ในเงา หรือ None"""
+    shadow = shadow_worktree_dir(repo)
+    if not os.path.exists(os.path.join(shadow, ".git")):
+        run_cmd(["git", "worktree", "prune"], cwd=repo)  # เงาที่ถูกลบทิ้งด้วยมือยังค้างใน .git/worktrees
+        rc, _, err = run_cmd(["git", "worktree", "add", "--detach", "--no-checkout", shadow, sha], cwd=repo)
+        if rc != 0:
+            log_append(logbox, f"[prebuild] สร้าง worktree ไม่ได้: {err}")
+            return None
+        prefix = os.path.relpath(os.path.dirname(os.path.abspath(uproject)), repo).replace("\\", "/")
+        prefix = "" if prefix == "." else prefix + "/"
+        # git ที่ไม่มี sparse-checkout (< 2.25) -> ได้ทั้ง tree แทน ช้ากว่าแต่ใช้ได้
+        run_cmd(["git", "sparse-checkout", "set", "--cone"] + [prefix + d for d in ("Source", "Plugins", "Config")],
+                cwd=shadow)
+    rc, _, err = run_cmd(["git", "checkout", "-q", "--force", "--detach", sha], cwd=shadow, timeout=0)  # ครั้งแรกอาจนาน; ยกเลิกได้ทาง cancel_scope
+    if rc != 0:
+        log_append(logbox, f"[prebuild] checkout {sha[:10]} ไม่ได้: {err}")
+        return None
+    return os.path.join(shadow, os.path.relpath(os.path.abspath(uproject), repo))
+
+def prebuild_upstream(settings, repo, sha, logbox=None, cache_file=None):
+    """Generate + Build commit sha ใน worktree เงาด้วย priority ต่ำ ตอนผู้ใช้ยังไม่ pull
+    บันทึก fingerprint ของเงาไว้ใต้ .uproject จริง (key "prebuild") ให้ adopt_prebuild ใช้หลัง pull
+    ยกเลิกได้ด้วย cancel_scope; คืน state หรือ None ถ้าทำไม่ได้"""
+    uproject, ubt = settings.get("uproject") or "", settings.get("ubt") or ""
+    if not os.path.isfile(uproject) or not os.path.isfile(ubt):
+        log_append(logbox, "[prebuild] ต้องตั้งค่า .uproject และ UnrealBuildTool.exe ก่อน")
+        return None
+    cache_file = cache_file or BUILD_CACHE_FILE
+    key = os.path.normcase(os.path.abspath(uproject))
+    prev = load_json_file(cache_file, {}).get(key, {}).get("prebuild") or {}
+    if prev.get("ok") and prev.get("sha") == sha:
+        log_append(logbox, f"[prebuild] {sha[:10]} build ไว้แล้ว")
+        return prev
+    t0 = time.perf_counter()
+    log_append(logbox, f"[prebuild] เริ่ม build {sha[:10]} ล่วงหน้าใน {shadow_worktree_dir(repo)}")
+    shadow_up = ensure_shadow_worktree(repo, uproject, sha, logbox)
+    if not shadow_up or not os.path.isfile(shadow_up):
+        return None
+    engine_key = f"{(settings.get('engine_dir') or '').strip()}|{ubt}"
+    state = {"sha": sha, "uproject": shadow_up, "ok": False, "fp": None, "finished_at": None}
+    ok = (generate_project_files(ubt, shadow_up, logbox, low_priority=True)
+          and build_editor(ubt, shadow_up, logbox, low_priority=True))
+    if ok:
+        _, state["fp"] = build_up_to_date(shadow_up, engine_key, cache_file)
+        state["ok"] = True
+    state["finished_at"] = time.time()
+    state["seconds"] = round(time.perf_counter() - t0, 3)
+    with edit_json_file(cache_file) as cache:
+        cache.setdefault(key, {})["prebuild"] = state
+    log_append(logbox, f"[prebuild] {sha[:10]} {'สำเร็จ' if ok else 'ล้มเหลว'} ({state['seconds']:.1f}s)")
+    return state
+
+def prebuild_binary_dirs(proj_dir):
+    """Binaries ของโปรเจกต์และของทุก plugin ที่มีอยู่ใน proj_dir (path แบบ relative)"""
+    out = ["Binaries"]
+    for root, dirs, files in os.walk(os.path.join(proj_dir, "Plugins")):
+        dirs[:] = [d for d in dirs if d.lower() not in FP_SKIP_DIRS]
+        if any(f.lower().endswith(".uplugin") for f in files):
+            out.append(os.path.relpath(os.path.join(root, "Binaries"), proj_dir))
+            dirs[:] = []
+    return [rel for rel in out if os.path.isdir(os.path.join(proj_dir, rel))]
+
+def adopt_prebuild(uproject, fingerprint, logbox=None, cache_file=None):
+    """ถ้า prebuild ล่าสุดมี fingerprint ตรงกับ tree ปัจจุบัน -> สลับโฟลเดอร์ Binaries จากเงามาใช้ (rename)
+    แล้วบันทึกว่า build ผ่านแล้ว; Binaries เดิมย้ายไปอยู่ในเงาแทน คืน True ถ้า adopt ได้"""
+    cache_file = cache_file or BUILD_CACHE_FILE
+    key = os.path.normcase(os.path.abspath(uproject))
+    cache = load_json_file(cache_file, {})
+    state = cache.get(key, {}).get("prebuild") or {}
+    if not state.get("ok") or state.get("fp") != fingerprint:
+        return False
+    shadow_dir = os.path.dirname(state["uproject"])
+    proj_dir = os.path.dirname(os.path.abspath(uproject))
+    done = []
+    try:
+        for rel in prebuild_binary_dirs(shadow_dir):
+            src, dst = os.path.join(shadow_dir, rel), os.path.join(proj_dir, rel)
+            swap = src + ".swap"
+            os.makedirs(os.path.dirname(dst), exist_ok=True)
+            if os.path.exists(dst):
+                os.rename(dst, swap)  # ไฟล์ถูก lock (editor เปิดอยู่) / คนละ volume -> OSError ตั้งแต่ตรงนี้
+            try:
+                os.rename(src, dst)
+            except OSError:
+                if os.path.exists(swap): os.rename(swap, dst)
+                raise
+            if os.path.exists(swap): os.rename(swap, src)
+            done.append((src, dst))
+    except OSError as e:
+        for src, dst in reversed(done):  # คืนสภาพทั้งชุด: Binaries ครึ่ง ๆ กลาง ๆ แย่กว่า build ใหม่
+            try:
+                if os.path.exists(src): os.rename(src, src + ".swap")
+                os.rename(dst, src)
+                if os.path.exists(src + ".swap"): os.rename(src + ".swap", dst)
+            except OSError: pass
+        log_append(logbox, f"[prebuild] ใช้ Binaries จาก prebuild ไม่ได้: {e}")
+        return False
+    with edit_json_file(cache_file) as cache:
+        entry = cache.setdefault(key, {})
+        entry["last_ok"] = fingerprint
+        entry.pop("prebuild", None)  # เงาตอนนี้ถือ Binaries เก่า -> ใช้ซ้ำไม่ได้อีก
+    log_append(logbox, f"ใช้ Binaries จาก prebuild {state['sha'][:10]} ({len(done)} โฟลเดอร์) แทนการ build")
+    return True
+
+class ShadowPrebuilder:
+    """รัน prebuild_upstream ทีละงานใน background; upstream ขยับระหว่าง build -> ยกเลิกงานเก่าแล้วเริ่ม sha ใหม่"""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._thread = None
+        self._cancel = None
+        self.target = None  # sha ที่กำลัง prebuild
+        self.last = None    # sha ที่ prebuild จบไปแล้ว (สำเร็จหรือล้มเหลว) -> auto-check รอบถัดไปไม่เริ่มซ้ำ
+
+    def busy(self):
+        with self._lock:
+            return self._thread is not None
+
+    def request(self, settings, res, logbox=None):
+        """เริ่ม prebuild ของ upstream target จากผล git_check; คืน False ถ้าไม่มีอะไรต้องทำ"""
+        target = res.get("upstream_target") or res.get("origin_target")
+        repo = res.get("repo")
+        if not repo or not target:
+            return False
+        git_dir = git_dir_of(repo)
+        sha = (read_git_ref(git_dir, f"refs/remotes/{target}")[0] if git_dir else None) or git_rev_sha(repo, target)
+        if not sha:
+            return False
+        with self._lock:
+            if sha in (self.target, self.last):
+                return False
+            if self._cancel is not None:
+                self._cancel.set()
+            cancel = self._cancel = threading.Event()
+            prev, self.target = self._thread, sha
+            t = self._thread = threading.Thread(target=self._run, args=(settings, res["repo"], sha, logbox, cancel, prev),
+                                                name="prebuild", daemon=True)
+        t.start()
+        return True
 
-    # ---------- helpers ----------
-    def call_in_main(self, func, *args, **kwargs):
-        q = Queue(maxsize=1)
-        def _wrap():
+    def _run(self, settings, repo, sha, logbox, cancel, prev):
+        state = None
+        try:
+            if prev is not None:
+                prev.join()  # worktree เดียวกัน -> รอ UBT ตัวเก่าออกก่อน
+            if not cancel.is_set():
+                with cancel_scope(cancel):
+                    state = prebuild_upstream(settings, repo, sha, logbox)
+        except Exception as e:
+            log_append(logbox, f"[prebuild] ผิดพลาด: {e}")
+        finally:
+            with self._lock:
+                if state is not None and not cancel.is_set():
+                    self.last = sha
+                if self._cancel is cancel:
+                    self._thread = self._cancel = self.target = None
+
+    def cancel(self):
+        with self._lock:
+            if self._cancel is not None:
+                self._cancel.set()
+
+    def settle(self, sha, logbox=None, cancel=None):
+        """เรียกก่อน build จริง: prebuild ของ sha นี้ -> รอให้เสร็จแล้วค่อย adopt, sha อื่น -> ยกเลิก
+        (UBT สองตัวแย่ง CPU และ mutex กัน); cancel ของผู้เรียกถูก set ระหว่างรอ -> ยกเลิก prebuild ด้วย"""
+        with self._lock:
+            t, target = self._thread, self.target
+        if t is None:
+            return
+        if target != sha:
+            self.cancel()
+        else:
+            log_append(logbox, f"รอ prebuild {sha[:10]} ที่กำลังรันอยู่ให้เสร็จ")
+        while t.is_alive():
+            if cancel is not None and cancel.is_set():
+                self.cancel()
+            t.join(0.2)
+
+PREBUILDER = ShadowPrebuilder()
+
+# ===================== Task Graph =====================
+class TaskError(Exception):
+    """node ล้มเหลวพร้อมข้อความที่จะแสดงให้ผู้ใช้"""
+
+class TaskNode:
+    def __init__(self, graph, name, fn, deps):
+        self.graph, self.name, self.fn, self.deps = graph, name, fn, tuple(deps)
+        self.cancel = threading.Event()
+        self.status = "pending"  # pending/running/ok/failed/skipped/cancelled
+        self.result = None
+        self.error = None
+        self.start = self.end = None
+
+    @property
+    def done(self):
+        return self.status in ("ok", "failed", "skipped", "cancelled")
+
+    @property
+    def seconds(self):
+        return (self.end - self.start) if self.start and self.end else 0.0
+
+class TaskGraph:
+    """รัน node ตาม dependency บน thread pool; node ที่ไม่ขึ้นต่อกันรันพร้อมกันได้
+    fn(node) คืนค่าผลลัพธ์, raise TaskError/คืน False = ล้มเหลว (dependents ถูก skip)
+    เพิ่ม node ระหว่างรันได้ (deps ต้องถูก add มาก่อน ไม่งั้น ValueError)
+    และ cancel() node ที่ยังไม่เสร็จได้ (fn ควรดู node.cancel)"""
+    def __init__(self, logbox=None, max_workers=4):
+        self.logbox = logbox
+        self.tracer = current_tracer()  # worker ของ pool บันทึก span ลง trace ของ thread ที่สร้าง graph
+        self.nodes = {}
+        self._order = []
+        self._cv = threading.Condition()
+        self._pool = ThreadPoolExecutor(max_workers=max_workers)
+
+    def add(self, name, fn, deps=()):
+        with self._cv:
+            missing = [d for d in deps if d not in self.nodes]
+            if missing:  # ไม่งั้น node นี้ค้าง pending ตลอดไปและ wait() ไม่มีวันจบ
+                raise ValueError(f"{name}: ไม่รู้จัก dependency {', '.join(missing)}")
+            node = TaskNode(self, name, fn, deps)
+            self.nodes[name] = node
+            self._order.append(name)
+            self._schedule_locked()
+        return node
+
+    def result(self, name):
+        node = self.nodes.get(name)
+        return node.result if node else None
+
+    def _schedule_locked(self):
+        for name in self._order:
+            node = self.nodes[name]
+            if node.status != "pending": continue
+            if node.cancel.is_set():
+                node.status = "cancelled"
+                continue
+            deps = [self.nodes[d] for d in node.deps]
+            if any(d.status in ("failed", "skipped", "cancelled") for d in deps):
+                node.status = "skipped"
+                continue
+            if all(d.status == "ok" for d in deps):
+                node.status = "running"
+                self._pool.submit(self._run, node)
+        self._cv.notify_all()
+
+    def _run(self, node):
+        with trace_scope(self.tracer):
+            self._run_node(node)
+
+    def _run_node(self, node):
+        node.start = time.perf_counter()
+        with trace_span(node.name, "node", deps=list(node.deps)) as span:
             try:
-                q.put(func(*args, **kwargs))
+                with cancel_scope(node.cancel):  # cancel node -> kill คำสั่งที่ node นี้รันอยู่
+                    node.result = node.fn(node)
+                status = "cancelled" if node.cancel.is_set() else ("failed" if node.result is False else "ok")
             except Exception as e:
-                q.put(e)
-        self.after(0, _wrap)
-        res = q.get()
-        if isinstance(res, Exception):
-            raise res
-        return res
+                node.error = e
+                status = "cancelled" if node.cancel.is_set() else "failed"
+            span["status"] = status
+        node.end = time.perf_counter()
+        log_append(self.logbox, f"[graph] {node.name}: {status} {node.seconds:.2f}s")
+        with self._cv:
+            node.status = status
+            self._schedule_locked()
+
+    def cancel(self, names=None):
+        with self._cv:
+            for name in (names or list(self.nodes)):
+                node = self.nodes.get(name)
+                if node and not node.done:
+                    node.cancel.set()
+            self._schedule_locked()
+
+    def wait(self, names=None, timeout=None):
+        """รอจน node ที่ระบุ (หรือทั้งหมด) จบ; คืน True ถ้า node เหล่านั้น ok ทั้งหมด"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cv:
+            while True:
+                nodes = [self.nodes[n] for n in (names or list(self.nodes)) if n in self.nodes]
+                if all(n.done for n in nodes):
+                    return all(n.status == "ok" for n in nodes)
+                left = None if deadline is None else deadline - time.monotonic()
+                if left is not None and left <= 0:
+                    return False
+                self._cv.wait(left)
+
+    def first_error(self):
+        for name in self._order:
+            node = self.nodes[name]
+            if node.status == "failed":
+                return node.error or TaskError(f"{name} ล้มเหลว")
+        return None
 
-    def schedule_auto_check(self):
-        if self.ctx["bg_job"]:
-            try: self.after_cancel(self.ctx["bg_job"])
-            except Exception: pass
-            self.ctx["bg_job"] = None
-
-        if self.ctx["auto_check"].get():
-            def tick():
-                threading.Thread(target=self._auto_check_task, daemon=True).start()
-                self.ctx["bg_job"] = self.after(CHECK_INTERVAL_MS, tick)
-            self.ctx["bg_job"] = self.after(CHECK_INTERVAL_MS, tick)
-
-    def _auto_check_task(self):
-        res = self.do_git_check(silent=True)
-        if res.get("ok"):
-            msgs = []
-            if res["behind_upstream"] > 0:
-                msgs.append(f"[Auto] ตามหลัง {res['upstream_target']} {res['behind_upstream']} commit")
-            if res["ahead_origin"] > 0:
-                msgs.append(f"[Auto] ยังไม่ได้ push {res['ahead_origin']} commit ไป {res['origin_target']}")
-            if msgs:
-                log_append(self.log, " / ".join(msgs))
-
-    def open_settings(self):
-        SettingsDialog(self, self.ctx, self.schedule_auto_check)
-
-    # ---------- git check + open ----------
-    def do_check_now(self):
-        def _task():
-            log_append(self.log, "=== Git Check ===")
-            res = self.do_git_check()
-            if not res.get("ok"):
-                log_append(self.log, "Git check ไม่สำเร็จ")
-                return
-            msg = []
-            if res["behind_upstream"] > 0:
-                msg.append(f"- คุณตามหลัง {res['upstream_target']} อยู่ {res['behind_upstream']} commit")
-                for l in res["behind_list"]: msg.append(f"    {l}")
-            else:
-                msg.append("- ไม่มี commit ใหม่จาก upstream")
-
-            if res["ahead_origin"] > 0:
-                msg.append(f"- คุณนำหน้า {res['origin_target']} อยู่ {res['ahead_origin']} commit (ยังไม่ได้ push)")
-                for l in res["ahead_list"]: msg.append(f"    {l}")
-            else:
-                msg.append("- ไม่มี commit ค้างที่ยังไม่ได้ push")
-
-            self.call_in_main(messagebox.showinfo, "Git Status", "\n".join(msg))
-        threading.Thread(target=_task, daemon=True).start()
-
-    def do_open_sequence(self):
-        def _task():
-            res = self.do_git_check()
-            if not res.get("ok"):
-                self.call_in_main(messagebox.showwarning, "Git", "เช็ค Git ไม่ได้ จะเปิดโปรเจกต์ต่อไป")
-                self._continue_open()
-                return
+    def timings(self):
+        return [(n, self.nodes[n].status, self.nodes[n].seconds) for n in self._order]
 
-            need_warn = (res["behind_upstream"] > 0) or (res["ahead_origin"] > 0)
-            if not need_warn:
-                self._continue_open()
-                return
+    def summary(self):
+        return " | ".join(f"{n} {sec:.2f}s" + ("" if st == "ok" else f" ({st})") for n, st, sec in self.timings())
 
-            lines = [f"Branch: {res['branch']}"]
-            if res["behind_upstream"] > 0:
-                lines.append(f"\nตามหลัง {res['upstream_target']} {res['behind_upstream']} commit:")
-                lines += [f"  {l}" for l in res["behind_list"]]
-            if res["ahead_origin"] > 0:
-                lines.append(f"\nยังไม่ได้ push ไป {res['origin_target']} {res['ahead_origin']} commit:")
-                lines += [f"  {l}" for l in res["ahead_list"]]
-
-            ans = self.call_in_main(
-                messagebox.askyesnocancel,
-                "Git Sync Warning",
-                "\n".join(lines) + "\n\nYes=Pull, No=Continue, Cancel=หยุด"
-            )
-            if ans is True:
-                target = res["upstream_target"] or res["origin_target"]
-                remote = "upstream" if res["upstream_target"] else "origin"
-                branch = target.split("/",1)[1] if "/" in target else target
-                log_append(self.log, f"Pull --rebase จาก {remote} {branch}")
-                do_pull(res["repo"], remote, branch, self.log)
-                self._continue_open()
-            elif ans is False:
-                self._continue_open()
-            else:
-                log_append(self.log, "ยกเลิกการเปิดโปรเจกต์")
-        threading.Thread(target=_task, daemon=True).start()
-
-    def _continue_open(self):
-        ubt = self.ctx["ubt"].get().strip()
-        editor_exe = self.ctx["editor"].get().strip()
-        uproject = self.ctx["uproject"].get().strip()
-
-        if not uproject or not os.path.isfile(uproject):
-            self.call_in_main(messagebox.showerror, "Error", "โปรดตั้งค่า .uproject ใน Settings")
-            return
+    def shutdown(self):
+        self._pool.shutdown(wait=False)
 
-        if self.ctx["autogen"].get():
-            if not ubt or not os.path.isfile(ubt):
-                self.call_in_main(messagebox.showerror, "Error", "โปรดตั้งค่า UnrealBuildTool.exe ใน Settings")
-                return
-            log_append(self.log, "=== Generate Project Files ===")
-            if not generate_project_files(ubt, uproject, self.log):
-                self.call_in_main(messagebox.showerror, "Error", "Generate Project Files ล้มเหลว")
-                return
+# ===================== Auto-check Scheduler =====================
+def git_watch_signature(git_dir):
+    """(path, mtime_ns, size) ของไฟล์ที่เปลี่ยนเมื่อ HEAD/refs ขยับ ใช้ตรวจด้วย stat-poll
+    worktree: HEAD/FETCH_HEAD อยู่ใน git dir ของมันเอง, refs/packed-refs อยู่ใน common dir"""
+    if not git_dir or not os.path.isdir(git_dir):
+        return None
+    common = git_common_dir(git_dir)
+    sig = []
+    for base, name in ((git_dir, "HEAD"), (common, "packed-refs"), (git_dir, "FETCH_HEAD")):
+        try:
+            st = os.stat(os.path.join(base, name))
+            sig.append((name, st.st_mtime_ns, st.st_size))
+        except OSError:
+            pass
+    for sub in ("refs/heads", "refs/remotes"):
+        for root, _, files in os.walk(os.path.join(common, sub)):
+            for f in files:
+                try:
+                    st = os.stat(os.path.join(root, f))
+                    sig.append((os.path.join(root, f), st.st_mtime_ns, st.st_size))
+                except OSError:
+                    pass
+    return tuple(sorted(sig))
+
+class CheckScheduler:
+    """รัน auto-check ทีละงาน (single-flight) บน thread เดียว
+    - คำขอที่เข้ามาระหว่างรันจะถูกรวมเป็นรอบเดียว
+    - ล้มเหลวแล้ว backoff แบบ exponential + jitter
+    - ไฟล์ใน .git เปลี่ยน -> สั่ง re-check แบบ local (ไม่ fetch) ทันที
+    task(kind) รับ kind = "full" | "local" และคืน True เมื่อสำเร็จ"""
+    def __init__(self, task, get_git_dir, interval_ms=None, poll_ms=None, max_backoff_ms=None):
+        self.task = task
+        self.get_git_dir = get_git_dir
+        self.interval = (interval_ms or CHECK_INTERVAL_MS) / 1000.0
+        self.poll = (poll_ms or WATCH_POLL_MS) / 1000.0
+        self.max_backoff = (max_backoff_ms or CHECK_MAX_BACKOFF_MS) / 1000.0
+        self.failures = 0
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._sig = None
+        self._next_due = time.monotonic() + self.interval
+        self._thread = None
+
+    def start(self):
+        self._sig = git_watch_signature(self.get_git_dir())
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    def request(self, kind="full"):
+        with self._lock:
+            self._pending.add(kind)
+        self._wake.set()
+
+    def next_delay(self):
+        if not self.failures:
+            return self.interval
+        delay = self.interval * (2 ** min(self.failures, 32)) * random.uniform(0.75, 1.25)
+        return min(delay, self.max_backoff)  # jitter ก่อน cap: ไม่เกิน max_backoff แม้สุ่มได้ค่าสูง
+
+    def _loop(self):
+        while not self._stop.is_set():
+            self._wake.wait(max(0.0, min(self._next_due - time.monotonic(), self.poll)))
+            self._wake.clear()
+            if self._stop.is_set(): break
+            sig = git_watch_signature(self.get_git_dir())
+            if sig != self._sig:
+                self._sig = sig
+                self.request("local")
+                self._wake.clear()
+            if time.monotonic() >= self._next_due:
+                self.request("full")
+                self._wake.clear()
+            with self._lock:
+                kinds, self._pending = self._pending, set()
+            if not kinds: continue
+            kind = "full" if "full" in kinds else "local"
+            try:
+                ok = bool(self.task(kind))
+            except Exception:
+                ok = False
+            if kind == "full":
+                self.failures = 0 if ok else self.failures + 1
+                self._next_due = time.monotonic() + self.next_delay()
+            self._sig = git_watch_signature(self.get_git_dir())  # ไม่ให้ fetch ของเราเองปลุกรอบถัดไป
+
+# ===================== Status Snapshot =====================
+def git_ref_state(repo, targets=()):
+    """branch/HEAD และ sha ของ remote-tracking ref (เช่น "upstream/main") อ่านจากไฟล์ใน .git ล้วน (~ms)"""
+    git_dir = git_dir_of(repo)
+    if not git_dir:
+        return None
+    head, ref = read_git_ref(git_dir, "HEAD")
+    state = {"head": head, "branch": ref[len("refs/heads/"):] if ref.startswith("refs/heads/") else "HEAD", "refs": {}}
+    for t in targets:
+        if t:
+            state["refs"][t] = read_git_ref(git_dir, f"refs/remotes/{t}")[0]
+    return state
+
+def save_status_snapshot(res, snapshot_file=None):
+    """เก็บผล git_check ล่าสุด (พร้อม HEAD/ref ตอนนั้น) ไว้แสดงทันทีตอนเปิดโปรแกรมครั้งถัดไป"""
+    if not res.get("ok") or not res.get("uproject"):
+        return
+    snapshot_file = snapshot_file or STATUS_SNAPSHOT_FILE
+    state = git_ref_state(res["repo"], (res.get("upstream_target"), res.get("origin_target")))
+    if state is None:
+        return
+    with edit_json_file(snapshot_file) as data:
+        data[os.path.normcase(os.path.abspath(res["uproject"]))] = dict(state, repo=res["repo"], saved_at=time.time(), res=res)
+
+def load_status_snapshot(uproject, snapshot_file=None):
+    """คืน (snapshot, เหตุผลที่ข้อมูลเก่า [] = ref ยังตรงกัน) หรือ (None, None) ถ้ายังไม่มี
+    เทียบแค่ไฟล์ใน .git (HEAD, branch, remote-tracking ref) ไม่ spawn git ไม่แตะ network"""
+    if not uproject:
+        return None, None
+    snap = load_json_file(snapshot_file or STATUS_SNAPSHOT_FILE, {}).get(os.path.normcase(os.path.abspath(uproject)))
+    if not snap or not isinstance(snap.get("res"), dict):
+        return None, None
+    repo = get_repo_root_from_uproject(uproject)
+    if repo != snap.get("repo"):
+        return snap, ["repo เปลี่ยน"]
+    cur = git_ref_state(repo, list(snap.get("refs", {})))
+    if cur is None:
+        return snap, ["อ่าน .git ไม่ได้"]
+    stale = []
+    if cur["branch"] != snap.get("branch"):
+        stale.append(f"branch {snap.get('branch')} -> {cur['branch']}")
+    elif cur["head"] != snap.get("head"):
+        stale.append(f"HEAD {(snap.get('head') or '?')[:10]} -> {(cur['head'] or '?')[:10]}")
+    for t, sha in snap.get("refs", {}).items():
+        if cur["refs"].get(t) != sha:
+            stale.append(f"{t} ขยับ")
+    return snap, stale
+
+def format_age(ts, now=None):
+    secs = max(0, int((now or time.time()) - ts))
+    if secs < 60: return f"{secs} วินาทีที่แล้ว"
+    if secs < 3600: return f"{secs // 60} นาทีที่แล้ว"
+    if secs < 86400: return f"{secs // 3600} ชั่วโมงที่แล้ว"
+    return f"{secs // 86400} วันที่แล้ว"
+
+# ===================== Pipeline (ใช้ร่วมกันทั้ง UI และ CLI) =====================
+@contextmanager
+def check_stage(res, name, **args):
+    """trace_span + เก็บเวลาของ stage ไว้ใน res['timings'] (ใช้ใน launch history)"""
+    t0 = time.perf_counter()
+    with trace_span(name, "stage", **args) as span:
+        try:
+            yield span
+        finally:
+            res["timings"][name] = round(time.perf_counter() - t0, 4)
+
+def git_check(uproject, logbox, silent=False, fetch=True, worktree=True):
+    """fetch + เทียบ upstream/origin; worktree=False ข้าม git status ทั้ง tree (auto-check เบื้องหลัง)"""
+    res = {"ok": False, "repo": None, "branch": None, "uproject": uproject, "started_at": time.time(),
+           "behind_upstream": 0, "ahead_origin": 0,
+           "upstream_target": None, "origin_target": None,
+           "behind_list": [], "ahead_list": [], "spawns": 0, "timings": {}}
+
+    repo = get_repo_root_from_uproject(uproject)
+    res["repo"] = repo
+    if not repo:
+        if not silent: log_append(logbox, "ไม่พบ .git ใกล้ไฟล์ .uproject")
+        return res
+    with check_stage(res, "git_fetch", repo=repo, skipped=not fetch) as span:
+        fetched, fetch_spawns = git_fetch_smart(repo, logbox, silent) if fetch else (True, 0)
+        span["ok"] = fetched
+    if not fetched: return res
+
+    with check_stage(res, "git_probe", repo=repo):
+        probe = git_status_probe(repo, 5)
+    if not probe["branch"]:
+        log_append(logbox, "ตรวจ branch ไม่ได้")
+        return res
+    if not probe["has_upstream"] and not silent:
+        log_append(logbox, "ไม่พบ remote 'upstream' (จะเทียบเฉพาะ origin)")
+    for k in ("branch", "behind_upstream", "ahead_origin", "upstream_target",
+              "origin_target", "behind_list", "ahead_list"):
+        res[k] = probe[k]
+    res["spawns"] = probe["spawns"] + fetch_spawns
+    if worktree:
+        with check_stage(res, "git_worktree", repo=repo) as span:
+            res["worktree"] = git_worktree_status(repo)
+            span["dirty"] = res["worktree"].get("dirty")
+        res["spawns"] += 1
+    if not silent:
+        wt = f", {format_worktree(res['worktree'])} ({res['worktree']['seconds']:.2f}s)" if worktree else ""
+        log_append(logbox, f"git status probe: {res['spawns']} process{wt}")
+
+    res["ok"] = True
+    return res
+
+def format_git_status(res):
+    msg = []
+    if res["behind_upstream"] > 0:
+        msg.append(f"- คุณตามหลัง {res['upstream_target']} อยู่ {res['behind_upstream']} commit")
+        for l in res["behind_list"]: msg.append(f"    {l}")
+        more = res["behind_upstream"] - len(res["behind_list"])
+        if more > 0: msg.append(f"    ... และอีก {more} commit")
+    else:
+        msg.append("- ไม่มี commit ใหม่จาก upstream")
+
+    if res["ahead_origin"] > 0:
+        msg.append(f"- คุณนำหน้า {res['origin_target']} อยู่ {res['ahead_origin']} commit (ยังไม่ได้ push)")
+        for l in res["ahead_list"]: msg.append(f"    {l}")
+        more = res["ahead_origin"] - len(res["ahead_list"])
+        if more > 0: msg.append(f"    ... และอีก {more} commit")
+    else:
+        msg.append("- ไม่มี commit ค้างที่ยังไม่ได้ push")
+    if "worktree" in res:
+        msg.append(f"- {format_worktree(res['worktree'])}")
+    return "\n".join(msg)
+
+def pull_from_check(res, logbox):
+    """pull --rebase ตามผล git_check; คืน (pre_sha, post_sha)"""
+    target = res["upstream_target"] or res["origin_target"]
+    remote = "upstream" if res["upstream_target"] else "origin"
+    branch = target.split("/",1)[1] if "/" in target else target
+    wt = res.get("worktree") or {}
+    if wt.get("conflicted"):
+        log_append(logbox, f"ข้าม Pull: มีไฟล์ conflict ค้าง {wt['conflicted']} ไฟล์")
+        head = git_head_sha(res["repo"])
+        return head, head
+    autostash = bool(wt.get("dirty"))  # rebase บน tree ที่แก้อยู่จะล้ม -> stash ไว้แล้วคืนให้
+    log_append(logbox, f"Pull --rebase จาก {remote} {branch}" + (" (--autostash)" if autostash else ""))
+    with trace_span("pull", "stage", remote=remote, branch=branch, autostash=autostash) as span:
+        pre = git_head_sha(res["repo"])
+        span["ok"] = do_pull(res["repo"], remote, branch, logbox, autostash=autostash)
+        post = git_head_sha(res["repo"])
+    if pre and post and pre != post:
+        log_append(logbox, f"Pull: {pre[:10]}..{post[:10]}")
+    return pre, post
+
+def open_validate(settings, need_editor=True):
+    tools = {k: (settings.get(k) or "").strip() for k in ("ubt", "editor", "uproject", "engine_dir")}
+    tools["autogen"] = bool(settings.get("autogen"))
+    tools["autobuild"] = bool(settings.get("autobuild"))
+    if not tools["uproject"] or not os.path.isfile(tools["uproject"]):
+        raise TaskError("โปรดตั้งค่า .uproject ใน Settings")
+    if (tools["autogen"] or tools["autobuild"]) and (not tools["ubt"] or not os.path.isfile(tools["ubt"])):
+        raise TaskError("โปรดตั้งค่า UnrealBuildTool.exe ใน Settings")
+    if need_editor and (not tools["editor"] or not os.path.isfile(tools["editor"])):
+        raise TaskError("โปรดตั้งค่า UnrealEditor.exe ใน Settings")
+    return tools
+
+def open_fingerprint(tools, pull_range=None, force_build=False):
+    """ตัดสินล่วงหน้าว่าต้อง generate/build ไหม (อ่านอย่างเดียว รันระหว่าง fetch ได้)"""
+    out = {"tools": tools, "gen": None, "build": None}
+    if tools["autogen"]:
+        out["gen"] = project_files_needed(tools["uproject"], pull_range)
+    if tools["autobuild"]:
+        up_to_date, fp = build_up_to_date(tools["uproject"], f"{tools['engine_dir']}|{tools['ubt']}")
+        out["build"] = (up_to_date and not force_build, fp)
+    return out
+
+def open_generate(node, logbox):
+    fpr = node.graph.result("fingerprint")
+    tools = fpr["tools"]
+    if not tools["autogen"]:
+        return True
+    log_append(logbox, "=== Generate Project Files ===")
+    needed, reason, gen_state = fpr["gen"]
+    if not needed:
+        log_append(logbox, f"ข้าม Generate Project Files: {reason}")
+        return True
+    log_append(logbox, f"Generate Project Files เพราะ: {reason}")
+    trace_meta(generated=True)
+    if not generate_project_files(tools["ubt"], tools["uproject"], logbox, cancel=node.cancel):
+        raise TaskError("Generate Project Files ล้มเหลว")
+    record_project_files(tools["uproject"], gen_state)
+    return True
+
+def open_build(node, logbox, on_progress=None):
+    fpr = node.graph.result("fingerprint")
+    tools = fpr["tools"]
+    if not tools["autobuild"]:
+        return True
+    log_append(logbox, "=== Build Editor ===")
+    up_to_date, fp = fpr["build"]
+    if up_to_date:
+        log_append(logbox, f"ข้าม Build Editor: inputs ไม่เปลี่ยนตั้งแต่ build ล่าสุด ({fp[:10]})")
+        return True
+    if PREBUILDER.busy():
+        repo = get_repo_root_from_uproject(tools["uproject"])
+        PREBUILDER.settle(git_head_sha(repo) if repo else None, logbox, node.cancel)
+    if adopt_prebuild(tools["uproject"], fp, logbox):
+        trace_meta(prebuilt=True)
+        return True
+    analyzer = UbtBuildAnalyzer(on_progress, source_modules=ubt_source_modules(os.path.dirname(tools["uproject"])))
+    trace_meta(built=True)
+    ok = build_editor(tools["ubt"], tools["uproject"], logbox, cancel=node.cancel, analyzer=analyzer)
+    if analyzer.done:
+        report = analyzer.report()
+        prev = (load_build_timings(tools["uproject"], limit=1) or [None])[0]
+        try: save_build_timing(report, tools["uproject"])
+        except OSError: pass
+        log_build_timing(report, prev, logbox)
+    if not ok:
+        raise TaskError("Build Editor ล้มเหลว")
+    record_build_ok(tools["uproject"], fp)
+    return True
+
+def open_launch(node, logbox):
+    tools = node.graph.result("fingerprint")["tools"]
+    log_append(logbox, "=== เปิดโปรเจกต์ ===")
+    profiler = EditorStartupProfiler(tools["uproject"], logbox, on_done=lambda prof: finish_startup_profile(prof, logbox))
+    if not open_project(tools["editor"], tools["uproject"], logbox, profiler):
+        return False
+    return profiler  # ผู้เรียกที่อยากรอจน editor พร้อมใช้: g.result("launch").wait()
+
+def open_graph(settings, logbox, pull_range=None, need_editor=True, force_build=False):
+    """TaskGraph ตั้งต้นของการเปิดโปรเจกต์: validate -> fingerprint"""
+    g = TaskGraph(logbox)
+    trace_meta(uproject=settings.get("uproject"))
+    if pull_range and pull_range[0]:
+        trace_meta(head_before=pull_range[0], head_after=pull_range[1], pulled=pull_range[0] != pull_range[1])
+    g.add("validate", lambda n: open_validate(settings, need_editor))
+    g.add("fingerprint", lambda n: open_fingerprint(n.graph.result("validate"), pull_range, force_build),
+          deps=["validate"])
+    return g
+
+def add_open_steps(g, logbox, launch=True, on_progress=None):
+    if "generate" not in g.nodes:
+        g.add("generate", lambda n: open_generate(n, logbox), deps=["validate", "fingerprint"])
+        g.add("build", lambda n: open_build(n, logbox, on_progress), deps=["generate"])
+    if launch and "launch" not in g.nodes:
+        g.add("launch", lambda n: open_launch(n, logbox), deps=["build"])
+
+def speculate_open_steps(g, res, logbox, on_progress=None):
+    """ไม่มีอะไรให้ pull (behind_upstream == 0) -> เริ่ม generate/build ระหว่างรอผู้ใช้ตอบ dialog; คืน True ถ้าเริ่ม"""
+    if not res.get("ok") or res["behind_upstream"] != 0:
+        return False
+    log_append(logbox, "เริ่ม Generate/Build ล่วงหน้าระหว่างรอคำตอบ")
+    add_open_steps(g, logbox, launch=False, on_progress=on_progress)
+    return True
+
+def cancel_speculative_steps(g):
+    """ผู้ใช้เลือก Pull: ทิ้ง generate/build ที่เริ่มล่วงหน้า (UBT ที่รันอยู่โดน kill ผ่าน cancel ของ node) และรอจนจบจริง"""
+    g.cancel(["generate", "build"])
+    g.wait(["generate", "build"])
+
+def finish_graph(g, logbox):
+    g.wait()
+    g.shutdown()
+    log_append(logbox, f"[timing] {g.summary()}")
+    err = g.first_error()
+    if err is not None:
+        trace_meta(error=str(err))
+
+# ===================== Launch History =====================
+HISTORY_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,            -- open / build / check / auto_check
+    uproject TEXT, repo TEXT,
+    started_at REAL NOT NULL, total_s REAL,
+    head_before TEXT, head_after TEXT,
+    pulled INTEGER DEFAULT 0, generated INTEGER DEFAULT 0, built INTEGER DEFAULT 0,
+    status TEXT, error TEXT,
+    behind INTEGER, ahead INTEGER, dirty INTEGER
+);
+CREATE TABLE IF NOT EXISTS stages (
+    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    name TEXT NOT NULL, cat TEXT NOT NULL,  -- stage / node / cmd
+    seconds REAL NOT NULL, exit_code INTEGER, status TEXT
+);
+CREATE INDEX IF NOT EXISTS runs_kind_time ON runs(kind, started_at);
+CREATE INDEX IF NOT EXISTS stages_run ON stages(run_id);
+"""
+
+class HistoryDB:
+    """ประวัติ check/open run ใน SQLite: เวลาแต่ละ stage, HEAD ก่อน/หลัง, generate/build รันไหม, exit code
+    เปิด connection ใหม่ทุกครั้ง (เรียกได้จากทุก thread)"""
+    def __init__(self, path=None):
+        self.path = path or HISTORY_DB
+        self._ready = False
+
+    def _connect(self):
+        con = sqlite3.connect(self.path, timeout=5)
+        if not self._ready:
+            con.executescript(HISTORY_SCHEMA)
+            self._ready = True
+        return con
+
+    def add_run(self, run, stages):
+        """run: dict ตามคอลัมน์ของ runs; stages: [(name, cat, seconds, exit_code, status)]"""
+        cols = [c for c in ("kind", "uproject", "repo", "started_at", "total_s", "head_before", "head_after",
+                            "pulled", "generated", "built", "status", "error", "behind", "ahead", "dirty") if c in run]
+        con = self._connect()
+        try:
+            with con:
+                cur = con.execute(f"INSERT INTO runs ({', '.join(cols)}) VALUES ({', '.join('?' * len(cols))})",
+                                  [run[c] for c in cols])
+                run_id = cur.lastrowid
+                con.executemany("INSERT INTO stages (run_id, name, cat, seconds, exit_code, status) VALUES (?,?,?,?,?,?)",
+                                [(run_id,) + tuple(st) for st in stages])
+            return run_id
+        finally:
+            con.close()
+
+    def runs(self, kind=None, uproject=None, since=None, limit=None):
+        """run เก่าสุดก่อน พร้อม 'stages' = {name: วินาทีรวม} (เฉพาะ stage/node) และ 'total'"""
+        where, params = ["1=1"], []
+        if kind: where.append("kind = ?"); params.append(kind)
+        if uproject: where.append("uproject = ?"); params.append(uproject)
+        if since: where.append("started_at >= ?"); params.append(since)
+        sql = f"SELECT * FROM runs WHERE {' AND '.join(where)} ORDER BY started_at DESC"
+        if limit: sql += f" LIMIT {int(limit)}"
+        con = self._connect()
+        try:
+            con.row_factory = sqlite3.Row
+            rows = [dict(r) for r in con.execute(sql, params)][::-1]
+            by_id = {r["id"]: r for r in rows}
+            for r in rows:
+                r["stages"] = {"total": r["total_s"] or 0.0}
+            if by_id:
+                ids = ", ".join(str(i) for i in by_id)
+                for run_id, name, secs in con.execute(
+                        f"SELECT run_id, name, SUM(seconds) FROM stages WHERE cat != 'cmd' AND run_id IN ({ids}) "
+                        f"GROUP BY run_id, name"):
+                    by_id[run_id]["stages"][name] = secs
+            return rows
+        finally:
+            con.close()
+
+_history = None
+
+def history_db():
+    global _history
+    if _history is None:
+        _history = HistoryDB()
+    return _history
+
+def record_trace_history(tracer, logbox=None):
+    """บันทึก run ที่ trace ไว้ (open/build) ลง launch history; HEAD หลัง run อ่านจาก repo ถ้ายังไม่รู้"""
+    with tracer._lock:
+        meta, events = dict(tracer.meta), list(tracer.events)
+    uproject = meta.get("uproject")
+    repo = get_repo_root_from_uproject(uproject) if uproject else None
+    if not repo:
+        return None
+    head_after = meta.get("head_after") or git_head_sha(repo)
+    total, wait = trace_total(events)  # total_s ไม่นับเวลาที่ dialog รอผู้ใช้ (ดูได้จาก stage ของ dialog เอง)
+    stages = [(str(e["args"].get("cmd", e["name"]))[:200] if e["cat"] == "cmd" else e["name"], e["cat"],
+               e["dur"] / 1e6, e["args"].get("exit_code"), e["args"].get("status"))
+              for e in events if e["cat"] in ("stage", "node", "cmd")]
+    last = {}  # สถานะล่าสุดของแต่ละ node (build ล่วงหน้าที่ถูก cancel แล้วรันใหม่ = นับครั้งหลัง)
+    for e in sorted((e for e in events if e["cat"] == "node"), key=lambda e: e["ts"] + e["dur"]):
+        last[e["name"]] = e["args"].get("status")
+    statuses = set(last.values())
+    status = "failed" if "failed" in statuses else "cancelled" if statuses & {"cancelled", "skipped"} else "ok"
+    run = {"kind": tracer.name, "uproject": uproject, "repo": repo, "started_at": tracer.started_at,
+           "total_s": total - wait, "head_before": meta.get("head_before") or head_after, "head_after": head_after,
+           "pulled": int(bool(meta.get("pulled"))), "generated": int(bool(meta.get("generated"))),
+           "built": int(bool(meta.get("built"))), "status": status, "error": meta.get("error")}
+    try:
+        return history_db().add_run(run, stages)
+    except sqlite3.Error as e:
+        log_append(logbox, f"[history] บันทึกไม่ได้: {e}")
+        return None
 
-        if self.ctx["autobuild"].get():
-            if not ubt or not os.path.isfile(ubt):
-                self.call_in_main(messagebox.showerror, "Error", "โปรดตั้งค่า UnrealBuildTool.exe ใน Settings")
-                return
-            log_append(self.log, "=== Build Editor ===")
-            if not build_editor(ubt, uproject, self.log):
-                self.call_in_main(messagebox.showerror, "Error", "Build Editor ล้มเหลว")
-                return
+def record_check_history(res, kind="check", logbox=None):
+    """บันทึกผล git_check (ใช้ res['timings'] เป็นเวลาแต่ละ stage)"""
+    if not res.get("repo"):
+        return None
+    timings = res.get("timings", {})
+    wt = res.get("worktree") or {}
+    run = {"kind": kind, "uproject": res.get("uproject"), "repo": res["repo"], "started_at": res.get("started_at", time.time()),
+           "total_s": sum(timings.values()), "status": "ok" if res.get("ok") else "failed",
+           "behind": res.get("behind_upstream"), "ahead": res.get("ahead_origin"),
+           "dirty": int(bool(wt.get("dirty"))) if wt else None}  # None = check นี้ไม่ได้ดู working tree
+    try:
+        return history_db().add_run(run, [(name, "stage", secs, None, None) for name, secs in timings.items()])
+    except sqlite3.Error as e:
+        log_append(logbox, f"[history] บันทึกไม่ได้: {e}")
+        return None
 
-        if not editor_exe or not os.path.isfile(editor_exe):
-            self.call_in_main(messagebox.showerror, "Error", "โปรดตั้งค่า UnrealEditor.exe ใน Settings")
-            return
+def percentile(values, q):
+    """nearest-rank percentile (q = 0..100)"""
+    if not values:
+        return None
+    vals = sorted(values)
+    return vals[max(0, min(len(vals) - 1, math.ceil(q / 100.0 * len(vals)) - 1))]
+
+def history_stats(runs, bucket="day"):
+    """p50/p95 ต่อ stage ต่อช่วงเวลา: [(period, stage, n, p50, p95)]"""
+    fmt = {"day": "%Y-%m-%d", "week": "%Y-W%W", "month": "%Y-%m"}[bucket]
+    groups = {}
+    for r in runs:
+        if r["status"] not in (None, "ok"):
+            continue
+        period = time.strftime(fmt, time.localtime(r["started_at"]))
+        for name, secs in r["stages"].items():
+            groups.setdefault((period, name), []).append(secs)
+    return [(period, name, len(v), percentile(v, 50), percentile(v, 95)) for (period, name), v in sorted(groups.items())]
+
+def history_regressions(runs, stages=None, window=None, threshold=None):
+    """run ที่ stage ช้ากว่า median ของ `window` run ก่อนหน้าเกิน threshold
+    คืน [{run, stage, seconds, baseline, ratio, range}] โดย range = commit ที่เข้ามาตั้งแต่ run ก่อนหน้า"""
+    stages = stages or HISTORY_WATCH
+    window = window or HISTORY_WINDOW
+    threshold = HISTORY_THRESHOLD if threshold is None else threshold
+    ok_runs = [r for r in runs if r["status"] in (None, "ok")]
+    flags = []
+    for i, r in enumerate(ok_runs):
+        prev = ok_runs[max(0, i - window):i]
+        for stage in stages:
+            secs = r["stages"].get(stage)
+            base = [p["stages"][stage] for p in prev if stage in p["stages"]]
+            if secs is None or len(base) < 3:
+                continue
+            med = percentile(base, 50)
+            if med and secs > med * (1 + threshold) and secs - med > 1.0:  # กัน noise ระดับวินาที
+                before, after = (prev[-1]["head_after"] if prev else r["head_before"]), r["head_after"]
+                flags.append({"run": r["id"], "started_at": r["started_at"], "stage": stage, "seconds": secs,
+                              "baseline": med, "ratio": secs / med,
+                              "range": f"{before}..{after}" if before and after and before != after else None})
+    return flags
+
+def format_history(runs, bucket="day"):
+    lines = [f"{'period':10}  {'stage':22} {'n':>4} {'p50':>9} {'p95':>9}"]
+    for period, name, n, p50, p95 in history_stats(runs, bucket):
+        lines.append(f"{period:10}  {name:22} {n:4d} {p50:8.2f}s {p95:8.2f}s")
+    flags = history_regressions(runs)
+    if flags:
+        lines.append("")
+        lines.append("Regression:")
+        for f in flags:
+            when = time.strftime("%Y-%m-%d %H:%M", time.localtime(f["started_at"]))
+            lines.append(f"  {when}  {f['stage']}: {f['seconds']:.1f}s vs median {f['baseline']:.1f}s "
+                         f"(x{f['ratio']:.2f})  " + (f"commits {f['range'][:10]}..{f['range'].split('..')[1][:10]}" if f["range"] else "ไม่มี commit ใหม่ (เครื่อง/engine?)"))
+    return "\n".join(lines)
+
+# ===================== Editor Startup Profile =====================
+# (ชื่อ, regex, "first" = บรรทัดแรกที่เจอ / "last" = บรรทัดสุดท้ายก่อน ready) ตามลำดับที่ UE มักพิมพ์
+EDITOR_MILESTONES = (
+    ("plugins",        r"LogPluginManager: Mount(?:ing|ed) ", "last"),
+    ("asset_registry", r"LogAssetRegistry: .*(?:search completed|discovery (?:search )?complete|gather(?:ing)? completed)", "first"),
+    ("shaders",        r"LogShaderCompilers: .*(?:compil|shaders left)", "last"),
+    ("engine_init",    r"LogInit: Display: Engine is initialized", "first"),
+    ("map_load",       r"LogLoad: Took [\d.]+ seconds to LoadMap", "first"),
+    ("ready",          r"LogLoad: \(Engine Initialization\) Total time", "first"),
+)
+# ตัวนับ: regex ที่มี group = ค่าสูงสุดของตัวเลข (group แรกที่จับได้), ไม่มี group = จำนวนบรรทัด
+EDITOR_COUNTERS = (
+    ("shader_jobs", r"shaders left to compile:?\s*(\d+)|(\d+) shaders left to compile"),  # UE แต่ละรุ่นพิมพ์ต่างกัน
+    ("ddc_miss",    r"LogDerivedDataCache: .*\bmiss"),
+    ("errors",      r"^(?:\[[^\]]*\]){2}\w+: Error: "),
+)
+UE_LOG_TS_RE = re.compile(r"^\[(\d{4})\.(\d\d)\.(\d\d)-(\d\d)\.(\d\d)\.(\d\d):(\d{3})\]")
+
+def _ue_log_seconds(line):
+    """timestamp [YYYY.MM.DD-HH.MM.SS:mmm] ของบรรทัด log เป็นวินาที (ใช้หาผลต่างเท่านั้น) หรือ None"""
+    m = UE_LOG_TS_RE.match(line)
+    if not m:
+        return None
+    y, mo, d, h, mi, s, ms = (int(g) for g in m.groups())
+    return timegm((y, mo, d, h, mi, s)) + ms / 1000.0
+
+def editor_log_dir(uproject):
+    return os.path.join(os.path.dirname(os.path.abspath(uproject)), "Saved", "Logs")
+
+class EditorStartupProfiler:
+    """ติดตาม editor ที่ spawn: tail Saved/Logs/<Project>.log ทีละส่วน (อ่านเฉพาะ byte ใหม่)
+    จับเวลา milestone ตั้งแต่ spawn จนถึง ready แล้วเรียก on_done(profile)
+    เวลาของแต่ละบรรทัดใช้ timestamp ใน log เทียบบรรทัดแรก (ละเอียดระดับ ms ไม่ขึ้นกับรอบ poll)"""
+    def __init__(self, uproject, logbox=None, on_done=None, poll=None, timeout=None, clock=time.monotonic):
+        self.uproject = uproject
+        self.name = os.path.splitext(os.path.basename(uproject))[0]
+        self.log_dir = editor_log_dir(uproject)
+        self.logbox = logbox
+        self.on_done = on_done
+        self.poll = poll or STARTUP_POLL_S
+        self.timeout = timeout or STARTUP_TIMEOUT_S
+        self.clock = clock
+        self.milestones, self.counts = {}, {name: 0 for name, _ in EDITOR_COUNTERS}
+        self._ms_re = [(name, re.compile(rx, re.I), mode) for name, rx, mode in EDITOR_MILESTONES]
+        self._cnt_re = [(name, re.compile(rx, re.I)) for name, rx in EDITOR_COUNTERS]
+        self._first = None  # (log seconds, เวลาตั้งแต่ spawn) ของบรรทัดแรกที่มี timestamp
+        self._f, self._buf = None, b""
+        self.log_path = self.proc = self.profile = None
+        self._done = threading.Event()
+        self._old = self._snapshot()  # ต้องถ่ายก่อน spawn: UE ย้าย log เดิมเป็น -backup ทันทีที่เริ่ม
+
+    def _candidates(self):
+        pat = re.compile(rf"^{re.escape(self.name)}(?:_\d+)?\.log$", re.I)  # _2 = มี editor อีกตัวถือไฟล์หลักอยู่
+        try:
+            names = [n for n in os.listdir(self.log_dir) if pat.match(n)]
+        except OSError:
+            return {}
+        out = {}
+        for n in names:
+            try:
+                st = os.stat(os.path.join(self.log_dir, n))
+                out[os.path.join(self.log_dir, n)] = (st.st_ino, st.st_mtime_ns, st.st_mtime)
+            except OSError:
+                pass
+        return out
+
+    def _snapshot(self):
+        return {path: v[:2] for path, v in self._candidates().items()}
+
+    def start(self, proc):
+        self.proc = proc
+        self.t0 = self.clock()
+        self.started_at = time.time()
+        threading.Thread(target=self._run, name="editor-startup", daemon=True).start()
+        return self
+
+    def wait(self, timeout=None):
+        self._done.wait(timeout)
+        return self.profile
+
+    def elapsed(self):
+        return self.clock() - self.t0
+
+    def feed(self, line, observed):
+        """บรรทัดหนึ่งของ log + เวลาที่อ่านเจอ (วินาทีตั้งแต่ spawn); คืน True เมื่อถึง ready"""
+        ts = _ue_log_seconds(line)
+        if ts is not None and self._first is None:
+            self._first = (ts, observed)
+        t = observed if ts is None or self._first is None else max(0.0, self._first[1] + ts - self._first[0])
+        if "log_open" not in self.milestones:
+            self.milestones["log_open"] = t
+        for name, rx, mode in self._ms_re:
+            if (mode == "last" or name not in self.milestones) and rx.search(line):
+                if name not in self.milestones and mode == "first":
+                    log_append(self.logbox, f"[startup] {name} {t:.1f}s")
+                self.milestones[name] = t
+        for name, rx in self._cnt_re:
+            m = rx.search(line)
+            if m:
+                if rx.groups:
+                    self.counts[name] = max(self.counts[name], int(next(g for g in m.groups() if g is not None)))
+                else:
+                    self.counts[name] += 1
+        return "ready" in self.milestones
+
+    def _open_log(self):
+        new = [(v[2], path) for path, v in self._candidates().items()
+               if self._old.get(path) != v[:2] and v[2] >= self.started_at - 2]
+        if not new:
+            return False
+        self.log_path = max(new)[1]
+        self._f = open(self.log_path, "rb")
+        return True
 
-        log_append(self.log, "=== เปิดโปรเจกต์ ===")
-        open_project(editor_exe, uproject, self.log)
+    def _read(self, observed):
+        data = self._f.read()
+        if not data:
+            return False
+        lines = (self._buf + data).split(b"\n")
+        self._buf = lines.pop()
+        ready = False
+        for raw in lines:
+            ready = self.feed(raw.decode("utf-8", "replace").lstrip("\ufeff").rstrip("\r"), observed) or ready
+        return ready
+
+    def _run(self):
+        status, rc = "timeout", None
+        try:
+            while True:
+                now = self.elapsed()
+                if self._f is not None or self._open_log():
+                    if self._read(now):
+                        status = "ok"
+                        break
+                rc = self.proc.poll() if self.proc is not None else None
+                if rc is not None:
+                    if self._f is not None and self._read(self.elapsed()):
+                        status = "ok"
+                    else:
+                        status = "exited"
+                    break
+                if now > self.timeout:
+                    break
+                time.sleep(self.poll)
+        except Exception as e:
+            status = f"error: {e}"
+        finally:
+            if self._f is not None:
+                self._f.close()
+        self.profile = self.build_profile(status, rc)
+        if self.on_done:
+            try: self.on_done(self.profile)
+            except Exception as e: log_append(self.logbox, f"[startup] บันทึก profile ไม่ได้: {e}")
+        self._done.set()
+
+    def build_profile(self, status, exit_code=None):
+        order = sorted(self.milestones.items(), key=lambda kv: kv[1])
+        phases, prev = [], 0.0
+        for name, t in order:  # waterfall: เวลาของ phase = จาก milestone ก่อนหน้าถึง milestone นี้
+            phases.append([name, round(t - prev, 3)])
+            prev = t
+        return {"uproject": self.uproject, "log": self.log_path, "pid": getattr(self.proc, "pid", None),
+                "started_at": getattr(self, "started_at", time.time()), "finished_at": time.time(),
+                "status": status, "exit_code": exit_code,
+                "ready_s": round(self.milestones["ready"], 3) if "ready" in self.milestones else None,
+                "elapsed": round(self.elapsed(), 3) if self.proc is not None else None,
+                "milestones": {k: round(v, 3) for k, v in order}, "phases": phases, "counts": dict(self.counts)}
+
+def save_startup_profile(profile, uproject, profile_dir=None):
+    profile_dir = os.path.join(profile_dir or STARTUP_PROFILE_DIR, os.path.splitext(os.path.basename(uproject))[0])
+    os.makedirs(profile_dir, exist_ok=True)
+    path = os.path.join(profile_dir, time.strftime("startup_%Y%m%d_%H%M%S.json", time.localtime(profile["started_at"])))
+    save_json_file(path, profile)
+    return path
+
+def load_startup_profiles(uproject, profile_dir=None, limit=None):
+    """profile ล่าสุด `limit` ตัว (ใหม่สุดก่อน)"""
+    profile_dir = os.path.join(profile_dir or STARTUP_PROFILE_DIR, os.path.splitext(os.path.basename(uproject))[0])
+    try:
+        names = sorted((n for n in os.listdir(profile_dir) if n.endswith(".json")), reverse=True)
+    except OSError:
+        return []
+    return [load_json_file(os.path.join(profile_dir, n), {}) for n in names[:limit or HISTORY_WINDOW]]
+
+def compare_startup_profiles(prevs, cur, threshold=None):
+    """เทียบแต่ละ phase (และ ready) กับ median ของ launch ก่อน ๆ ที่ ready สำเร็จ
+    คืน [(name, median, cur_s, slower)] โดย slower = ช้ากว่า median เกิน threshold และเกิน 1 วินาที"""
+    threshold = HISTORY_THRESHOLD if threshold is None else threshold
+    ok = [p for p in prevs if p.get("status") == "ok"]
+    rows = []
+    for name, secs in cur.get("phases", []) + ([["total", cur["ready_s"]]] if cur.get("ready_s") is not None else []):
+        base = [p["ready_s"] if name == "total" else dict(p.get("phases", [])).get(name) for p in ok]
+        base = [b for b in base if b is not None]
+        med = percentile(base, 50)
+        slower = med is not None and secs > med * (1 + threshold) and secs - med > 1.0
+        rows.append((name, med, secs, slower))
+    return rows
+
+def log_startup_profile(profile, prevs, logbox):
+    head = f"พร้อมใช้ใน {profile['ready_s']:.1f}s" if profile.get("ready_s") is not None else f"ไม่ถึง ready ({profile['status']})"
+    log_append(logbox, f"=== Editor startup: {head} ===")
+    t = 0.0
+    for name, med, secs, slower in compare_startup_profiles(prevs, profile):
+        if name == "total":
+            continue
+        t += secs
+        base = f"  median {med:6.2f}s" if med is not None else ""
+        log_append(logbox, f"  {name:15} +{secs:7.2f}s  @{t:7.2f}s{base}{'  << ช้าลง' if slower else ''}")
+    c = profile["counts"]
+    log_append(logbox, f"  shader jobs {c.get('shader_jobs', 0)} | DDC miss {c.get('ddc_miss', 0)} | error {c.get('errors', 0)}")
+
+def record_startup_history(profile, logbox=None):
+    """startup profile -> launch history (kind = startup) ให้ History แสดง p50/p95 และ commit ที่ทำให้ช้าลง"""
+    uproject = profile["uproject"]
+    repo = get_repo_root_from_uproject(uproject)
+    if not repo:
+        return None
+    head = git_head_sha(repo)
+    run = {"kind": "startup", "uproject": uproject, "repo": repo, "started_at": profile["started_at"],
+           "total_s": profile["ready_s"] if profile.get("ready_s") is not None else profile.get("elapsed"),
+           "head_before": head, "head_after": head, "status": profile["status"],
+           "error": None if profile["status"] == "ok" else f"exit {profile.get('exit_code')}"}
+    try:
+        return history_db().add_run(run, [(name, "stage", secs, None, None) for name, secs in profile["phases"]])
+    except sqlite3.Error as e:
+        log_append(logbox, f"[history] บันทึกไม่ได้: {e}")
+        return None
 
-    def do_git_check(self, silent=False):
-        uproject = self.ctx["uproject"].get()
-        logbox = self.log
-        res = {"ok": False, "repo": None, "branch": None,
-               "behind_upstream": 0, "ahead_origin": 0,
-               "upstream_target": None, "origin_target": None,
-               "behind_list": [], "ahead_list": []}
+def finish_startup_profile(profile, logbox=None):
+    """on_done ของ EditorStartupProfiler: log เทียบ launch ก่อน ๆ แล้วเก็บ profile + history"""
+    prevs = load_startup_profiles(profile["uproject"])
+    log_startup_profile(profile, prevs, logbox)
+    try: save_startup_profile(profile, profile["uproject"])
+    except OSError as e: log_append(logbox, f"[startup] บันทึก profile ไม่ได้: {e}")
+    record_startup_history(profile, logbox)
+
+# ===================== Multi-project Dashboard =====================
+def check_many(uprojects, logbox=None, workers=None, timeout_s=None, fetch=True):
+    """เช็ค git ของหลาย .uproject พร้อมกันด้วย worker pool จำกัดขนาด
+    .uproject ที่อยู่ repo เดียวกันเช็คครั้งเดียว; repo ที่เกิน timeout ถูกรายงานเป็น 'timeout'
+    คืน rows ตามลำดับ input"""
+    workers = workers or DASHBOARD_WORKERS
+    timeout_s = timeout_s or DASHBOARD_TIMEOUT_S
+    uprojects = [u for u in dict.fromkeys(uprojects) if u]
+    repos = {u: get_repo_root_from_uproject(u) for u in uprojects}
+    started, results = {}, {}
+    cancels = {repo: threading.Event() for repo in repos.values() if repo}
+
+    def _one(repo, uproject):
+        started[repo] = time.perf_counter()
+        with cancel_scope(cancels[repo]):  # timeout -> kill git ของ repo นี้ ไม่ให้ thread ค้าง
+            res = git_check(uproject, None, silent=True, fetch=fetch, worktree=False)  # ตารางไม่มีคอลัมน์ working tree
+        res["seconds"] = time.perf_counter() - started[repo]
+        return res
 
-        repo = get_repo_root_from_uproject(uproject)
-        res["repo"] = repo
+    pool = ThreadPoolExecutor(max_workers=workers)
+    futs = {}
+    for u, repo in repos.items():
+        if repo and repo not in futs.values():
+            futs[pool.submit(_one, repo, u)] = repo
+    pending = set(futs)
+    while pending:
+        done, pending = futures_wait(pending, timeout=0.1, return_when=FIRST_COMPLETED)
+        for f in done:
+            try:
+                results[futs[f]] = f.result()
+            except Exception as e:
+                results[futs[f]] = {"ok": False, "error": str(e)}
+        now = time.perf_counter()
+        for f in list(pending):
+            repo = futs[f]
+            if repo in started and now - started[repo] > timeout_s:
+                pending.discard(f)
+                cancels[repo].set()
+                results[repo] = {"ok": False, "error": "timeout", "seconds": now - started[repo]}
+        if logbox is not None:
+            for f in done:
+                log_append(logbox, f"[dashboard] {futs[f]}: {'ok' if results[futs[f]].get('ok') else 'fail'}")
+    pool.shutdown(wait=False)
+
+    rows = []
+    for u in uprojects:
+        repo = repos[u]
+        res = results.get(repo, {}) if repo else {"ok": False, "error": "ไม่พบ .git"}
+        rows.append({
+            "uproject": u,
+            "project": os.path.splitext(os.path.basename(u))[0],
+            "repo": repo,
+            "ok": bool(res.get("ok")),
+            "status": "ok" if res.get("ok") else (res.get("error") or "git check ไม่สำเร็จ"),
+            "branch": res.get("branch"),
+            "behind_upstream": res.get("behind_upstream", 0),
+            "ahead_origin": res.get("ahead_origin", 0),
+            "upstream_target": res.get("upstream_target"),
+            "origin_target": res.get("origin_target"),
+            "seconds": round(res.get("seconds", 0.0), 3),
+        })
+    return rows
+
+def format_dashboard(rows):
+    """ตาราง ahead/behind แบบ monospace พร้อมแถวรวม"""
+    head = ("#", "Project", "Branch", "Behind", "Ahead", "Status", "Time")
+    table = [head]
+    for i, r in enumerate(rows, 1):
+        table.append((str(i), r["project"], r["branch"] or "-",
+                      str(r["behind_upstream"]), str(r["ahead_origin"]), r["status"], f"{r['seconds']:.2f}s"))
+    behind = sum(1 for r in rows if r["behind_upstream"] > 0)
+    ahead = sum(1 for r in rows if r["ahead_origin"] > 0)
+    failed = sum(1 for r in rows if not r["ok"])
+    slowest = max([r["seconds"] for r in rows] or [0.0])
+    widths = [max(len(row[c]) for row in table) for c in range(len(head))]
+    lines = ["  ".join(cell.ljust(w) for cell, w in zip(row, widths)).rstrip() for row in table]
+    lines.insert(1, "  ".join("-" * w for w in widths))
+    lines.append(f"รวม {len(rows)} โปรเจกต์: ตามหลัง {behind}, ยังไม่ push {ahead}, ล้มเหลว {failed}, repo ช้าสุด {slowest:.2f}s")
+    return "\n".join(lines)
+
+# ===================== CLI (headless) =====================
+def process_age_ms():
+    """เวลาตั้งแต่ OS สร้าง process นี้ (รวม interpreter start และ import ทั้งหมด) เป็น ms"""
+    try:
+        if sys.platform.startswith("linux"):
+            with open("/proc/self/stat", "rb") as f:  # field 22 = starttime (clock tick หลัง boot)
+                start = int(f.read().rsplit(b")", 1)[1].split()[19]) / os.sysconf("SC_CLK_TCK")
+            with open("/proc/uptime", "rb") as f:
+                return max(0.0, (float(f.read().split()[0]) - start) * 1000)
+        if os.name == "nt":
+            import ctypes
+            k32 = ctypes.windll.kernel32
+            times = [ctypes.c_ulonglong() for _ in range(4)]  # FILETIME (หน่วย 100 ns): created, exited, kernel, user
+            now = ctypes.c_ulonglong()
+            k32.GetSystemTimeAsFileTime(ctypes.byref(now))
+            if k32.GetProcessTimes(k32.GetCurrentProcess(), *(ctypes.byref(t) for t in times)):
+                return max(0.0, (now.value - times[0].value) / 10000.0)
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    return (time.perf_counter() - _T_START) * 1000
+
+def cli_main(argv):
+    global CONFIG_FILE
+    import argparse
+    ap = argparse.ArgumentParser(prog="RNDLauncher", description="Rewind and Desires Launcher (headless)")
+    ap.add_argument("--config", default=CONFIG_FILE, help="ไฟล์ config (ค่าเริ่มต้นเดียวกับ UI)")
+    ap.add_argument("--uproject", help="override .uproject จาก config")
+    ap.add_argument("--timing", action="store_true", help="แสดงเวลา startup เทียบ budget")
+    sub = ap.add_subparsers(dest="command")
+    p = sub.add_parser("check", help="fetch + เทียบ upstream/origin")
+    p.add_argument("--no-fetch", action="store_true")
+    p = sub.add_parser("status", help="สถานะ git (ไม่ fetch ถ้าไม่สั่ง)")
+    p.add_argument("--json", action="store_true")
+    p.add_argument("--fetch", action="store_true")
+    p.add_argument("--snapshot", action="store_true", help="แสดงผลล่าสุดที่บันทึกไว้ (ไม่รัน git) พร้อมบอกว่าเก่าไหม")
+    p = sub.add_parser("build", help="Generate Project Files (ถ้าเปิด autogen) + Build Editor")
+    p.add_argument("--force", action="store_true", help="build แม้ fingerprint ไม่เปลี่ยน")
+    p = sub.add_parser("open", help="check -> (pull) -> generate -> build -> เปิด editor")
+    p.add_argument("--pull", action="store_true", help="pull --rebase อัตโนมัติถ้าตามหลัง")
+    p.add_argument("--no-check", action="store_true")
+    p.add_argument("--wait-ready", action="store_true", help="รอจน editor พร้อมใช้แล้วแสดง startup profile")
+    p = sub.add_parser("worktree", help="สถานะ working tree (staged/unstaged/untracked/conflicted)")
+    p.add_argument("--json", action="store_true")
+    p.add_argument("--compare", action="store_true", help="จับเวลาเทียบกับ git status ปกติ")
+    p.add_argument("--repeat", type=int, default=3)
+    p = sub.add_parser("log", help="รายการ commit ของ range แบบแบ่งหน้า (ใช้ commit cache)")
+    p.add_argument("range", nargs="?", help="rev range (ค่าเริ่มต้น HEAD..<upstream target>)")
+    p.add_argument("--page", type=int, default=0)
+    p.add_argument("--page-size", type=int, default=COMMIT_PAGE_SIZE)
+    p.add_argument("--json", action="store_true")
+    p = sub.add_parser("logs", help="ค้นหา/เปิด log ของ session ก่อน ๆ")
+    p.add_argument("--file", help="ไฟล์ log (ค่าเริ่มต้น: ล่าสุดใน launcher_logs)")
+    p.add_argument("--search", help="ข้อความที่ค้นหา")
+    p.add_argument("--regex", action="store_true")
+    p.add_argument("--case", action="store_true", help="แยกตัวพิมพ์เล็ก/ใหญ่")
+    p.add_argument("--line", type=int, help="แสดงบรรทัดรอบ ๆ บรรทัดนี้")
+    p.add_argument("--context", type=int, default=20)
+    p = sub.add_parser("history", help="p50/p95 เวลาแต่ละ stage และ regression จาก launch history")
+    p.add_argument("--kind", default="open", help="open / build / check / auto_check / startup")
+    p.add_argument("--days", type=int, default=30)
+    p.add_argument("--bucket", choices=("day", "week", "month"), default="day")
+    p.add_argument("--json", action="store_true")
+    p = sub.add_parser("timings", help="histogram เวลา compile ของ build ล่าสุด เทียบกับครั้งก่อน")
+    p.add_argument("--top", type=int, default=15)
+    p = sub.add_parser("prebuild", help="build upstream ล่วงหน้าใน worktree เงา (ใช้ Binaries ทันทีหลัง pull)")
+    p.add_argument("--no-fetch", action="store_true")
+    p.add_argument("--ref", help="commit/ref ที่จะ build (ค่าเริ่มต้น: upstream target)")
+    p = sub.add_parser("tools", help="ค้นหา UnrealBuildTool/UnrealEditor ของหลาย engine install พร้อมกัน")
+    p.add_argument("--engine", action="append", help="โฟลเดอร์ engine (ซ้ำได้; ค่าเริ่มต้น: engines ใน config)")
+    p.add_argument("--register", action="store_true", help="บันทึก engine ที่เจอเครื่องมือลง engines ใน config")
+    p.add_argument("--json", action="store_true")
+    p = sub.add_parser("dashboard", help="เช็คหลาย .uproject พร้อมกัน (ค่าเริ่มต้น: projects ใน config)")
+    p.add_argument("uprojects", nargs="*")
+    p.add_argument("--json", action="store_true")
+    p.add_argument("--no-fetch", action="store_true")
+    p.add_argument("--workers", type=int, default=DASHBOARD_WORKERS)
+    p.add_argument("--timeout", type=float, default=DASHBOARD_TIMEOUT_S)
+    args = ap.parse_args(argv)
+    if not args.command:
+        ap.print_help()
+        return 2
+
+    CONFIG_FILE = args.config
+    settings = dict(DEFAULT_SETTINGS, **load_settings())
+    if args.uproject: settings["uproject"] = args.uproject
+    as_json = args.command in ("status", "dashboard", "log", "worktree", "history", "tools") and args.json
+    store = None
+    if args.command in ("check", "build", "open", "prebuild"):  # เก็บ output ของ git/UBT ไว้ค้นย้อนหลัง
+        store = LogStore(f"cli_{args.command}")
+        atexit.register(store.close)
+    logbox = ConsoleLog(sys.stderr if as_json else sys.stdout, store=store)
+
+    startup_ms = process_age_ms()
+    if args.timing:
+        over = "" if startup_ms <= CLI_STARTUP_BUDGET_MS else "  (เกิน budget!)"
+        sys.stderr.write(f"startup {startup_ms:.1f} ms / budget {CLI_STARTUP_BUDGET_MS} ms{over}\n")
+
+    if args.command == "status" and args.snapshot:
+        snap, stale = load_status_snapshot(settings["uproject"])
+        if snap is None:
+            log_append(logbox, "ยังไม่มี snapshot (รัน check ก่อน)")
+            return 1
+        if as_json:
+            sys.stdout.write(json.dumps(dict(snap, stale=stale), ensure_ascii=False, indent=2) + "\n")
+            return 0
+        log_append(logbox, f"snapshot {format_age(snap['saved_at'])}: " + (f"ข้อมูลเก่า ({', '.join(stale)})" if stale else "ref ไม่เปลี่ยน"))
+        log_append(logbox, f"Branch: {snap['res']['branch']}")
+        log_append(logbox, format_git_status(snap["res"]))
+        return 0
+
+    if args.command in ("check", "status"):
+        fetch = (args.command == "check" and not args.no_fetch) or (args.command == "status" and args.fetch)
+        res = git_check(settings["uproject"], logbox, silent=as_json, fetch=fetch)
+        if args.command == "check":
+            record_check_history(res, "check", logbox)
+        save_status_snapshot(res)
+        if as_json:
+            res["startup_ms"] = round(startup_ms, 1)
+            sys.stdout.write(json.dumps(res, ensure_ascii=False, indent=2) + "\n")
+        elif res.get("ok"):
+            log_append(logbox, f"Branch: {res['branch']}")
+            log_append(logbox, format_git_status(res))
+        else:
+            log_append(logbox, "Git check ไม่สำเร็จ")
+        return 0 if res.get("ok") else 1
+
+    if args.command == "prebuild":
+        res = git_check(settings["uproject"], logbox, silent=True, fetch=not args.no_fetch, worktree=False)
+        if not res.get("ok"):
+            log_append(logbox, "Git check ไม่สำเร็จ")
+            return 1
+        ref = args.ref or res["upstream_target"] or res["origin_target"]
+        sha = git_rev_sha(res["repo"], ref) if ref else None
+        if not sha:
+            log_append(logbox, f"ไม่พบ commit ของ {ref}")
+            return 1
+        if not args.ref and res["behind_upstream"] == 0:
+            log_append(logbox, "ไม่มี commit ใหม่จาก upstream: ไม่ต้อง prebuild")
+            return 0
+        state = prebuild_upstream(settings, res["repo"], sha, logbox)
+        return 0 if state and state.get("ok") else 1
+
+    if args.command == "worktree":
+        repo = get_repo_root_from_uproject(settings["uproject"])
         if not repo:
-            if not silent: log_append(logbox, "ไม่พบ .git ใกล้ไฟล์ .uproject")
-            return res
-        if not git_fetch_all(repo, logbox): return res
-
-        branch = git_current_branch(repo)
-        if not branch:
-            log_append(logbox, "ตรวจ branch ไม่ได้")
-            return res
-        res["branch"] = branch
-
-        if git_has_remote(repo, "upstream"):
-            upstream_target = git_default_remote_branch(repo, "upstream") or f"upstream/{branch}"
-            res["upstream_target"] = upstream_target
-            behind, _ = git_ahead_behind(repo, upstream_target, "HEAD")
-            if behind is not None:
-                res["behind_upstream"] = behind
-                if behind > 0:
-                    res["behind_list"] = git_list_commits(repo, f"HEAD..{upstream_target}", 5)
+            log_append(logbox, "ไม่พบ .git")
+            return 1
+        wt = git_worktree_status(repo, sample=20)
+        if args.compare:
+            wt["timing"] = compare_status_timing(repo, args.repeat)
+        if as_json:
+            sys.stdout.write(json.dumps(wt, ensure_ascii=False, indent=2) + "\n")
+            return 0 if wt["ok"] else 1
+        log_append(logbox, f"{format_worktree(wt)} ({wt['seconds']:.3f}s)")
+        for path in wt.get("paths", []):
+            log_append(logbox, f"  {path}")
+        if args.compare:
+            t = wt["timing"]
+            log_append(logbox, f"git status ปกติ {t['plain']:.3f}s | fast {t['fast']:.3f}s (x{t['speedup']}) | "
+                               f"index-only {t['index_only']:.3f}s")
+        return 0 if wt["ok"] else 1
+
+    if args.command == "log":
+        repo = get_repo_root_from_uproject(settings["uproject"])
+        if not repo:
+            log_append(logbox, "ไม่พบ .git")
+            return 1
+        rev_range = args.range
+        if not rev_range:
+            probe = git_status_probe(repo, limit=0)
+            target = probe["upstream_target"] or probe["origin_target"]
+            rev_range = f"HEAD..{target}" if target else "HEAD"
+        clog = CommitLog(repo, rev_range, page_size=args.page_size)
+        if not clog.refresh():
+            log_append(logbox, f"อ่าน {rev_range} ไม่ได้")
+            return 1
+        rows = clog.page(args.page)
+        if as_json:
+            sys.stdout.write(json.dumps({"range": rev_range, "total": len(clog), "page": args.page,
+                                         "parsed": clog.parsed, "commits": rows}, ensure_ascii=False, indent=2) + "\n")
+            return 0
+        log_append(logbox, f"{rev_range}: {len(clog)} commit (หน้า {args.page}, parse ใหม่ {clog.parsed})")
+        for c in rows:
+            log_append(logbox, format_commit(c))
+        return 0
+
+    if args.command == "logs":
+        files = list_log_files()
+        if not args.file and not args.search and args.line is None:
+            for path, size, mtime in files:
+                log_append(logbox, f"{time.strftime('%Y-%m-%d %H:%M', time.localtime(mtime))}  {size / 1e6:8.2f} MB  {path}")
+            return 0
+        path = args.file or (files[0][0] if files else None)
+        if not path or not os.path.isfile(path):
+            log_append(logbox, "ไม่พบไฟล์ log")
+            return 1
+        lf = LogFile(path)
+        try:
+            if args.search:
+                hits = lf.search(args.search, regex=args.regex, ignore_case=not args.case)
+                for n, text in hits:
+                    log_append(logbox, f"{n + 1}: {text}")
+                log_append(logbox, f"เจอ {len(hits)} บรรทัดใน {path}")
+            if args.line is not None:
+                for n, text in lf.lines(args.line - 1 - args.context, 2 * args.context + 1):
+                    log_append(logbox, f"{'>' if n == args.line - 1 else ' '}{n + 1}: {text}")
+        finally:
+            lf.close()
+        return 0
+
+    if args.command == "history":
+        try:
+            runs = history_db().runs(args.kind, settings["uproject"] or None, since=time.time() - args.days * 86400)
+        except sqlite3.Error as e:
+            log_append(logbox, f"อ่าน history ไม่ได้: {e}")
+            return 1
+        if as_json:
+            sys.stdout.write(json.dumps({"runs": runs, "stats": history_stats(runs, args.bucket),
+                                         "regressions": history_regressions(runs)}, ensure_ascii=False, indent=2) + "\n")
+            return 0
+        log_append(logbox, f"{args.kind}: {len(runs)} run ใน {args.days} วัน")
+        log_append(logbox, format_history(runs, args.bucket))
+        return 0
+
+    if args.command == "timings":
+        reports = load_build_timings(settings["uproject"], limit=2)
+        if not reports:
+            log_append(logbox, "ยังไม่มีข้อมูลเวลา build")
+            return 1
+        for key in ("modules", "files"):
+            log_append(logbox, f"--- {key} (completion interval) ---")
+            log_append(logbox, format_build_histogram(reports[0], key, args.top))
+        if len(reports) > 1:
+            log_append(logbox, "--- completion interval ยาวขึ้นจาก build ก่อน ---")
+            for name, before, after, delta in compare_build_timings(reports[1], reports[0], top=args.top):
+                log_append(logbox, f"{name}: {before:.2f}s -> {after:.2f}s (+{delta:.2f}s)")
+        return 0
+
+    if args.command == "tools":
+        engines = args.engine or settings.get("engines") or [settings["engine_dir"]]
+        t0 = time.perf_counter()
+        found = autodetect_tools_many(engines)
+        if args.register:
+            usable = [d for d, (ubt, editor) in found.items() if ubt or editor]
+            settings["engines"] = list(dict.fromkeys((settings.get("engines") or []) + usable))
+            save_json_file(CONFIG_FILE, settings)
+        if as_json:
+            out = {d: {"ubt": ubt, "editor": editor} for d, (ubt, editor) in found.items()}
+            sys.stdout.write(json.dumps(out, ensure_ascii=False, indent=2) + "\n")
         else:
-            if not silent: log_append(logbox, "ไม่พบ remote 'upstream' (จะเทียบเฉพาะ origin)")
-
-        origin_target = f"origin/{branch}"
-        res["origin_target"] = origin_target
-        _, ahead = git_ahead_behind(repo, origin_target, "HEAD")
-        if ahead is not None:
-            res["ahead_origin"] = ahead
-            if ahead > 0:
-                res["ahead_list"] = git_list_commits(repo, f"{origin_target}..HEAD", 5)
-
-        res["ok"] = True
-        return res
-
-    def on_close(self):
-        save_settings(self.ctx)
-        if self.ctx["bg_job"]:
-            try: self.after_cancel(self.ctx["bg_job"])
-            except Exception: pass
-        self.destroy()
+            for d, (ubt, editor) in found.items():
+                log_append(logbox, f"{d}\n  UBT:    {ubt or '-'}\n  Editor: {editor or '-'}")
+            log_append(logbox, f"{len(found)} engine ใน {time.perf_counter() - t0:.2f}s")
+        return 0 if found and all(ubt for ubt, _ in found.values()) else 1
+
+    if args.command == "dashboard":
+        uprojects = args.uprojects or (settings.get("projects") or [settings["uproject"]])
+        t0 = time.perf_counter()
+        rows = check_many(uprojects, None if as_json else logbox, args.workers, args.timeout, not args.no_fetch)
+        if as_json:
+            sys.stdout.write(json.dumps(rows, ensure_ascii=False, indent=2) + "\n")
+        else:
+            log_append(logbox, format_dashboard(rows))
+            log_append(logbox, f"ใช้เวลารวม {time.perf_counter() - t0:.2f}s")
+        return 0 if all(r["ok"] for r in rows) else 1
 
-def main():
+    tracer = begin_trace(args.command)
+    try:
+        rc, g = _cli_open_or_build(args, settings, logbox)
+    finally:
+        end_trace(tracer, logbox)
+    if rc == 0 and args.command == "open" and args.wait_ready:  # เวลารอ editor ไม่นับใน trace ของ open
+        profile = g.result("launch").wait()
+        return 0 if profile and profile["status"] == "ok" else 1
+    return rc
+
+def _cli_open_or_build(args, settings, logbox):
+    if args.command == "build":
+        settings["autobuild"] = True
+        g = open_graph(settings, logbox, need_editor=False, force_build=args.force)
+        add_open_steps(g, logbox, launch=False)
+        ok = g.wait(["build"])
+    else:
+        pull_range = None
+        if not args.no_check:
+            with trace_span("git_check", "stage"):
+                res = git_check(settings["uproject"], logbox)
+            if res.get("ok"):
+                log_append(logbox, format_git_status(res))
+                if res["behind_upstream"] > 0 and args.pull:
+                    pull_range = pull_from_check(res, logbox)
+        g = open_graph(settings, logbox, pull_range)
+        add_open_steps(g, logbox)
+        ok = g.wait(["launch"])
+    err = g.first_error()
+    finish_graph(g, logbox)
+    if err is not None:
+        log_append(logbox, f"Error: {err}")
+    return (0 if ok else 1), g
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv:
+        try:
+            return cli_main(argv)
+        except KeyboardInterrupt:
+            return RC_CANCELLED
+        finally:
+            SUPERVISOR.shutdown()  # ก่อน interpreter join worker thread ที่ยังรอ child อยู่
+    if __name__ == "__main__":
+        sys.modules.setdefault("RNDLauncher", sys.modules["__main__"])  # ให้ UI ใช้ module เดียวกันกับ entry
+    from RNDLauncherUI import App  # import UI เฉพาะตอนเปิดหน้าต่าง
     App().mainloop()
+    return 0
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
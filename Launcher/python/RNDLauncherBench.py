@@ -0,0 +1,316 @@
+# -*- coding: utf-8 -*-
+"""Benchmark ของ launcher: สร้าง repo/engine/UBT ปลอมแล้วจับเวลา check, fetch, generate, build,
+autodetect และ log throughput พร้อมจำนวน process ที่ spawn และหน่วยความจำสูงสุด
+
+    python RNDLauncherBench.py --commits 5000 --behind 300 --ahead 20 --save-baseline bench.json
+    python RNDLauncherBench.py --baseline bench.json          # เทียบกับ baseline (exit 1 ถ้าช้าลงเกิน threshold)
+"""
+import os, sys, time, shutil, argparse, tempfile, threading, subprocess, tracemalloc, statistics
+
+import RNDLauncher as L
+
+# ===================== Instrumentation =====================
+_spawns = [0]
+_RealPopen = subprocess.Popen
+
+class _CountingPopen(_RealPopen):
+    def __init__(self, *args, **kwargs):
+        _spawns[0] += 1
+        super().__init__(*args, **kwargs)
+
+def _peak_rss_kb():
+    try:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    except ImportError:
+        return None
+
+def measure(fn, repeat=3, setup=None):
+    """รัน fn `repeat` รอบ คืน median วินาที, spawn ต่อรอบ และ peak ของ Python heap (KB)
+    (peak วัดจากรอบแยกอีกรอบ เพราะ tracemalloc ทำให้เวลาเพี้ยน)"""
+    times, spawns = [], []
+    for _ in range(repeat):
+        if setup: setup()
+        _spawns[0] = 0
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+        spawns.append(_spawns[0])
+    if setup: setup()
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1] // 1024
+    tracemalloc.stop()
+    return {"seconds": round(statistics.median(times), 4), "spawns": max(spawns), "peak_kb": peak}
+
+# ===================== Synthetic fixtures =====================
+def _git(args, cwd, stdin=None):
+    p = _RealPopen(["git"] + args, cwd=cwd, stdin=subprocess.PIPE if stdin is not None else None,
+                   stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    out, err = p.communicate(stdin)
+    if p.returncode != 0:
+        raise RuntimeError(f"git {' '.join(args)}: {err.decode(errors='replace')}")
+    return out.decode().strip()
+
+def _fast_import_chain(stream, ref, count, prefix, parent=None, mark_base=1):
+    """เขียน commit `count` ตัวต่อกันลง fast-import stream; คืน mark ตัวสุดท้าย"""
+    mark = None
+    for i in range(count):
+        mark = mark_base + i
+        msg = f"{prefix} {i}".encode()
+        body = f"// {prefix} {i}\n".encode()
+        stream += [f"commit {ref}\nmark :{mark}\n".encode(),
+                   f"committer Bench <bench@local> {1700000000 + mark} +0000\n".encode(),
+                   f"data {len(msg)}\n".encode() + msg + b"\n"]
+        if parent:
+            stream.append(f"from {parent}\n".encode())
+        stream.append(f"M 644 inline Source/Game/{prefix}_{i % 50}.cpp\ndata {len(body)}\n".encode() + body + b"\n")
+        parent = f":{mark}"
+    return mark
+
+def make_repos(root, commits=1000, branches=20, behind=50, ahead=5):
+    """seed -> up.git (upstream) / or.git (origin) / work (clone ที่ตามหลัง upstream `behind`, นำ origin `ahead`)"""
+    seed, up, orr, work = (os.path.join(root, n) for n in ("seed", "up.git", "or.git", "work"))
+    _git(["init", "-q", seed], root)
+    _git(["config", "user.name", "Bench"], seed)
+    _git(["config", "user.email", "bench@local"], seed)
+    stream = []
+    base = _fast_import_chain(stream, "refs/heads/main", commits, "base")
+    up_tip = _fast_import_chain(stream, "refs/heads/up", behind, "upstream", f":{base}", base + 1) or base
+    _fast_import_chain(stream, "refs/heads/local", ahead, "local", f":{base}", up_tip + 1) or base
+    for b in range(branches):
+        stream.append(f"reset refs/heads/feature{b}\nfrom :{max(1, base - b)}\n\n".encode())
+    _git(["fast-import", "--quiet"], seed, b"".join(stream))
+    if not behind:
+        _git(["branch", "up", "main"], seed)  # upstream = base (advance_upstream ต่อจาก refs/heads/up)
+    for bare in (up, orr):
+        _git(["init", "-q", "--bare", bare], root)
+        _git(["symbolic-ref", "HEAD", "refs/heads/main"], bare)  # ให้ remote HEAD ชี้ main (git < 2.28 ไม่มี init -b)
+    _git(["push", "-q", up, "up:refs/heads/main"] + [f"feature{b}" for b in range(branches)], seed)
+    _git(["push", "-q", orr, "main:refs/heads/main"], seed)
+    _git(["clone", "-q", "--no-checkout", seed, work], root)
+    local = _git(["rev-parse", "origin/local"], work)
+    _git(["remote", "remove", "origin"], work)
+    _git(["remote", "add", "origin", orr], work)
+    _git(["remote", "add", "upstream", up], work)
+    _git(["checkout", "-q", "-B", "main", local], work)
+    _git(["fetch", "-q", "--all"], work)
+    with open(os.path.join(work, "Game.uproject"), "w") as f:
+        f.write("{}")
+    return {"seed": seed, "up": up, "origin": orr, "work": work, "uproject": os.path.join(work, "Game.uproject")}
+
+def advance_upstream(repos, n=1):
+    """เพิ่ม commit บน upstream ให้ fetch รอบถัดไปมีของให้ดึง"""
+    seed = repos["seed"]
+    tip = _git(["rev-parse", "up"], seed)
+    tree = _git(["rev-parse", "up^{tree}"], seed)
+    for i in range(n):
+        tip = _git(["commit-tree", tree, "-p", tip, "-m", f"advance {time.time()} {i}"], seed)
+    _git(["update-ref", "refs/heads/up", tip], seed)
+    _git(["push", "-q", repos["up"], "up:refs/heads/main"], seed)
+
+STUB_SOURCE = '''import os, sys, time
+lines = int(os.environ.get("STUB_LINES", "1000"))
+delay = float(os.environ.get("STUB_SLEEP", "0"))
+for i in range(lines):
+    sys.stdout.write("[%d/%d] Compile Module.%d.cpp\\n" % (i + 1, lines, i % 500))
+    if delay: time.sleep(delay)
+sys.stdout.write("Total time in Parallel executor: 1.00 seconds\\n")
+sys.exit(int(os.environ.get("STUB_EXIT", "0")))
+'''
+
+def make_worktree_files(work, files=20000, tracked=0.5):
+    """ไฟล์ใน Content/ ของ work: สัดส่วน `tracked` ถูก commit (work นำ origin เพิ่ม 1 commit)
+    ที่เหลือเป็น untracked; แก้ไฟล์ที่ track 10 ไฟล์ (unstaged) และ stage 5 ไฟล์"""
+    paths = []
+    for i in range(files):
+        d = os.path.join(work, "Content", f"D{i % 100}", f"S{i // 2000}")
+        os.makedirs(d, exist_ok=True)
+        path = os.path.join(d, f"a{i}.uasset")
+        with open(path, "w") as f:
+            f.write(str(i))
+        paths.append(os.path.relpath(path, work))
+    added = paths[:int(files * tracked)]
+    for i in range(0, len(added), 1000):
+        _git(["add", "--"] + added[i:i + 1000], work)
+    _git(["-c", "user.name=Bench", "-c", "user.email=bench@local", "commit", "-q", "-m", "content"], work)
+    for rel in added[:15]:
+        with open(os.path.join(work, rel), "a") as f:
+            f.write("x")
+    _git(["add", "--"] + added[10:15], work)
+    return work
+
+def make_stub_tool(root, name):
+    """สคริปต์แทน UnrealBuildTool/UnrealEditor ที่พิมพ์ output ตาม STUB_LINES/STUB_SLEEP/STUB_EXIT"""
+    py = os.path.join(root, name + ".py")
+    with open(py, "w", encoding="utf-8") as f:
+        f.write(STUB_SOURCE)
+    if os.name == "nt":
+        exe = os.path.join(root, name + ".cmd")
+        with open(exe, "w") as f:
+            f.write(f'@"{sys.executable}" "{py}" %*\r\n')
+    else:
+        exe = os.path.join(root, name)
+        with open(exe, "w") as f:
+            f.write(f"#!{sys.executable}\n" + STUB_SOURCE)
+        os.chmod(exe, 0o755)
+    return exe
+
+def make_engine_tree(root, files=20000):
+    """โครง engine ปลอม: โฟลเดอร์ Content/Source/Plugins จำนวนมาก + binary อยู่นอกตำแหน่งมาตรฐาน"""
+    per_dir = 50
+    for i in range(files):
+        top = ("Content", "Source/Runtime", "Plugins/Runtime", "Intermediate")[i % 4]
+        d = os.path.join(root, "Engine", top, f"M{(i // per_dir) % 200}", f"S{i // (per_dir * 200)}")
+        os.makedirs(d, exist_ok=True)
+        open(os.path.join(d, f"f{i}.uasset"), "w").close()
+    for rel in ("Engine/Binaries/Custom/Win64/UnrealEditor.exe", "Engine/Binaries/DotNET/net8/UnrealBuildTool.exe"):
+        p = os.path.join(root, rel)
+        os.makedirs(os.path.dirname(p), exist_ok=True)
+        open(p, "w").close()
+    return root
+
+def legacy_autodetect(engine_dir):
+    ubt = L.find_file_case_insensitive(engine_dir, [
+        "Engine/Binaries/DotNET/UnrealBuildTool/UnrealBuildTool.exe",
+        "Engine/Binaries/DotNET/UnrealBuildTool.exe",
+        "Engine/Binaries/DotNET/**/UnrealBuildTool.exe",
+    ])
+    editor = L.find_file_case_insensitive(engine_dir, [
+        "Engine/Binaries/Win64/UnrealEditor.exe",
+        "Engine/**/Win64/UnrealEditor.exe",
+    ])
+    return ubt, editor
+
+class FakeText:
+    """widget ปลอมที่ตอบ index/insert/delete แบบ Tk Text สำหรับวัด/ทดสอบ LogSink แบบ headless
+    จดจำนวนบรรทัดของการ insert แต่ละครั้งไว้ใน inserts"""
+    def __init__(self):
+        self.lines = [""]
+        self.inserts = []
+    def configure(self, **kw): pass
+    def see(self, index): pass
+    def after(self, ms, fn): return None
+    def after_cancel(self, job): pass
+    def insert(self, index, text):
+        self.inserts.append(text.count("\n"))
+        parts = text.split("\n")
+        self.lines[-1] += parts[0]
+        self.lines.extend(parts[1:])
+    def index(self, index): return f"{len(self.lines)}.0"
+    def delete(self, a, b): del self.lines[:int(b.split(".")[0]) - 1]
+
+def log_throughput(lines=200000, writers=4):
+    sink = L.LogSink(FakeText())
+    stop = threading.Event()
+    def ui():
+        while not stop.is_set():
+            sink.flush()
+            time.sleep(L.LOG_FLUSH_MS / 1000.0)
+        sink.flush()
+    u = threading.Thread(target=ui)
+    u.start()
+    def w(k):
+        for i in range(lines // writers):
+            L.log_append(sink, f"[{i}] writer {k} Compile Module.cpp")
+    ws = [threading.Thread(target=w, args=(k,)) for k in range(writers)]
+    for t in ws: t.start()
+    for t in ws: t.join()
+    stop.set()
+    u.join()
+
+# ===================== Runner =====================
+def run_benchmarks(args):
+    subprocess.Popen = _CountingPopen
+    root = tempfile.mkdtemp(prefix="rnd_bench_")
+    results = {}
+    try:
+        repos = make_repos(root, args.commits, args.branches, args.behind, args.ahead)
+        ubt = make_stub_tool(root, "UnrealBuildTool")
+        engine = make_engine_tree(os.path.join(root, "engine"), args.engine_files)
+        os.environ["STUB_LINES"] = str(args.ubt_lines)
+        os.environ["STUB_SLEEP"] = "0"
+        work, uproject = repos["work"], repos["uproject"]
+
+        make_worktree_files(work, args.worktree_files)
+        L.git_version()  # cache ไว้ก่อน ไม่ให้นับเป็น spawn ของ benchmark
+        probe = L.git_check(uproject, None, True, fetch=False)
+        assert probe["behind_upstream"] == args.behind, \
+            f"fixture ผิด: behind_upstream={probe['behind_upstream']} ({probe['upstream_target']}) != {args.behind}"
+        results["git status (plain)"] = measure(lambda: L.run_cmd(
+            ["git", "-c", "core.untrackedCache=false", "-c", "core.fsmonitor=false", "status"], cwd=work), args.repeat)
+        results["git_worktree_status"] = measure(lambda: L.git_worktree_status(work), args.repeat)
+        results["git_worktree_status (index only)"] = measure(lambda: L.git_worktree_status(work, untracked=False),
+                                                              args.repeat)
+        results["git_check (no fetch)"] = measure(lambda: L.git_check(uproject, None, True, fetch=False), args.repeat)
+        results["git_check"] = measure(lambda: L.git_check(uproject, None, True), args.repeat)
+        results["git_fetch_all"] = measure(lambda: L.git_fetch_all(work, None), args.repeat,
+                                           setup=lambda: advance_upstream(repos))
+        results["git_fetch_smart (moved)"] = measure(lambda: L.git_fetch_smart(work, None), args.repeat,
+                                                     setup=lambda: advance_upstream(repos))
+        results["git_fetch_smart (no change)"] = measure(lambda: L.git_fetch_smart(work, None), args.repeat)
+        results["generate_project_files"] = measure(lambda: L.generate_project_files(ubt, uproject, None), args.repeat)
+        results["build_editor"] = measure(lambda: L.build_editor(ubt, uproject, None), args.repeat)
+        results["autodetect_tools (legacy glob)"] = measure(lambda: legacy_autodetect(engine), args.repeat)
+        results["autodetect_tools (cold)"] = measure(lambda: L.autodetect_tools(engine), args.repeat,
+                                                     setup=L._tool_cache.clear)
+        results["autodetect_tools (cached)"] = measure(lambda: L.autodetect_tools(engine), args.repeat)
+        results["log throughput"] = measure(lambda: log_throughput(args.log_lines), args.repeat)
+        results["log throughput"]["lines_per_s"] = round(args.log_lines / max(results["log throughput"]["seconds"], 1e-9))
+    finally:
+        subprocess.Popen = _RealPopen
+        if not args.keep:
+            shutil.rmtree(root, ignore_errors=True)
+        else:
+            print(f"fixtures: {root}")
+    return {"params": {k: getattr(args, k) for k in ("commits", "branches", "behind", "ahead", "ubt_lines",
+                                                     "engine_files", "worktree_files", "log_lines", "repeat")},
+            "results": results, "peak_rss_kb": _peak_rss_kb()}
+
+def report(run, baseline=None, threshold=0.2):
+    """พิมพ์ตารางผลลัพธ์ (และเทียบ baseline); คืนรายชื่อ benchmark ที่ช้าลงเกิน threshold"""
+    regressions = []
+    base = (baseline or {}).get("results", {})
+    print(f"{'benchmark':34} {'seconds':>9} {'spawns':>7} {'peak KB':>8}  vs baseline")
+    for name, r in run["results"].items():
+        cmp = ""
+        b = base.get(name)
+        if b and b["seconds"] > 0:
+            ratio = r["seconds"] / b["seconds"]
+            cmp = f"x{ratio:.2f}"
+            if ratio > 1 + threshold and r["seconds"] - b["seconds"] > 0.01:  # กัน noise ของงานระดับ ms
+                cmp += "  REGRESSION"
+                regressions.append(name)
+            if r["spawns"] > b["spawns"]:
+                cmp += f"  spawns {b['spawns']}->{r['spawns']}"
+        print(f"{name:34} {r['seconds']:9.4f} {r['spawns']:7d} {r['peak_kb']:8d}  {cmp}")
+    if run.get("peak_rss_kb"):
+        print(f"peak RSS: {run['peak_rss_kb'] // 1024} MB")
+    return regressions
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="RNDLauncher benchmarks")
+    ap.add_argument("--commits", type=int, default=2000)
+    ap.add_argument("--branches", type=int, default=20)
+    ap.add_argument("--behind", type=int, default=100)
+    ap.add_argument("--ahead", type=int, default=10)
+    ap.add_argument("--ubt-lines", type=int, default=20000, help="จำนวนบรรทัดที่ UBT ปลอมพิมพ์")
+    ap.add_argument("--engine-files", type=int, default=20000)
+    ap.add_argument("--worktree-files", type=int, default=20000, help="ไฟล์ใน Content/ ของ working tree")
+    ap.add_argument("--log-lines", type=int, default=200000)
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--baseline", help="ไฟล์ baseline สำหรับเทียบ")
+    ap.add_argument("--save-baseline", help="บันทึกผลรอบนี้เป็น baseline")
+    ap.add_argument("--threshold", type=float, default=0.2, help="สัดส่วนที่ถือว่าช้าลง (0.2 = 20%%)")
+    ap.add_argument("--keep", action="store_true", help="ไม่ลบ fixture หลังจบ")
+    args = ap.parse_args(argv)
+
+    run = run_benchmarks(args)
+    baseline = L.load_json_file(args.baseline, None) if args.baseline else None
+    regressions = report(run, baseline, args.threshold)
+    if args.save_baseline:
+        L.save_json_file(args.save_baseline, run)
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
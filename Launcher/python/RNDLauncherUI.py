@@ -0,0 +1,782 @@
+# -*- coding: utf-8 -*-
+"""หน้าต่าง UI ของ launcher (import เฉพาะตอนเปิดแบบมีหน้าต่าง; logic ทั้งหมดอยู่ใน RNDLauncher)"""
+import os, re, sys, time, threading
+import customtkinter as ctk
+import tkinter as tk  # <-- ใช้ตั้ง iconphoto/iconbitmap
+from tkinter import filedialog, messagebox
+from queue import Queue
+
+from RNDLauncher import (
+    CHECK_INTERVAL_MS, PREBUILDER, SUPERVISOR, CheckScheduler, CommitLog, ListVar, LogFile, LogSink,
+    LogStore, add_open_steps, autodetect_tools_many, begin_trace, cancel_scope, cancel_speculative_steps,
+    check_many, end_trace, finish_graph, format_age, format_commit, format_dashboard, format_git_status,
+    format_history, format_worktree, get_repo_root_from_uproject, git_check, git_dir_of, history_db,
+    list_log_files, load_settings, load_status_snapshot, log_append, open_graph, pull_from_check,
+    record_check_history, save_settings, save_status_snapshot, settings_snapshot, speculate_open_steps,
+    trace_span,
+)
+
+# ---- UE-like palette ----
+UE_BG          = "#1b1b1c"
+UE_PANEL       = "#202225"
+UE_BTN         = "#2a2e33"
+UE_BTN_HOVER   = "#32363c"
+UE_BORDER      = "#3b4046"
+UE_TEXT        = "#e6e6e6"
+UE_TEXT_MUTED  = "#a4a9ae"
+UE_ACCENT      = "#2ea3ff"
+
+ctk.set_appearance_mode("dark")
+ctk.set_default_color_theme("dark-blue")
+ctk.set_widget_scaling(1.0)
+
+
+def resource_path(relative):
+    """รองรับทั้งรันจากโค้ดและจากไฟล์ .exe (PyInstaller)"""
+    if hasattr(sys, "_MEIPASS"):
+        return os.path.join(sys._MEIPASS, relative)
+    return os.path.join(os.path.abspath("."), relative)
+
+def set_window_icon(win, ico_rel="assets/logo.ico", png_rel="assets/logo.png"):
+    """ตั้งโลโก้กลมสำหรับ Titlebar/Taskbar"""
+    ico = resource_path(ico_rel)
+    png = resource_path(png_rel)
+    try:
+        if os.name == "nt" and os.path.isfile(ico):
+            win.iconbitmap(ico)  # Taskbar (Windows)
+        if os.path.isfile(png):
+            win.iconphoto(True, tk.PhotoImage(file=png))  # Titlebar (ทุกแพลตฟอร์ม)
+    except Exception:
+        pass
+
+
+# ===================== UI Components =====================
+def big_button(master, text, cmd):
+    return ctk.CTkButton(
+        master, text=text, command=cmd,
+        fg_color=UE_BTN, hover_color=UE_BTN_HOVER, text_color=UE_TEXT,
+        corner_radius=10, border_width=1, border_color=UE_BORDER,
+        height=40, font=ctk.CTkFont(size=13, weight="bold")
+    )
+
+def small_button(master, text, cmd):
+    return ctk.CTkButton(
+        master, text=text, command=cmd,
+        fg_color=UE_BTN, hover_color=UE_BTN_HOVER, text_color=UE_TEXT,
+        corner_radius=10, border_width=1, border_color=UE_BORDER,
+        height=34, font=ctk.CTkFont(size=12)
+    )
+
+class SettingsDialog(ctk.CTkToplevel):
+    def __init__(self, parent, state_like, on_saved):
+        super().__init__(parent)
+        self.title("Settings")
+        self.geometry("1000x420")
+        self.configure(fg_color=UE_PANEL)
+        set_window_icon(self)  # << ไอคอนกลม
+        self.grab_set()
+        self.state_like = state_like
+        self.on_saved = on_saved
+
+        self.vars = {
+            "engine_dir": ctk.StringVar(value=state_like["engine_dir"].get()),
+            "uproject":   ctk.StringVar(value=state_like["uproject"].get()),
+            "ubt":        ctk.StringVar(value=state_like["ubt"].get()),
+            "editor":     ctk.StringVar(value=state_like["editor"].get()),
+            "autogen":    ctk.BooleanVar(value=state_like["autogen"].get()),
+            "autobuild":  ctk.BooleanVar(value=state_like["autobuild"].get()),
+            "auto_check": ctk.BooleanVar(value=state_like["auto_check"].get()),
+            "prebuild":   ctk.BooleanVar(value=state_like["prebuild"].get()),
+        }
+
+        frm = ctk.CTkFrame(self, fg_color=UE_PANEL, border_color=UE_BORDER, border_width=1, corner_radius=12)
+        frm.pack(fill="both", expand=True, padx=12, pady=12)
+        frm.grid_columnconfigure(1, weight=1)
+
+        row = 0
+        def add_row(label, var, browse=None, placeholder=""):
+            nonlocal row
+            ctk.CTkLabel(frm, text=label, text_color=UE_TEXT_MUTED).grid(row=row, column=0, sticky="w", padx=12, pady=(10,0))
+            entry = ctk.CTkEntry(frm, textvariable=var, placeholder_text=placeholder,
+                                 fg_color=UE_BG, border_color=UE_BORDER, text_color=UE_TEXT, corner_radius=8)
+            entry.grid(row=row, column=1, sticky="we", padx=8, pady=(10,0))
+            if browse:
+                small_button(frm, "Browse", browse).grid(row=row, column=2, padx=8, pady=(10,0))
+            row += 1
+            return entry
+
+        add_row("Engine Folder (UE_5.4.x):", self.vars["engine_dir"],
+                browse=self.browse_engine, placeholder="E:/UE_5.4")
+
+        add_row(".uproject:", self.vars["uproject"],
+                browse=self.browse_uproject, placeholder="E:/Project/MyProj.uproject")
+
+        add_row("UnrealBuildTool.exe:", self.vars["ubt"], placeholder=".../UnrealBuildTool.exe")
+        small_button(frm, "Detect", self.detect_tools).grid(row=row-1, column=2, padx=8, pady=(10,0))
+
+        add_row("UnrealEditor.exe:", self.vars["editor"], placeholder=".../UnrealEditor.exe")
+
+        toggles = ctk.CTkFrame(frm, fg_color=UE_PANEL)
+        toggles.grid(row=row, column=0, columnspan=3, sticky="we", padx=8, pady=(10,0))
+        row += 1
+        for tvar, text in [
+            (self.vars["autogen"],   "Generate Project Files ก่อนเปิด"),
+            (self.vars["autobuild"], "Build Editor ก่อนเปิด"),
+            (self.vars["auto_check"], f"Auto-check Git ทุก {CHECK_INTERVAL_MS//1000} วิ"),
+            (self.vars["prebuild"],  "Prebuild upstream ล่วงหน้า"),
+        ]:
+            sw = ctk.CTkSwitch(toggles, text=text, variable=tvar,
+                               fg_color=UE_BORDER, progress_color=UE_ACCENT,
+                               button_color=UE_BTN, button_hover_color=UE_BTN_HOVER,
+                               text_color=UE_TEXT)
+            sw.pack(side="left", padx=10)
+
+        footer = ctk.CTkFrame(self, fg_color=UE_PANEL)
+        footer.pack(fill="x", pady=(0,12))
+        small_button(footer, "Save", self.save).pack(side="right", padx=(0,10))
+        small_button(footer, "Cancel", self.destroy).pack(side="right", padx=10)
+
+    # ---- actions ----
+    def browse_engine(self):
+        d = filedialog.askdirectory(title="Select UE Engine Folder")
+        if d: self.vars["engine_dir"].set(d)
+
+    def browse_uproject(self):
+        f = filedialog.askopenfilename(title="Select .uproject", filetypes=[("Unreal Project", "*.uproject")])
+        if f: self.vars["uproject"].set(f)
+
+    def detect_tools(self):
+        engine_dir = self.vars["engine_dir"].get()
+        found = autodetect_tools_many(self.state_like["engines"].get() + [engine_dir])
+        ubt, editor = found.get(engine_dir, (None, None))
+        if ubt: self.vars["ubt"].set(ubt)
+        if editor: self.vars["editor"].set(editor)
+        if ubt or editor:  # ลงทะเบียนไว้ สลับ engine ครั้งหน้าได้ผลจาก cache ทันที
+            self.state_like["engines"].set(list(dict.fromkeys(self.state_like["engines"].get() + [engine_dir])))
+        messagebox.showinfo("Detect", "ตรวจพบเครื่องมือแล้ว (ถ้ามี)")
+
+    def save(self):
+        for k, v in self.vars.items():
+            self.state_like[k].set(v.get())
+        save_settings(self.state_like)
+        if self.on_saved: self.on_saved()
+        self.destroy()
+
+class DashboardDialog(ctk.CTkToplevel):
+    """หลายโปรเจกต์: เช็ค ahead/behind ของทุก .uproject ที่ลงทะเบียนไว้พร้อมกัน"""
+    def __init__(self, parent, state_like):
+        super().__init__(parent)
+        self.title("Projects Dashboard")
+        self.geometry("900x420")
+        self.configure(fg_color=UE_PANEL)
+        set_window_icon(self)
+        self.parent = parent
+        self.state_like = state_like
+
+        self.table = ctk.CTkTextbox(self, fg_color=UE_BG, border_color=UE_BORDER, border_width=1,
+                                    corner_radius=12, text_color=UE_TEXT, font=ctk.CTkFont(family="Consolas", size=12))
+        self.table.pack(fill="both", expand=True, padx=12, pady=12)
+
+        footer = ctk.CTkFrame(self, fg_color=UE_PANEL)
+        footer.pack(fill="x", pady=(0,12))
+        small_button(footer, "Add .uproject", self.add_project).pack(side="left", padx=10)
+        small_button(footer, "Remove", self.remove_project).pack(side="left", padx=(0,10))
+        small_button(footer, "Refresh", self.refresh).pack(side="right", padx=10)
+        self.show_projects()
+
+    def projects(self):
+        return self.state_like["projects"].get() or [self.state_like["uproject"].get()]
+
+    def set_text(self, text):
+        self.table.configure(state="normal")
+        self.table.delete("1.0", "end")
+        self.table.insert("end", text)
+        self.table.configure(state="disabled")
+
+    def show_projects(self):
+        self.set_text("\n".join(f"{i}. {u}" for i, u in enumerate(self.projects(), 1)) + "\n\nกด Refresh เพื่อเช็ค")
+
+    def add_project(self):
+        f = filedialog.askopenfilename(title="Select .uproject", filetypes=[("Unreal Project", "*.uproject")])
+        if f:
+            self.state_like["projects"].set(self.projects() + [f])
+            save_settings(self.state_like)
+            self.show_projects()
+
+    def remove_project(self):
+        ans = ctk.CTkInputDialog(text="ลำดับโปรเจกต์ที่จะลบ", title="Remove").get_input()
+        try:
+            idx = int(ans) - 1
+        except (TypeError, ValueError):
+            return
+        items = self.projects()
+        if 0 <= idx < len(items):
+            del items[idx]
+            self.state_like["projects"].set(items)
+            save_settings(self.state_like)
+            self.show_projects()
+
+    def refresh(self):
+        items = self.projects()
+        self.set_text(f"กำลังเช็ค {len(items)} โปรเจกต์...")
+        def _task():
+            rows = check_many(items, self.parent.log)
+            text = format_dashboard(rows)
+            try: self.after(0, lambda: self.set_text(text))
+            except Exception: pass
+        threading.Thread(target=_task, daemon=True).start()
+
+class CommitBrowser(ctk.CTkToplevel):
+    """commit ทั้ง range แบบ lazy: โหลดทีละหน้าเมื่อเลื่อนใกล้ท้าย (parse เฉพาะ commit ที่ยังไม่อยู่ใน cache)"""
+    def __init__(self, parent, repo, ranges):
+        super().__init__(parent)
+        self.title("Commits")
+        self.geometry("960x520")
+        self.configure(fg_color=UE_PANEL)
+        set_window_icon(self)
+        self.repo = repo
+        self.clog = None
+        self.loaded = 0
+        self._loading = False
+        self._gen = 0  # เพิ่มทุกครั้งที่ reload -> ทิ้งหน้าที่โหลดค้างของ range เก่า
+
+        bar = ctk.CTkFrame(self, fg_color=UE_PANEL)
+        bar.pack(fill="x", padx=12, pady=(12,0))
+        self.range_var = ctk.StringVar(value=ranges[0])
+        ctk.CTkOptionMenu(bar, values=ranges, variable=self.range_var, command=lambda _: self.reload(),
+                          fg_color=UE_BTN, button_color=UE_BTN_HOVER, text_color=UE_TEXT).pack(side="left")
+        small_button(bar, "Refresh", self.reload).pack(side="left", padx=10)
+        self.status = ctk.CTkLabel(bar, text="", text_color=UE_TEXT_MUTED)
+        self.status.pack(side="right")
+
+        body = ctk.CTkFrame(self, fg_color=UE_BG, border_color=UE_BORDER, border_width=1, corner_radius=12)
+        body.pack(fill="both", expand=True, padx=12, pady=12)
+        self.scroll = tk.Scrollbar(body, orient="vertical")
+        # tk.Listbox แทน CTkTextbox: เพิ่มทีละหน้าได้ถูก และยังลื่นที่หลายหมื่นบรรทัด
+        self.listbox = tk.Listbox(body, bg=UE_BG, fg=UE_TEXT, selectbackground=UE_ACCENT, borderwidth=0,
+                                  highlightthickness=0, activestyle="none", font=("Consolas", 10),
+                                  yscrollcommand=self.on_scroll)
+        self.scroll.configure(command=self.listbox.yview)
+        self.scroll.pack(side="right", fill="y", pady=8)
+        self.listbox.pack(side="left", fill="both", expand=True, padx=(8,0), pady=8)
+        self.listbox.bind("<Double-Button-1>", self.copy_sha)
+        self.reload()
+
+    def _post(self, fn):
+        try: self.after(0, fn)
+        except Exception: pass
+
+    def reload(self):
+        self._gen += 1
+        gen, rev_range = self._gen, self.range_var.get()
+        self.listbox.delete(0, "end")
+        self.clog, self.loaded, self._loading = None, 0, True
+        self.status.configure(text=f"กำลังอ่าน {rev_range}...")
+        def _task():
+            clog = CommitLog(self.repo, rev_range)
+            ok = clog.refresh()
+            rows = clog.page(0) if ok else []
+            self._post(lambda: self._set_log(gen, clog, ok, rows))
+        threading.Thread(target=_task, daemon=True).start()
+
+    def _set_log(self, gen, clog, ok, rows):
+        if gen != self._gen:
+            return
+        self.clog = clog
+        if not ok:
+            self._loading = False
+            self.status.configure(text=f"อ่าน {clog.rev_range} ไม่ได้")
+            return
+        self._append(gen, rows, min(len(clog), clog.page_size))
+
+    def _append(self, gen, rows, end):
+        if gen != self._gen:
+            return
+        if rows:
+            self.listbox.insert("end", *[format_commit(c) for c in rows])
+        self.loaded, self._loading = end, False
+        self.status.configure(text=f"{self.listbox.size():,} / {len(self.clog):,} commit")
+        self.on_scroll(*self.listbox.yview())  # หน้าแรกยังไม่เต็มจอ -> โหลดต่อ
+
+    def on_scroll(self, first, last):
+        self.scroll.set(first, last)
+        if float(last) >= 0.9:
+            self.load_more()
+
+    def load_more(self):
+        if self._loading or self.clog is None or self.loaded >= len(self.clog):
+            return
+        self._loading = True
+        gen, clog, start = self._gen, self.clog, self.loaded
+        end = min(len(clog), start + clog.page_size)
+        def _task():
+            rows = clog.rows(start)
+            self._post(lambda: self._append(gen, rows, end))
+        threading.Thread(target=_task, daemon=True).start()
+
+    def copy_sha(self, _event=None):
+        sel = self.listbox.curselection()
+        if not sel or self.clog is None:
+            return
+        sha = self.listbox.get(sel[0]).split()[0]
+        self.clipboard_clear()
+        self.clipboard_append(sha)
+        self.status.configure(text=f"คัดลอก {sha} แล้ว")
+
+class LogViewer(ctk.CTkToplevel):
+    """ค้นหา/กระโดดใน log ของ session ก่อน ๆ (หรือ log ภายนอกเช่นของ UBT) ผ่าน mmap"""
+    CONTEXT = 40  # บรรทัดก่อน/หลังบรรทัดที่เลือก
+
+    def __init__(self, parent):
+        super().__init__(parent)
+        self.title("Logs")
+        self.geometry("1000x620")
+        self.configure(fg_color=UE_PANEL)
+        set_window_icon(self)
+        self.lf = None
+        self.files = [p for p, _, _ in list_log_files()]
+
+        bar = ctk.CTkFrame(self, fg_color=UE_PANEL)
+        bar.pack(fill="x", padx=12, pady=(12,0))
+        self.file_var = ctk.StringVar(value=self.files[0] if self.files else "")
+        ctk.CTkOptionMenu(bar, values=self.files or [""], variable=self.file_var, width=360,
+                          command=lambda _: self.open_file(self.file_var.get()),
+                          fg_color=UE_BTN, button_color=UE_BTN_HOVER, text_color=UE_TEXT).pack(side="left")
+        small_button(bar, "Open file...", self.browse).pack(side="left", padx=8)
+        self.query = ctk.CTkEntry(bar, placeholder_text="ค้นหา เช่น error C", fg_color=UE_BG,
+                                  border_color=UE_BORDER, text_color=UE_TEXT)
+        self.query.pack(side="left", fill="x", expand=True, padx=8)
+        self.query.bind("<Return>", lambda _e: self.search())
+        self.regex = ctk.BooleanVar(value=False)
+        ctk.CTkCheckBox(bar, text="Regex", variable=self.regex, text_color=UE_TEXT).pack(side="left")
+        small_button(bar, "Find", self.search).pack(side="left", padx=8)
+
+        self.status = ctk.CTkLabel(self, text="", text_color=UE_TEXT_MUTED, anchor="w")
+        self.status.pack(fill="x", padx=16)
+        body = ctk.CTkFrame(self, fg_color=UE_BG, border_color=UE_BORDER, border_width=1, corner_radius=12)
+        body.pack(fill="both", expand=True, padx=12, pady=12)
+        self.hits = tk.Listbox(body, height=10, bg=UE_BG, fg=UE_TEXT, selectbackground=UE_ACCENT, borderwidth=0,
+                               highlightthickness=0, activestyle="none", font=("Consolas", 10))
+        self.hits.pack(fill="x", padx=8, pady=(8,4))
+        self.hits.bind("<<ListboxSelect>>", self.jump)
+        self.view = tk.Text(body, bg=UE_BG, fg=UE_TEXT, borderwidth=0, highlightthickness=0,
+                            font=("Consolas", 10), wrap="none")
+        self.view.tag_configure("hit", background=UE_BTN_HOVER, foreground=UE_ACCENT)
+        self.view.pack(fill="both", expand=True, padx=8, pady=(4,8))
+        self._hit_lines = []
+        self.protocol("WM_DELETE_WINDOW", self.close)
+        if self.files:
+            self.open_file(self.files[0])
+
+    def _post(self, fn):
+        try: self.after(0, fn)
+        except Exception: pass
+
+    def browse(self):
+        f = filedialog.askopenfilename(title="Select log", filetypes=[("Log", "*.log *.txt"), ("All", "*.*")])
+        if f:
+            self.file_var.set(f)
+            self.open_file(f)
+
+    def open_file(self, path):
+        if self.lf is not None:
+            self.lf.close()
+            self.lf = None
+        try:
+            self.lf = LogFile(path)
+        except (OSError, ValueError) as e:
+            self.status.configure(text=f"เปิดไม่ได้: {e}")
+            return
+        self.hits.delete(0, "end")
+        self._hit_lines = []
+        self.status.configure(text=f"{path}  ({self.lf.size / 1e6:.1f} MB)")
+        self.show_lines(0, highlight=False)
+
+    def search(self):
+        lf, text = self.lf, self.query.get().strip()
+        if lf is None or not text:
+            return
+        self.status.configure(text=f"กำลังค้นหา '{text}'...")
+        regex = bool(self.regex.get())
+        def _task():
+            try:
+                hits, err = lf.search(text, regex=regex), None
+            except (re.error, ValueError) as e:
+                hits, err = [], str(e)
+            self._post(lambda: self._show_hits(lf, text, hits, err))
+        threading.Thread(target=_task, daemon=True).start()
+
+    def _show_hits(self, lf, text, hits, err):
+        if lf is not self.lf:
+            return
+        self.hits.delete(0, "end")
+        self._hit_lines = [n for n, _ in hits]
+        if hits:
+            self.hits.insert("end", *[f"{n + 1:>8}: {line}" for n, line in hits])
+        self.status.configure(text=err or f"เจอ {len(hits)} บรรทัดที่มี '{text}'")
+
+    def jump(self, _event=None):
+        sel = self.hits.curselection()
+        if sel:
+            self.show_lines(self._hit_lines[sel[0]])
+
+    def show_lines(self, line, highlight=True):
+        lines = self.lf.lines(line - self.CONTEXT, 2 * self.CONTEXT + 1)
+        self.view.configure(state="normal")
+        self.view.delete("1.0", "end")
+        for i, (n, text) in enumerate(lines, 1):
+            self.view.insert("end", f"{n + 1:>8}  {text}\n", ("hit",) if n == line and highlight else ())
+            if n == line:
+                self.view.see(f"{i}.0")
+        self.view.configure(state="disabled")
+
+    def close(self):
+        if self.lf is not None:
+            self.lf.close()
+        self.destroy()
+
+class HistoryDialog(ctk.CTkToplevel):
+    """p50/p95 เวลาแต่ละ stage ของ launch history และ commit range ที่ทำให้ช้าลง"""
+    def __init__(self, parent, uproject):
+        super().__init__(parent)
+        self.title("Launch History")
+        self.geometry("900x480")
+        self.configure(fg_color=UE_PANEL)
+        set_window_icon(self)
+        self.uproject = uproject
+
+        bar = ctk.CTkFrame(self, fg_color=UE_PANEL)
+        bar.pack(fill="x", padx=12, pady=(12,0))
+        self.kind = ctk.StringVar(value="open")
+        self.bucket = ctk.StringVar(value="day")
+        ctk.CTkOptionMenu(bar, values=["open", "build", "check", "auto_check", "startup"], variable=self.kind,
+                          command=lambda _: self.refresh(), fg_color=UE_BTN, button_color=UE_BTN_HOVER,
+                          text_color=UE_TEXT).pack(side="left")
+        ctk.CTkOptionMenu(bar, values=["day", "week", "month"], variable=self.bucket,
+                          command=lambda _: self.refresh(), fg_color=UE_BTN, button_color=UE_BTN_HOVER,
+                          text_color=UE_TEXT).pack(side="left", padx=8)
+        small_button(bar, "Refresh", self.refresh).pack(side="right")
+
+        self.table = ctk.CTkTextbox(self, fg_color=UE_BG, border_color=UE_BORDER, border_width=1,
+                                    corner_radius=12, text_color=UE_TEXT, font=ctk.CTkFont(family="Consolas", size=12))
+        self.table.pack(fill="both", expand=True, padx=12, pady=12)
+        self.refresh()
+
+    def set_text(self, text):
+        self.table.configure(state="normal")
+        self.table.delete("1.0", "end")
+        self.table.insert("end", text)
+        self.table.configure(state="disabled")
+
+    def refresh(self):
+        kind, bucket = self.kind.get(), self.bucket.get()
+        def _task():
+            try:
+                runs = history_db().runs(kind, self.uproject or None, since=time.time() - 90 * 86400)
+                text = f"{kind}: {len(runs)} run ใน 90 วัน\n\n" + format_history(runs, bucket)
+            except Exception as e:
+                text = f"อ่าน history ไม่ได้: {e}"
+            try: self.after(0, lambda: self.set_text(text))
+            except Exception: pass
+        threading.Thread(target=_task, daemon=True).start()
+
+# ===================== App =====================
+class App(ctk.CTk):
+    def __init__(self):
+        super().__init__()
+        self.title("Rewind and Desires Launcher")  # << เปลี่ยนชื่อโปรแกรมที่ Titlebar
+        self.geometry("900x560")
+        self.configure(fg_color=UE_BG)
+        set_window_icon(self)  # << โลโก้กลม
+
+        # ---- shared ctx (อย่าใช้ชื่อ 'state') ----
+        self.ctx = {
+            "engine_dir": ctk.StringVar(),
+            "uproject":   ctk.StringVar(),
+            "autobuild":  ctk.BooleanVar(),
+            "autogen":    ctk.BooleanVar(),
+            "auto_check": ctk.BooleanVar(),
+            "prebuild":   ctk.BooleanVar(),
+            "ubt":        ctk.StringVar(),
+            "editor":     ctk.StringVar(),
+            "projects":   ListVar(),
+            "engines":    ListVar(),
+            "bg_job":     None,
+        }
+        self._check_lock = threading.Lock()
+        self._last_check = {}                # ผล git check ล่าสุด (ใช้เลือก range ใน commit browser)
+        self._graph = None                   # task graph ของ open sequence ที่กำลังรัน
+        self._cancelled = threading.Event()  # cancel ของงานที่ผู้ใช้สั่งล่าสุด (open/check) ไม่รวม auto-check/prebuild
+        for k, v in load_settings().items():
+            if k in self.ctx:
+                if isinstance(self.ctx[k], ctk.BooleanVar):
+                    self.ctx[k].set(bool(v))
+                else:
+                    self.ctx[k].set(v)
+
+        # ---- top bar ----
+        top = ctk.CTkFrame(self, fg_color=UE_PANEL, border_color=UE_BORDER, border_width=1, corner_radius=12)
+        top.pack(fill="x", padx=12, pady=12)
+
+        big_button(top, "Open Project", self.do_open_sequence).pack(side="left", padx=8, pady=8)
+        big_button(top, "Check Git Now", self.do_check_now).pack(side="left", padx=8, pady=8)
+        big_button(top, "Cancel", self.do_cancel).pack(side="left", padx=8, pady=8)
+        big_button(top, "Settings", self.open_settings).pack(side="right", padx=8, pady=8)
+
+        # ---- เครื่องมือเสริม ----
+        tools = ctk.CTkFrame(self, fg_color=UE_BG)
+        tools.pack(fill="x", padx=12, pady=(0,8))
+        small_button(tools, "Commits", self.open_commits).pack(side="left", padx=(0,8))
+        small_button(tools, "Dashboard", self.open_dashboard).pack(side="left", padx=(0,8))
+        small_button(tools, "Logs", self.open_logs).pack(side="left", padx=(0,8))
+        small_button(tools, "History", self.open_history).pack(side="left", padx=(0,8))
+
+        # ---- timing summary ของการรันล่าสุด + progress ของ build ----
+        self.summary_label = ctk.CTkLabel(self, text="", text_color=UE_TEXT_MUTED, anchor="w")
+        self.summary_label.pack(fill="x", padx=16, pady=(0,6))
+        self.progress = ctk.CTkProgressBar(self, progress_color=UE_ACCENT, fg_color=UE_BTN)
+        self.progress.set(0)
+        self.progress.pack(fill="x", padx=16, pady=(0,8))
+
+        # ---- log box ----
+        self.log_box = ctk.CTkTextbox(self, fg_color=UE_PANEL, border_color=UE_BORDER,
+                                      border_width=1, corner_radius=12, text_color=UE_TEXT)
+        self.log_box.pack(fill="both", expand=True, padx=12, pady=(0,12))
+        self.log_box.configure(state="disabled")
+        self.log = LogSink(self.log_box, store=LogStore("ui"))
+        self.show_snapshot()
+        if self.ctx["engines"].get():  # engine ที่ลงทะเบียนไว้: ค้นหาพร้อมกันล่วงหน้า Detect/สลับ engine ได้ผลจาก cache
+            threading.Thread(target=autodetect_tools_many, args=(self.ctx["engines"].get(),), daemon=True).start()
+
+        if not self.ctx["uproject"].get() or not self.ctx["editor"].get():
+            self.after(300, self.open_settings)
+
+        self.after(1000, self.schedule_auto_check)
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+
+    # ---------- helpers ----------
+    def show_snapshot(self):
+        """แสดงผล git check ครั้งล่าสุดทันที (อ่านไฟล์อย่างเดียว ไม่รัน git) แล้วรีเฟรชจริงใน background"""
+        uproject = self.ctx["uproject"].get()
+        snap, stale = load_status_snapshot(uproject)
+        if snap:
+            res = self._last_check = snap["res"]
+            state = f"ข้อมูลเก่า: {', '.join(stale)} - กำลังรีเฟรช" if stale else "ref ไม่เปลี่ยน"
+            log_append(self.log, f"=== สถานะ Git ล่าสุด ({format_age(snap['saved_at'])}, {state}) ===")
+            log_append(self.log, f"Branch: {res['branch']}")
+            log_append(self.log, format_git_status(res))
+            self.summary_label.configure(text=f"Git: snapshot {format_age(snap['saved_at'])}" + (" (เก่า)" if stale else ""))
+        if uproject:
+            threading.Thread(target=self._refresh_snapshot, args=(snap, stale), daemon=True).start()
+
+    def _refresh_snapshot(self, snap, stale):
+        """รอบแรกหลังเปิด: check แบบ local (ไม่ fetch) ก่อน แล้ว fetch จริงถ้าเปิด auto-check ไว้"""
+        res = self.do_git_check(silent=True, fetch=False, worktree=False)  # ไม่ให้ git status ทั้ง tree ถือ _check_lock
+        if res.get("ok") and (not snap or stale):
+            log_append(self.log, "=== สถานะ Git ปัจจุบัน (ยังไม่ fetch) ===")
+            log_append(self.log, f"Branch: {res['branch']}")
+            log_append(self.log, format_git_status(res))
+        if res.get("ok"):
+            self.show_summary(f"Git: อัปเดต {time.strftime('%H:%M')}")
+        if self.ctx["auto_check"].get():
+            self._auto_check_task("full")
+
+    def call_in_main(self, func, *args, **kwargs):
+        q = Queue(maxsize=1)
+        def _wrap():
+            try:
+                q.put(func(*args, **kwargs))
+            except Exception as e:
+                q.put(e)
+        self.after(0, _wrap)
+        res = q.get()
+        if isinstance(res, Exception):
+            raise res
+        return res
+
+    def schedule_auto_check(self):
+        if self.ctx["bg_job"]:
+            self.ctx["bg_job"].stop()
+            self.ctx["bg_job"] = None
+
+        if self.ctx["auto_check"].get():
+            def git_dir():
+                return git_dir_of(get_repo_root_from_uproject(self.ctx["uproject"].get()))
+            self.ctx["bg_job"] = CheckScheduler(self._auto_check_task, git_dir).start()
+
+    def _auto_check_task(self, kind="full"):
+        # git status ทั้ง tree แพงบน checkout ใหญ่ -> รอบอัตโนมัติดูแค่ ref (ผู้ใช้ check/open เองค่อยดู working tree)
+        res = self.do_git_check(silent=True, fetch=(kind == "full"), worktree=False)
+        record_check_history(res, "auto_check")
+        if res.get("ok"):
+            msgs = []
+            if res["behind_upstream"] > 0:
+                msgs.append(f"[Auto] ตามหลัง {res['upstream_target']} {res['behind_upstream']} commit")
+            if res["ahead_origin"] > 0:
+                msgs.append(f"[Auto] ยังไม่ได้ push {res['ahead_origin']} commit ไป {res['origin_target']}")
+            if msgs:
+                log_append(self.log, " / ".join(msgs))
+            if res["behind_upstream"] > 0 and self.ctx["prebuild"].get():
+                PREBUILDER.request(settings_snapshot(self.ctx), res, self.log)
+        return res.get("ok")
+
+    def open_settings(self):
+        SettingsDialog(self, self.ctx, self.schedule_auto_check)
+
+    def open_dashboard(self):
+        DashboardDialog(self, self.ctx)
+
+    def open_history(self):
+        HistoryDialog(self, self.ctx["uproject"].get())
+
+    def open_logs(self):
+        self.log.flush()  # ให้ session ปัจจุบันค้นได้ถึงบรรทัดล่าสุด
+        LogViewer(self)
+
+    def open_commits(self):
+        repo = get_repo_root_from_uproject(self.ctx["uproject"].get())
+        if not repo:
+            messagebox.showwarning("Commits", "ไม่พบ .git ของโปรเจกต์")
+            return
+        res = self._last_check
+        ranges = []
+        if res.get("upstream_target"): ranges.append(f"HEAD..{res['upstream_target']}")
+        if res.get("origin_target"): ranges.append(f"{res['origin_target']}..HEAD")
+        CommitBrowser(self, repo, ranges + ["HEAD"])
+
+    # ---------- git check + open ----------
+    def do_check_now(self):
+        cancel = self._cancelled = threading.Event()
+        def _task():
+            log_append(self.log, "=== Git Check ===")
+            with cancel_scope(cancel):
+                res = self.do_git_check()
+            record_check_history(res, "check", self.log)
+            if not res.get("ok"):
+                log_append(self.log, "Git check ไม่สำเร็จ")
+                return
+            self.call_in_main(messagebox.showinfo, "Git Status", format_git_status(res))
+        threading.Thread(target=_task, daemon=True).start()
+
+    def do_cancel(self):
+        """หยุดงานที่ผู้ใช้สั่ง (open sequence / check) แล้ว kill คำสั่งของงานนั้นทั้ง process tree
+        auto-check และ prebuild เบื้องหลังมี cancel ของตัวเอง จึงไม่โดนไปด้วย"""
+        self._cancelled.set()
+        if self._graph is not None:
+            self._graph.cancel()
+        n = sum(1 for sp in SUPERVISOR.active() if sp.cancel is not None and sp.cancel.is_set())
+        log_append(self.log, f"ยกเลิกแล้ว (kill {n} คำสั่ง)")
+
+    def do_open_sequence(self):
+        cancel = self._cancelled = threading.Event()
+        def _task():
+            tracer = begin_trace("open")
+            g = self._graph = open_graph(settings_snapshot(self.ctx), self.log)
+            g.add("git_check", lambda n: self.do_git_check())
+            try:
+                with cancel_scope(cancel):  # pull ที่รันนอก graph
+                    self._open_sequence(g)
+            finally:
+                finish_graph(g, self.log)
+                self.show_summary(end_trace(tracer, self.log))
+        threading.Thread(target=_task, daemon=True).start()
+
+    def set_build_progress(self, done, total, eta):
+        """เรียกจาก worker thread ทุกบรรทัด [n/m] ของ UBT"""
+        eta_txt = f"ETA {int(eta // 60)}:{int(eta % 60):02d}" if eta is not None else ""
+        def _do():
+            self.progress.set(done / total if total else 0)
+            self.summary_label.configure(text=f"Build {done}/{total}  {eta_txt}")
+        try: self.after(0, _do)
+        except Exception: pass
+
+    def show_summary(self, text):
+        try: self.after(0, lambda: self.summary_label.configure(text=text))
+        except Exception: pass
+
+    def _open_sequence(self, g):
+        g.wait(["git_check"])
+        res = g.result("git_check") or {}
+        if not res.get("ok"):
+            with trace_span("git_warning_dialog", "stage", user_wait=True):
+                self.call_in_main(messagebox.showwarning, "Git", "เช็ค Git ไม่ได้ จะเปิดโปรเจกต์ต่อไป")
+            self._run_open_steps(g)
+            return
+
+        need_warn = (res["behind_upstream"] > 0) or (res["ahead_origin"] > 0)
+        if not need_warn:
+            self._run_open_steps(g)
+            return
+
+        speculative = speculate_open_steps(g, res, self.log, self.set_build_progress)
+
+        lines = [f"Branch: {res['branch']}"]
+        if res["behind_upstream"] > 0:
+            lines.append(f"\nตามหลัง {res['upstream_target']} {res['behind_upstream']} commit:")
+            lines += [f"  {l}" for l in res["behind_list"]]
+            if res["behind_upstream"] > len(res["behind_list"]):
+                lines.append(f"  ... และอีก {res['behind_upstream'] - len(res['behind_list'])} commit (ดูทั้งหมดที่ปุ่ม Commits)")
+        if res["ahead_origin"] > 0:
+            lines.append(f"\nยังไม่ได้ push ไป {res['origin_target']} {res['ahead_origin']} commit:")
+            lines += [f"  {l}" for l in res["ahead_list"]]
+            if res["ahead_origin"] > len(res["ahead_list"]):
+                lines.append(f"  ... และอีก {res['ahead_origin'] - len(res['ahead_list'])} commit (ดูทั้งหมดที่ปุ่ม Commits)")
+
+        wt = res.get("worktree") or {}
+        if wt.get("dirty") or wt.get("untracked"):
+            lines.append(f"\n{format_worktree(wt)}")
+            lines += [f"  {p}" for p in wt.get("paths", [])]
+            if res["behind_upstream"] > 0 and wt.get("conflicted"):
+                lines.append("มี conflict ค้างอยู่: Pull จะถูกข้ามจนกว่าจะแก้ conflict")
+            elif res["behind_upstream"] > 0 and wt.get("dirty"):
+                lines.append("มีไฟล์ที่ยังไม่ commit: Pull จะใช้ --autostash (stash ไว้แล้วคืนหลัง rebase)")
+
+        with trace_span("sync_dialog", "stage", speculative=speculative, user_wait=True) as span:
+            ans = self.call_in_main(
+                messagebox.askyesnocancel,
+                "Git Sync Warning",
+                "\n".join(lines) + "\n\nYes=Pull, No=Continue, Cancel=หยุด"
+            )
+            span["answer"] = {True: "pull", False: "continue", None: "cancel"}[ans]
+        if ans is True:
+            if speculative:
+                cancel_speculative_steps(g)
+            self._continue_open(pull_range=pull_from_check(res, self.log))
+        elif ans is False:
+            self._run_open_steps(g)
+        else:
+            g.cancel()
+            log_append(self.log, "ยกเลิกการเปิดโปรเจกต์")
+
+    def _continue_open(self, pull_range=None):
+        if self._cancelled.is_set():
+            log_append(self.log, "ยกเลิกการเปิดโปรเจกต์")
+            return
+        g = self._graph = open_graph(settings_snapshot(self.ctx), self.log, pull_range)
+        try:
+            self._run_open_steps(g)
+        finally:
+            finish_graph(g, self.log)
+
+    def _run_open_steps(self, g):
+        add_open_steps(g, self.log, on_progress=self.set_build_progress)
+        if not g.wait(["launch"]):
+            err = g.first_error()
+            if err is not None:
+                self.call_in_main(messagebox.showerror, "Error", str(err))
+
+    def do_git_check(self, silent=False, fetch=True, worktree=True):
+        with self._check_lock:  # manual/auto check ห้ามรันซ้อนกันบน repo เดียว
+            res = git_check(self.ctx["uproject"].get(), self.log, silent, fetch, worktree)
+            if res.get("ok"):
+                self._last_check = res
+                save_status_snapshot(res)
+            return res
+
+    def on_close(self):
+        save_settings(self.ctx)
+        self.log.close()
+        if self.ctx["bg_job"]:
+            self.ctx["bg_job"].stop()
+        SUPERVISOR.shutdown()  # ไม่ทิ้ง git/UBT ค้างไว้หลังปิดหน้าต่าง
+        self.destroy()
@@ -0,0 +1,11 @@
+import os, sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(autouse=True)
+def _isolated_cwd(tmp_path, monkeypatch):
+    """ไฟล์ runtime (cache, history, log, trace) ของ launcher ถูกเขียนลง cwd -> แยกต่อ test"""
+    monkeypatch.chdir(tmp_path)
@@ -0,0 +1,96 @@
+import os, sys, shutil, threading
+
+import pytest
+
+import RNDLauncher as L
+
+# UBT ปลอม: จดทุกครั้งที่ถูกเรียกแล้วเขียน Binaries/ เหมือน build สำเร็จ
+STUB_UBT = """import os, sys
+proj = [a.split("=", 1)[1] for a in sys.argv if a.startswith("-Project=")][0]
+with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), "calls.log"), "a") as f:
+    f.write(sys.argv[1] + "\\n")
+os.makedirs(os.path.join(os.path.dirname(proj), "Binaries", "Linux"), exist_ok=True)
+print("[1/1] Compile Module.Game.cpp")
+"""
+
+
+def test_concurrent_cache_writers_keep_every_entry():
+    def writer(i):
+        for j in range(40):
+            L.record_build_ok(f"/p/{i}/Game.uproject", f"fp{j}")
+            L.record_project_files(f"/p/{i}/Game.uproject", {"sha": str(j), "dirty": []})
+    threads = [threading.Thread(target=writer, args=(i,)) for i in range(6)]
+    for t in threads: t.start()
+    for t in threads: t.join()
+    cache = L.load_json_file(L.BUILD_CACHE_FILE, None)
+    assert len(cache) == 6
+    for entry in cache.values():
+        assert entry["last_ok"] == "fp39" and entry["gen"]["sha"] == "39"
+    assert [n for n in os.listdir(".") if n.endswith(".tmp")] == []
+
+
+def _write(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(text)
+
+
+@pytest.fixture
+def project(tmp_path):
+    proj = tmp_path / "Game"
+    for rel, text in (("Game.uproject", "{}"), ("Source/Game/Game.Build.cs", "// rules"),
+                      ("Source/Game/Private/Door.cpp", "int door;"), ("Plugins/P/P.uplugin", "{}"),
+                      ("Plugins/P/Source/P/Private/p.cpp", "int p;"), ("Content/Map.umap", "big")):
+        _write(str(proj / rel), text)
+    ubt = str(tmp_path / "UnrealBuildTool")
+    _write(ubt, f"#!{sys.executable}\n" + STUB_UBT)
+    os.chmod(ubt, 0o755)
+    settings = {"uproject": str(proj / "Game.uproject"), "ubt": ubt, "engine_dir": "", "autobuild": True}
+
+    def build():
+        """build ผ่าน pipeline เดียวกับ `RNDLauncher build`; คืนจำนวนครั้งที่ UBT ถูกเรียกทั้งหมด"""
+        g = L.open_graph(settings, None, need_editor=False)
+        L.add_open_steps(g, None, launch=False)
+        assert g.wait()
+        L.finish_graph(g, None)
+        try:
+            with open(str(tmp_path / "calls.log")) as f:
+                return len(f.read().splitlines())
+        except OSError:
+            return 0
+    build.proj = str(proj)
+    return build
+
+
+@pytest.mark.skipif(os.name == "nt", reason="UBT ปลอมเป็นสคริปต์ shebang")
+def test_unchanged_tree_skips_ubt(project):
+    assert project() == 1
+    assert project() == 1
+    uproject = os.path.join(project.proj, "Game.uproject")
+    entry = L.load_json_file(L.BUILD_CACHE_FILE, {})[os.path.normcase(uproject)]
+    fp, _, rehashed = L.build_fingerprint(uproject, "|x", entry["index"])
+    assert rehashed == 0  # mtime/size ไม่เปลี่ยน = ไม่ต้อง hash ใหม่
+    os.utime(os.path.join(project.proj, "Source/Game/Private/Door.cpp"))  # แตะ mtime แต่เนื้อหาเดิม
+    _write(os.path.join(project.proj, "Content/Map.umap"), "bigger")  # asset ไม่ใช่ build input
+    assert project() == 1
+
+
+@pytest.mark.skipif(os.name == "nt", reason="UBT ปลอมเป็นสคริปต์ shebang")
+@pytest.mark.parametrize("rel", ["Source/Game/Private/Door.cpp", "Source/Game/Game.Build.cs", "Plugins/P/P.uplugin",
+                                 "Plugins/P/Source/P/Private/p.cpp", "Game.uproject"])
+def test_changed_input_forces_rebuild(project, rel):
+    assert project() == 1
+    with open(os.path.join(project.proj, rel), "a") as f:
+        f.write("\n// edit")
+    assert project() == 2
+    assert project() == 2
+
+
+@pytest.mark.skipif(os.name == "nt", reason="UBT ปลอมเป็นสคริปต์ shebang")
+def test_new_source_or_missing_binaries_forces_rebuild(project):
+    assert project() == 1
+    _write(os.path.join(project.proj, "Source/Game/Private/Window.cpp"), "int w;")
+    assert project() == 2
+    shutil.rmtree(os.path.join(project.proj, "Binaries"))  # clean แล้ว fingerprint เดิมก็ต้อง build
+    assert project() == 3
+    assert project() == 3
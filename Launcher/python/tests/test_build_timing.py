@@ -0,0 +1,101 @@
+import io
+import os
+
+import RNDLauncher as L
+
+# output จริงของ UBT (ตัดมา) : unity file, ไฟล์เดี่ยวแบบ adaptive, path เต็ม, link และบรรทัดสรุป
+UBT_LOG = """Using 'git status' to determine working set for adaptive non-unity build (C:\\P\\Game).
+Building GameEditor and ShaderCompileWorker...
+Determining max actions to execute in parallel (16 physical cores, 32 logical cores)
+[1/6] Compile [x64] SharedPCH.UnrealEd.Project.ValApi.Cpp20.cpp
+[2/6] Compile [x64] Module.Game.1.cpp
+[3/6] Compile [x64] GameCharacter.cpp
+[4/6] Compile [x64] C:\\P\\Game\\Plugins\\Tools\\Source\\ToolsCore\\Private\\Widget.cpp
+[5/6] Link [x64] UnrealEditor-Game.dll
+[6/6] WriteMetadata GameEditor.target
+Total time in Parallel executor: 12.50 seconds
+Total execution time: 15.25 seconds
+""".splitlines()
+
+
+class _Clock:
+    def __init__(self, steps):
+        self.t, self.steps = 0.0, list(steps)
+
+    def __call__(self):
+        return self.t
+
+    def tick(self):
+        self.t += self.steps.pop(0)
+
+
+def _analyze(steps, modules=None):
+    clock = _Clock(steps)
+    a = L.UbtBuildAnalyzer(clock=clock, source_modules=modules)
+    for line in UBT_LOG:
+        if L.UBT_ACTION_RE.match(line):
+            clock.tick()
+        a.feed(line)
+    return a
+
+
+def test_module_from_path_and_unity_names():
+    assert L.ubt_module_of("Compile", r"C:\P\Game\Source\Game\Private\Actors\Door.cpp") == "Game"
+    assert L.ubt_module_of("Compile", "/E/Engine/Source/Runtime/Core/Private/Misc/Guid.cpp") == "Core"
+    assert L.ubt_module_of("Compile",
+                           r"C:\P\Game\Intermediate\Build\Win64\UnrealEditor\Development\Game\Door.gen.cpp") == "Game"
+    assert L.ubt_module_of("Compile", "Module.Game.3.cpp") == "Game"
+    assert L.ubt_module_of("Link", "UnrealEditor-GameUI-Win64-DebugGame.dll") == "GameUI"
+    assert L.ubt_module_of("Compile", "Door.cpp") == "?"  # ไม่เดาจากชื่อไฟล์
+    assert L.ubt_module_of("Compile", "Door.cpp", {"door.cpp": "Game"}) == "Game"
+
+
+def test_source_module_index(tmp_path):
+    for rel in ("Source/Game/Game.Build.cs", "Source/Game/Private/Door.cpp", "Source/Game.Target.cs",
+                "Plugins/Tools/Source/ToolsCore/ToolsCore.Build.cs", "Plugins/Tools/Source/ToolsCore/Public/Widget.h",
+                "Plugins/Tools/Source/ToolsCore/Intermediate/Skip.cpp"):
+        path = tmp_path / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("")
+    assert L.ubt_source_modules(str(tmp_path)) == {"door.cpp": "Game", "widget.h": "ToolsCore"}
+
+
+def test_parser_intervals_and_totals():
+    a = _analyze([1.0, 4.0, 2.0, 0.5, 3.0, 0.25], modules={"gamecharacter.cpp": "Game"})
+    assert (a.done, a.total) == (6, 6)
+    assert a.kinds == {"Compile": 4, "Link": 1, "WriteMetadata": 1}
+    assert a.totals == {"Total time in Parallel executor": 12.5, "Total execution time": 15.25}
+    assert a.files["Module.Game.1.cpp"] == 4.0
+    assert a.modules["UnrealEd"] == 1.0 and a.modules["ToolsCore"] == 0.5
+    assert a.modules["Game"] == 4.0 + 2.0 + 3.0  # unity + ไฟล์ adaptive + link
+    report = a.report(top=2)
+    assert report["metric"] == "completion_interval" and report["elapsed"] == 10.75
+    assert report["modules"] == [["Game", 9.0], ["UnrealEd", 1.0]]
+
+
+def test_eta_from_completion_rate():
+    progress = []
+    clock = _Clock([2.0] * 6)
+    a = L.UbtBuildAnalyzer(lambda done, total, eta: progress.append((done, total, eta)), clock=clock)
+    assert a.eta() is None
+    for line in UBT_LOG[3:6]:
+        clock.tick()
+        a.feed(line)
+    assert progress == [(1, 6, 10.0), (2, 6, 8.0), (3, 6, 6.0)]  # 2s/action x action ที่เหลือ
+
+
+def test_previous_build_diff_and_log(tmp_path):
+    prev = _analyze([1.0, 4.0, 2.0, 0.5, 3.0, 0.25]).report()
+    cur = _analyze([1.0, 9.0, 2.05, 0.5, 3.0, 0.25]).report()
+    uproject = str(tmp_path / "Game.uproject")
+    L.save_build_timing(prev, uproject, timing_dir=str(tmp_path))
+    cur["finished_at"] = prev["finished_at"] + 60
+    L.save_build_timing(cur, uproject, timing_dir=str(tmp_path))
+    latest, before = L.load_build_timings(uproject, timing_dir=str(tmp_path))
+    assert latest["files"] == cur["files"] and before["files"] == prev["files"]
+    slower = L.compare_build_timings(before, latest)
+    assert [(n, b, c) for n, b, c, _ in slower] == [("Module.Game.1.cpp", 4.0, 9.0)]  # +0.05s ถูกตัดเป็น noise
+    out = io.StringIO()
+    L.log_build_timing(latest, before, L.ConsoleLog(out))
+    text = out.getvalue()
+    assert "completion interval" in text and "Module.Game.1.cpp: 4.00s -> 9.00s (+5.00s)" in text
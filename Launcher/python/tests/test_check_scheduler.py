@@ -0,0 +1,103 @@
+import os
+import threading
+import time
+
+import pytest
+
+import RNDLauncher as L
+
+
+@pytest.fixture
+def git_dir(tmp_path):
+    d = tmp_path / ".git"
+    (d / "refs" / "heads").mkdir(parents=True)
+    (d / "HEAD").write_text("ref: refs/heads/main\n")
+    (d / "refs" / "heads" / "main").write_text("a" * 40 + "\n")
+    return str(d)
+
+
+class _Task:
+    """check ปลอม: จด kind ที่ถูกเรียก; block=True ค้างรอบแรกไว้จนกว่าจะ release"""
+    def __init__(self, ok=True, block=False):
+        self.ok, self.calls, self.times = ok, [], []
+        self.started, self.release = threading.Event(), threading.Event()
+        if not block:
+            self.release.set()
+
+    def __call__(self, kind):
+        self.calls.append(kind)
+        self.times.append(time.monotonic())
+        self.started.set()
+        self.release.wait(10)
+        return self.ok
+
+
+def _wait_for(cond, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not cond() and time.monotonic() < deadline:
+        time.sleep(0.005)
+    return cond()
+
+
+def test_requests_during_check_coalesce_into_one(git_dir):
+    task = _Task(block=True)
+    sched = L.CheckScheduler(task, lambda: git_dir, interval_ms=60000, poll_ms=10).start()
+    try:
+        sched.request("full")
+        assert task.started.wait(5)
+        for i in range(20):
+            sched.request("local" if i % 2 else "full")
+        time.sleep(0.05)
+        assert task.calls == ["full"]  # single-flight: ไม่มีรอบซ้อน
+        task.release.set()
+        assert _wait_for(lambda: len(task.calls) == 2)
+        time.sleep(0.2)
+        assert task.calls == ["full", "full"]  # 20 คำขอ = รอบตามอีกแค่ 1 รอบ (full ครอบ local)
+    finally:
+        sched.stop()
+
+
+def test_backoff_jitter_is_capped(monkeypatch):
+    sched = L.CheckScheduler(lambda kind: True, lambda: None, interval_ms=1000, max_backoff_ms=60000)
+    assert sched.next_delay() == 1.0
+    for jitter in (0.75, 1.25):
+        monkeypatch.setattr(L.random, "uniform", lambda a, b, j=jitter: j)
+        sched.failures = 1
+        assert sched.next_delay() == 2.0 * jitter
+        for failures in (5, 6, 7, 50, 10000):  # 2^6 * 1.25 s เกิน cap แล้ว
+            sched.failures = failures
+            assert sched.next_delay() <= 60.0
+        sched.failures = 6
+        assert sched.next_delay() == min(64.0 * jitter, 60.0)
+
+
+def test_failing_checks_back_off_up_to_cap(git_dir):
+    task = _Task(ok=False)
+    sched = L.CheckScheduler(task, lambda: git_dir, interval_ms=10, poll_ms=5, max_backoff_ms=60).start()
+    try:
+        assert _wait_for(lambda: len(task.calls) >= 8)
+    finally:
+        sched.stop()
+    gaps = [b - a for a, b in zip(task.times, task.times[1:])]
+    assert sched.failures >= 8 and set(task.calls) == {"full"}
+    assert gaps[0] < gaps[-1] < 0.06 + 0.05  # โตแบบ exponential แต่ไม่เกิน cap (+ poll/scheduling)
+
+
+@pytest.mark.parametrize("name", ["HEAD", "FETCH_HEAD"])
+def test_git_file_change_triggers_local_check(git_dir, name):
+    task = _Task()
+    poll_ms = 50
+    sched = L.CheckScheduler(task, lambda: git_dir, interval_ms=60000, poll_ms=poll_ms).start()
+    try:
+        time.sleep(0.1)
+        assert task.calls == []
+        t0 = time.monotonic()
+        with open(os.path.join(git_dir, name), "a") as f:
+            f.write("b" * 40 + "\n")  # ขนาดเปลี่ยน -> signature เปลี่ยนแม้ mtime หยาบ
+        assert task.started.wait(5)
+        assert task.calls == ["local"]
+        assert task.times[0] - t0 < poll_ms / 1000.0 + 0.05
+        time.sleep(0.2)
+        assert task.calls == ["local"]  # ไม่ปลุกตัวเองซ้ำหลัง check
+    finally:
+        sched.stop()
@@ -0,0 +1,90 @@
+import os, sys, json, subprocess
+
+import pytest
+
+import RNDLauncher as L
+import RNDLauncherBench as B
+
+ENV = dict(os.environ, PYTHONPATH=os.path.dirname(os.path.abspath(L.__file__)))
+
+
+def test_uncaught_error_reaches_stderr_and_error_log(tmp_path):
+    code = "import RNDLauncher\nraise ValueError('boom from cli')\n"
+    p = subprocess.run([sys.executable, "-c", code], cwd=str(tmp_path), capture_output=True, text=True,
+                       env=ENV)
+    assert p.returncode != 0
+    assert "ValueError: boom from cli" in p.stderr
+    with open(tmp_path / "launcher_error.log", encoding="utf-8") as f:
+        assert "ValueError: boom from cli" in f.read()
+
+
+def test_process_age_covers_interpreter_start():
+    code = "import time; time.sleep(0.3); import RNDLauncher; print(RNDLauncher.process_age_ms())"
+    p = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, env=ENV)
+    assert float(p.stdout) >= 250
+
+
+def test_status_json_does_not_import_ui(tmp_path):
+    script = os.path.join(os.path.dirname(os.path.abspath(L.__file__)), "RNDLauncher.py")
+    p = subprocess.run([sys.executable, "-X", "importtime", script, "--timing", "status", "--json"],
+                       cwd=str(tmp_path), capture_output=True, text=True, env=ENV)
+    imported = {line.rsplit("|", 1)[-1].strip() for line in p.stderr.splitlines() if line.startswith("import time:")}
+    assert not imported & {"tkinter", "_tkinter", "customtkinter", "RNDLauncherUI"}
+    assert "startup " in p.stderr and json.loads(p.stdout)["ok"] is False  # ไม่มี .uproject ใน config
+
+
+@pytest.fixture
+def cli(tmp_path, monkeypatch, capsys):
+    """รัน main() ใน process เดียวกันด้วย config ชั่วคราวที่ชี้ repo ของ bench และ UBT ปลอม"""
+    monkeypatch.setattr(L, "CONFIG_FILE", L.CONFIG_FILE)
+    monkeypatch.setattr(L, "_history", None)  # history db อยู่ใน cwd ของ test นี้
+    monkeypatch.setenv("STUB_LINES", "5")
+    repos = B.make_repos(str(tmp_path), commits=10, branches=1, behind=3, ahead=1)
+    config = str(tmp_path / "config.json")
+    L.save_json_file(config, dict(L.DEFAULT_SETTINGS, uproject=repos["uproject"], autogen=True, autobuild=True,
+                                  ubt=B.make_stub_tool(str(tmp_path), "UnrealBuildTool")))
+
+    def run(*argv):
+        rc = L.main(["--config", config] + list(argv))
+        out, err = capsys.readouterr()
+        return rc, out
+    run.repos = repos
+    return run
+
+
+def test_cli_check_status_and_history(cli):
+    rc, out = cli("check", "--no-fetch")
+    assert rc == 0 and "Branch: main" in out
+    rc, out = cli("status", "--json")
+    res = json.loads(out)
+    assert rc == 0 and (res["behind_upstream"], res["ahead_origin"]) == (3, 1)
+    rc, out = cli("status", "--snapshot")
+    assert rc == 0 and "ref ไม่เปลี่ยน" in out
+    rc, out = cli("history", "--kind", "check", "--json")
+    assert rc == 0 and len(json.loads(out)["runs"]) == 1
+
+
+def test_cli_build_with_stub_ubt(cli):
+    rc, out = cli("build")
+    assert rc == 0 and "=== Build Editor ===" in out and "[5/5] Compile" in out
+    os.makedirs(os.path.join(cli.repos["work"], "Binaries"))  # UBT ปลอมไม่เขียน Binaries
+    rc, out = cli("build")
+    assert rc == 0 and "ข้าม Build Editor" in out
+    rc, out = cli("timings")
+    assert rc == 0 and "completion interval" in out
+    rc, out = cli("history", "--kind", "build")
+    assert rc == 0 and "build: 2 run" in out
+
+
+def test_cli_dashboard_log_and_logs(cli):
+    rc, out = cli("dashboard", "--json", "--no-fetch")
+    rows = json.loads(out)
+    assert rc == 0 and len(rows) == 1 and rows[0]["behind_upstream"] == 3
+    rc, out = cli("log", "--json", "--page-size", "2")
+    page = json.loads(out)
+    assert rc == 0 and page["range"] == "HEAD..upstream/main" and page["total"] == 3 and len(page["commits"]) == 2
+    cli("check", "--no-fetch")  # ให้มี log ของ session ไว้ค้น
+    rc, out = cli("logs")
+    assert rc == 0 and "cli_check" in out
+    rc, out = cli("logs", "--search", "branch")
+    assert rc == 0 and "เจอ " in out
@@ -0,0 +1,77 @@
+import pytest
+
+import RNDLauncher as L
+import RNDLauncherBench as B
+
+
+@pytest.fixture
+def repos(tmp_path):
+    return B.make_repos(str(tmp_path), commits=10, branches=0, behind=25, ahead=1)
+
+
+@pytest.fixture
+def argv(monkeypatch):
+    calls, spawn = [], L.SUPERVISOR.spawn
+    def _spy(cmd_list, *args, **kwargs):
+        calls.append(list(cmd_list[:2]))
+        return spawn(cmd_list, *args, **kwargs)
+    monkeypatch.setattr(L.SUPERVISOR, "spawn", _spy)
+    return calls
+
+
+def _log(repos, cache, page_size=10):
+    clog = L.CommitLog(repos["work"], "HEAD..upstream/main", cache=cache, page_size=page_size)
+    assert clog.refresh()
+    return clog
+
+
+def test_paging(repos, tmp_path):
+    clog = _log(repos, L.CommitCache(str(tmp_path / "c.jsonl")))
+    assert len(clog) == 25
+    assert clog.shas == B._git(["rev-list", "HEAD..upstream/main"], repos["work"]).split()
+    pages = [clog.page(i) for i in range(4)]
+    assert [len(p) for p in pages] == [10, 10, 5, 0]
+    assert [c["sha"] for p in pages for c in p] == clog.shas
+    assert pages[0][0]["subject"].startswith("upstream 24") and pages[0][0]["short"] == clog.shas[0][:7]
+    assert clog.parsed == 25
+
+
+def test_second_open_hits_cache(repos, tmp_path, argv):
+    cache = L.CommitCache(str(tmp_path / "c.jsonl"))
+    _log(repos, cache).page(0)
+    assert argv == [["git", "rev-list"], ["git", "log"]]
+    del argv[:]
+    clog = _log(repos, cache)
+    assert clog.page(0) and clog.parsed == 0
+    assert argv == [["git", "rev-list"]]  # commit ใน cache แล้ว ไม่ spawn git log
+    clog.page(1)
+    assert clog.parsed == 10 and argv[-1] == ["git", "log"]  # หน้าใหม่ parse เฉพาะ SHA ที่ขาด
+
+
+def test_cache_persists_as_jsonl(repos, tmp_path, argv):
+    path = str(tmp_path / "c.jsonl")
+    _log(repos, L.CommitCache(path)).page(0)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('["deadbeef", "dead')  # บรรทัดที่เขียนไม่จบตอนโปรแกรมถูกปิด
+    with open(path, encoding="utf-8") as f:
+        assert len(f.read().splitlines()) == 11
+    fresh = L.CommitCache(path)
+    assert len(fresh) == 10
+    del argv[:]
+    clog = _log(repos, fresh)
+    assert [c["sha"] for c in clog.page(0)] == clog.shas[:10] and clog.parsed == 0
+    assert ["git", "log"] not in argv
+
+
+def test_range_summary_reuses_cache(repos, tmp_path, monkeypatch):
+    monkeypatch.setattr(L, "_commit_cache", L.CommitCache(str(tmp_path / "c.jsonl")))
+    count, lines, spawns = L.git_range_summary(repos["work"], "HEAD..upstream/main")
+    assert (count, len(lines), spawns) == (25, 5, 2)
+    assert lines[0].split()[1:3] == ["upstream", "24"]
+    assert L.git_range_summary(repos["work"], "HEAD..upstream/main") == (25, lines, 1)  # rev-list อย่างเดียว
+    B.advance_upstream(repos, 2)
+    B._git(["fetch", "-q", "upstream"], repos["work"])
+    count, new_lines, spawns = L.git_range_summary(repos["work"], "HEAD..upstream/main")
+    assert (count, spawns) == (27, 2) and new_lines[2:] == lines[:3]
+    assert L.git_range_summary(repos["work"], "HEAD..upstream/main", limit=0) == (27, [], 1)
+    assert L.git_range_summary(repos["work"], "HEAD..nope/main")[0] is None
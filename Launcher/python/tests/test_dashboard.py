@@ -0,0 +1,88 @@
+import os, sys, time, shutil
+
+import pytest
+
+import RNDLauncher as L
+import RNDLauncherBench as B
+
+# git ปลอมหน้า PATH: ls-remote ของ repo ที่ชื่อมี "slow" ค้าง (จด pid ไว้), ที่เหลือส่งต่อให้ git จริง
+SLOW_GIT = '''import os, sys, time
+if "ls-remote" in sys.argv and "slow" in os.getcwd():
+    with open(os.environ["SLOW_GIT_PID"], "w") as f:
+        f.write(str(os.getpid()))
+    time.sleep(60)
+os.execv(%r, ["git"] + sys.argv[1:])
+'''
+
+
+def _repos(root, names):
+    out = {}
+    for name in names:
+        d = os.path.join(str(root), name)
+        os.makedirs(d)
+        out[name] = B.make_repos(d, commits=20, branches=1, behind=3, ahead=1)
+    return out
+
+
+def test_same_repo_checked_once(tmp_path, monkeypatch):
+    repos = _repos(tmp_path, ["a"])
+    second = os.path.join(repos["a"]["work"], "Plugins", "Other.uproject")
+    os.makedirs(os.path.dirname(second))
+    open(second, "w").close()
+    calls = []
+    real = L.git_check
+    def counting(uproject, *args, **kwargs):
+        calls.append((uproject, kwargs.get("worktree")))
+        return real(uproject, *args, **kwargs)
+    monkeypatch.setattr(L, "git_check", counting)
+    missing = str(tmp_path / "Loose.uproject")
+    rows = L.check_many([repos["a"]["uproject"], second, repos["a"]["uproject"], "", missing], fetch=False)
+    assert [r["uproject"] for r in rows] == [repos["a"]["uproject"], second, missing]
+    assert calls == [(repos["a"]["uproject"], False)]  # ไม่รัน git status ทั้ง tree
+    assert rows[0]["behind_upstream"] == rows[1]["behind_upstream"] == 3
+    assert not rows[2]["ok"] and rows[2]["repo"] is None
+
+
+def test_wall_time_close_to_slowest_repo(tmp_path, monkeypatch):
+    repos = _repos(tmp_path, ["a", "b", "c"])
+    real = L.git_check
+    def slow(*args, **kwargs):
+        time.sleep(0.5)
+        return real(*args, **kwargs)
+    monkeypatch.setattr(L, "git_check", slow)
+    t0 = time.perf_counter()
+    rows = L.check_many([r["uproject"] for r in repos.values()], workers=3, fetch=False)
+    wall = time.perf_counter() - t0
+    assert all(r["ok"] for r in rows)
+    assert wall < max(r["seconds"] for r in rows) + 0.4 < sum(r["seconds"] for r in rows)
+
+
+@pytest.mark.skipif(os.name == "nt", reason="git ปลอมเป็นสคริปต์ shebang")
+def test_timeout_reports_and_kills_git(tmp_path, monkeypatch):
+    repos = _repos(tmp_path, ["fast", "slow"])
+    shim_dir = tmp_path / "bin"
+    shim_dir.mkdir()
+    shim = shim_dir / "git"
+    shim.write_text(f"#!{sys.executable}\n" + SLOW_GIT % shutil.which("git"))
+    shim.chmod(0o755)
+    pid_file = tmp_path / "slow.pid"
+    monkeypatch.setenv("PATH", f"{shim_dir}{os.pathsep}{os.environ['PATH']}")
+    monkeypatch.setenv("SLOW_GIT_PID", str(pid_file))
+    t0 = time.perf_counter()
+    rows = L.check_many([repos["fast"]["uproject"], repos["slow"]["uproject"]], timeout_s=1.5)
+    assert time.perf_counter() - t0 < 10
+    assert rows[0]["ok"] and rows[0]["behind_upstream"] == 3
+    assert rows[1]["status"] == "timeout" and not rows[1]["ok"]
+    pid = int(pid_file.read_text())
+    deadline = time.time() + 5
+    while time.time() < deadline:
+        try:
+            os.kill(pid, 0)
+            with open(f"/proc/{pid}/stat") as f:
+                if f.read().rsplit(")", 1)[1].split()[0] == "Z":
+                    break
+        except OSError:
+            break
+        time.sleep(0.05)
+    else:
+        raise AssertionError("git ls-remote ที่ค้างยังไม่ถูก kill")
@@ -0,0 +1,66 @@
+import os
+
+import pytest
+
+import RNDLauncher as L
+import RNDLauncherBench as B
+
+
+@pytest.fixture
+def repos(tmp_path):
+    return B.make_repos(str(tmp_path), commits=30, branches=3, behind=7, ahead=2)
+
+
+def test_check_against_local_remotes(repos):
+    res = L.git_check(repos["uproject"], None, silent=True, fetch=False)
+    assert res["ok"]
+    assert res["branch"] == "main"
+    assert (res["upstream_target"], res["behind_upstream"]) == ("upstream/main", 7)
+    assert (res["origin_target"], res["ahead_origin"]) == ("origin/main", 2)
+    assert len(res["behind_list"]) == 5 and res["behind_list"][0].split()[1:3] == ["upstream", "6"]
+    assert len(res["ahead_list"]) == 2
+    assert not res["worktree"]["dirty"]
+
+
+def test_fetch_picks_up_new_upstream_commits(repos):
+    assert L.git_check(repos["uproject"], None, silent=True)["behind_upstream"] == 7
+    B.advance_upstream(repos, 3)
+    assert L.git_check(repos["uproject"], None, silent=True, fetch=False)["behind_upstream"] == 7
+    assert L.git_check(repos["uproject"], None, silent=True)["behind_upstream"] == 10
+
+
+def test_dirty_worktree_is_reported(repos):
+    with open(os.path.join(repos["work"], "notes.txt"), "w") as f:
+        f.write("x")
+    res = L.git_check(repos["uproject"], None, silent=True, fetch=False)
+    assert res["worktree"]["untracked"] == 2  # Game.uproject ของ fixture ก็ยังไม่ถูก track
+    assert any("notes.txt" in p for p in res["worktree"]["paths"])
+
+
+def test_missing_repo(tmp_path):
+    path = tmp_path / "Loose.uproject"
+    path.write_text("{}")
+    res = L.git_check(str(path), None, silent=True)
+    assert not res["ok"] and res["repo"] is None
+
+
+def test_unknown_remote_head_is_not_cached(repos):
+    up, work = repos["up"], repos["work"]
+    B._git(["symbolic-ref", "HEAD", "refs/heads/master"], up)  # HEAD ของ remote ชี้ branch ที่ไม่มี
+    res = L.git_check(repos["uproject"], None, silent=True, fetch=False)
+    assert (res["upstream_target"], res["behind_upstream"]) == ("upstream/main", 7)  # fallback ตาม branch ปัจจุบัน
+    assert (work, "upstream") not in L._default_head_cache
+    B._git(["symbolic-ref", "HEAD", "refs/heads/feature0"], up)
+    res = L.git_check(repos["uproject"], None, silent=True, fetch=False)
+    assert res["upstream_target"] == "upstream/feature0"
+    assert L._default_head_cache[(work, "upstream")] == "upstream/feature0"
+
+
+def test_background_check_skips_worktree_status(repos):
+    L.git_check(repos["uproject"], None, silent=True, fetch=False)  # cache remote HEAD ก่อน ให้นับ spawn เทียบกันได้
+    full = L.git_check(repos["uproject"], None, silent=True, fetch=False)
+    light = L.git_check(repos["uproject"], None, silent=True, fetch=False, worktree=False)
+    assert light["ok"] and "worktree" not in light and "git_worktree" not in light["timings"]
+    assert light["spawns"] == full["spawns"] - 1
+    assert light["behind_upstream"] == full["behind_upstream"] == 7
+    assert "working tree" not in L.format_git_status(light)
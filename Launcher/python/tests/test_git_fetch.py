@@ -0,0 +1,62 @@
+import io
+
+import pytest
+
+import RNDLauncher as L
+import RNDLauncherBench as B
+
+
+@pytest.fixture
+def repos(tmp_path):
+    return B.make_repos(str(tmp_path), commits=20, branches=2, behind=3, ahead=1)
+
+
+@pytest.fixture
+def argv(monkeypatch):
+    """บันทึก argv ของทุก process ที่ SUPERVISOR spawn"""
+    calls, spawn = [], L.SUPERVISOR.spawn
+    def _spy(cmd_list, *args, **kwargs):
+        calls.append(list(cmd_list))
+        return spawn(cmd_list, *args, **kwargs)
+    monkeypatch.setattr(L.SUPERVISOR, "spawn", _spy)
+    return calls
+
+
+def _fetches(calls):
+    return [c for c in calls if c[:2] == ["git", "fetch"]]
+
+
+def test_no_fetch_when_refs_match(repos, argv):
+    L.git_fetch_smart(repos["work"], None)  # ครั้งแรกอาจตั้ง refs/remotes/<remote>/HEAD
+    del argv[:]
+    out = io.StringIO()
+    ok, spawns = L.git_fetch_smart(repos["work"], L.ConsoleLog(out))
+    assert ok and not _fetches(argv)
+    assert spawns == len(argv) == 4  # for-each-ref, remote, ls-remote x2
+    assert sorted(c[3] for c in argv if c[1] == "ls-remote") == ["origin", "upstream"]
+    assert out.getvalue().count("ข้าม fetch") == 2
+    quiet = io.StringIO()
+    L.git_fetch_smart(repos["work"], L.ConsoleLog(quiet), silent=True)
+    assert quiet.getvalue() == ""
+
+
+def test_fetch_only_moved_refspecs(repos, argv):
+    L.git_fetch_smart(repos["work"], None)
+    B.advance_upstream(repos, 2)
+    del argv[:]
+    ok, _ = L.git_fetch_smart(repos["work"], None)
+    assert ok
+    assert _fetches(argv) == [["git", "fetch", "upstream", "+refs/heads/main:refs/remotes/upstream/main"]]
+    res = L.git_check(repos["uproject"], None, silent=True, fetch=False, worktree=False)
+    assert res["behind_upstream"] == 5
+
+
+def test_deleted_branch_falls_back_to_prune(repos, argv):
+    L.git_fetch_smart(repos["work"], None)
+    B._git(["symbolic-ref", "HEAD", "refs/heads/feature0"], repos["origin"])
+    B._git(["update-ref", "-d", "refs/heads/main"], repos["origin"])
+    del argv[:]
+    ok, _ = L.git_fetch_smart(repos["work"], None)
+    assert ok
+    assert _fetches(argv) == [["git", "fetch", "--prune", "origin"]]
+    assert "refs/remotes/origin/main" not in L.git_read_refs(repos["work"])["refs"]
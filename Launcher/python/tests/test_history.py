@@ -0,0 +1,46 @@
+import pytest
+
+import RNDLauncher as L
+import RNDLauncherBench as B
+
+
+@pytest.mark.parametrize("values,q,expected", [
+    ([1, 2], 50, 1),
+    (list(range(1, 11)), 50, 5),
+    (list(range(1, 21)), 95, 19),
+    (list(range(1, 21)), 100, 20),
+    ([7], 0, 7),
+    ([3, 1, 2], 50, 2),
+])
+def test_percentile_nearest_rank(values, q, expected):
+    assert L.percentile(values, q) == expected
+
+
+def test_percentile_empty():
+    assert L.percentile([], 50) is None
+
+
+def _open_run(uproject, dialog_s, build_s=2.0):
+    tracer = L.Tracer("open")
+    tracer.meta["uproject"] = uproject
+    t = tracer.t0
+    tracer.add("git_check", "node", t, t + 1.0, {"status": "ok"})
+    tracer.add("sync_dialog", "stage", t + 1.0, t + 1.0 + dialog_s, {"user_wait": True, "answer": "continue"})
+    t += 1.0 + dialog_s
+    tracer.add("build", "node", t, t + build_s, {"status": "ok"})
+    return tracer
+
+
+def test_open_total_excludes_user_wait(tmp_path, monkeypatch):
+    repos = B.make_repos(str(tmp_path), commits=3, branches=0, behind=1, ahead=1)
+    monkeypatch.setattr(L, "_history", L.HistoryDB(str(tmp_path / "h.sqlite3")))
+    assert _open_run(repos["uproject"], 30.0).summary().startswith("open 3.00s (+รอผู้ใช้ 30.00s)")
+    for dialog_s in (1.0, 2.0, 1.5, 3.0, 120.0):  # run สุดท้ายผู้ใช้ปล่อย dialog ค้างไว้ 2 นาที
+        assert L.record_trace_history(_open_run(repos["uproject"], dialog_s))
+    runs = L.history_db().runs(kind="open")
+    assert [r["stages"]["total"] for r in runs] == [3.0] * 5
+    assert runs[-1]["stages"]["sync_dialog"] == 120.0
+    assert L.history_regressions(runs) == []
+    assert L.record_trace_history(_open_run(repos["uproject"], 1.0, build_s=10.0))
+    flags = L.history_regressions(L.history_db().runs(kind="open"))
+    assert sorted(f["stage"] for f in flags) == ["build", "total"]
@@ -0,0 +1,82 @@
+import threading
+
+import pytest
+
+import RNDLauncher as L
+import RNDLauncherBench as B
+
+MAX_LINES = 1000
+
+
+def _pump(sink, widget_lines, lines=200000, writers=4):
+    """writer หลาย thread + flush ทุก LOG_FLUSH_MS บน thread หลัก; คืนจำนวนบรรทัดสูงสุดบนจอ
+    (อัตรา lines/s วัดด้วย RNDLauncherBench ไม่ assert ใน test เพราะขึ้นกับเครื่อง)"""
+    done = threading.Event()
+    def w(k):
+        for i in range(lines // writers):
+            L.log_append(sink, f"[{i}] writer {k} Compile Module.cpp")
+    ws = [threading.Thread(target=w, args=(k,)) for k in range(writers)]
+    peak = 0
+    for t in ws: t.start()
+    threading.Thread(target=lambda: ([t.join() for t in ws], done.set())).start()
+    while not done.is_set():
+        sink.flush()
+        peak = max(peak, widget_lines())
+        done.wait(L.LOG_FLUSH_MS / 1000.0)
+    sink.flush()
+    return max(peak, widget_lines())
+
+
+def test_writes_coalesce_into_one_insert_per_flush():
+    box = B.FakeText()
+    sink = L.LogSink(box, max_lines=MAX_LINES)
+    for i in range(50):
+        L.log_append(sink, f"line {i}")
+    assert box.inserts == []  # writer ไม่แตะ widget
+    sink.flush()
+    assert box.inserts == [50]
+    sink.flush()
+    assert box.inserts == [50]  # ไม่มีอะไรค้าง = ไม่ insert
+
+
+def test_burst_is_dropped_in_queue_and_bounded_per_flush():
+    box = B.FakeText()
+    sink = L.LogSink(box, max_lines=MAX_LINES)
+    for i in range(10 * MAX_LINES):
+        L.log_append(sink, f"line {i}")
+    sink.flush()
+    assert box.inserts == [1, MAX_LINES - 1]  # บรรทัดแจ้งที่ข้าม + หน้าต่างล่าสุด รวมไม่เกิน max_lines
+    assert box.lines[0] == f"... ({9 * MAX_LINES + 1} บรรทัดถูกข้าม)"
+    assert box.lines[1] == f"line {9 * MAX_LINES + 1}" and box.lines[-2] == f"line {10 * MAX_LINES - 1}"
+    assert len(box.lines) - 1 == MAX_LINES
+    sink.write("a\nb")
+    sink.flush()
+    assert box.inserts[-1] == 2 and box.lines[-3:] == ["a", "b", ""] and len(box.lines) - 1 == MAX_LINES
+
+
+def test_concurrent_writers_stay_within_window():
+    box = B.FakeText()
+    sink = L.LogSink(box, max_lines=MAX_LINES)
+    peak = _pump(sink, lambda: len(box.lines) - 1)
+    assert peak <= MAX_LINES
+    assert max(box.inserts) <= MAX_LINES  # ต่อ flush ไม่ insert เกินหน้าต่าง ไม่ว่า writer จะเร็วแค่ไหน
+    assert box.lines[-2].endswith("Compile Module.cpp")
+
+
+def test_log_sink_with_withdrawn_tk_text():
+    tk = pytest.importorskip("tkinter")
+    try:
+        root = tk.Tk()
+    except tk.TclError:
+        pytest.skip("ไม่มี display")
+    try:
+        root.withdraw()
+        box = tk.Text(root)
+        sink = L.LogSink(box, max_lines=MAX_LINES)
+        sink.close()  # flush เองบน thread นี้ ไม่ใช้ after()
+        def widget_lines():
+            root.update_idletasks()
+            return int(box.index("end-1c").split(".")[0]) - 1
+        assert _pump(sink, widget_lines, lines=100000) <= MAX_LINES
+    finally:
+        root.destroy()
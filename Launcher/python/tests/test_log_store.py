@@ -0,0 +1,89 @@
+import os
+import struct
+
+import RNDLauncher as L
+
+LINES = [f"line {i:03d} " + ("ERROR a.c" if i % 7 == 0 else "ok abc") for i in range(60)]
+
+
+def _store(tmp_path, **kw):
+    kw = dict(dict(max_bytes=200, max_files=50, stride=4), **kw)
+    store = L.LogStore("t", log_dir=str(tmp_path / "logs"), **kw)
+    for line in LINES:
+        store.write(line)
+    store.close()
+    return sorted(p for p, _, _ in L.list_log_files(str(tmp_path / "logs")))
+
+
+def _read(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def test_rotates_by_size_without_losing_lines(tmp_path):
+    logs = _store(tmp_path)
+    assert len(logs) > 3
+    longest = max(len(l) for l in LINES) + 1
+    assert all(os.path.getsize(p) < 200 + longest for p in logs)  # หมุนเมื่อถึง max_bytes (ไม่ตัดกลางบรรทัด)
+    assert b"".join(_read(p) for p in logs).decode().splitlines() == LINES
+
+
+def test_prunes_to_max_files(tmp_path):
+    logs = _store(tmp_path, max_files=3)
+    assert len(logs) == 3
+    assert sorted(n for n in os.listdir(str(tmp_path / "logs")) if n.endswith(".idx")) == \
+        sorted(os.path.basename(p)[:-4] + ".idx" for p in logs)
+    assert b"".join(_read(p) for p in logs).decode().splitlines()[-1] == LINES[-1]  # ลบไฟล์เก่าสุด เก็บล่าสุด
+
+
+def test_idx_holds_stride_offsets(tmp_path):
+    path = _store(tmp_path, max_bytes=10 ** 6)[0]
+    data = _read(path)
+    idx = _read(path[:-4] + ".idx")
+    stride, *offsets = struct.unpack(f"<{len(idx) // 8}Q", idx)
+    starts = [0] + [i + 1 for i, b in enumerate(data[:-1]) if b == ord("\n")]
+    assert stride == 4 and offsets == starts[::4]
+
+
+def test_search_regex_vs_literal(tmp_path):
+    path = _store(tmp_path, max_bytes=10 ** 6)[0]
+    lf = L.LogFile(path)
+    try:
+        literal = lf.search("a.c")
+        assert [n for n, _ in literal] == list(range(0, 60, 7))
+        assert all(text == LINES[n] for n, text in literal)
+        assert len(lf.search("a.c", regex=True)) == 60  # "." ตรงกับ "b" ใน abc ด้วย
+        assert [n for n, _ in lf.search(r"^line 0[0-9]7 ", regex=True)] == [7, 17, 27, 37, 47, 57]
+        assert lf.search("error", ignore_case=False) == [] and len(lf.search("error")) == 9
+        assert len(lf.search("line", limit=5)) == 5
+    finally:
+        lf.close()
+
+
+def test_goto_line_through_idx(tmp_path):
+    path = _store(tmp_path, max_bytes=10 ** 6)[0]
+    lf = L.LogFile(path)
+    try:
+        assert lf.stride == 4 and len(lf.offsets) == 15  # อ่านจาก .idx ไม่ได้ scan ไฟล์
+        for start in (0, 3, 4, 5, 31, 58):
+            assert lf.lines(start, 3) == [(n, LINES[n]) for n in range(start, min(start + 3, 60))]
+            assert lf.line_of_offset(lf.offset_of_line(start)) == start
+        assert lf.lines(60, 5) == []
+    finally:
+        lf.close()
+
+
+def test_external_log_builds_index_in_memory(tmp_path, monkeypatch):
+    monkeypatch.setattr(L, "LOG_INDEX_STRIDE", 8)
+    path = str(tmp_path / "Editor.log")
+    with open(path, "w", newline="") as f:
+        f.write("\r\n".join(LINES) + "\r\n")  # log ของ UE บน Windows
+    lf = L.LogFile(path)
+    try:
+        assert lf.offsets is None
+        assert [n for n, _ in lf.search("ERROR")] == list(range(0, 60, 7))
+        assert lf.offsets is None  # ค้นหาไม่ต้องใช้ index
+        assert lf.lines(41, 2) == [(41, LINES[41]), (42, LINES[42])]
+        assert lf.stride == 8 and len(lf.offsets) == 8 and not os.path.exists(path[:-4] + ".idx")
+    finally:
+        lf.close()
@@ -0,0 +1,73 @@
+import os
+import time
+
+import pytest
+
+import RNDLauncher as L
+import RNDLauncherBench as B
+
+pytestmark = pytest.mark.skipif(os.name == "nt", reason="UBT ปลอมเป็นสคริปต์ shebang")
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    monkeypatch.setenv("STUB_LINES", "3000")
+    monkeypatch.setenv("STUB_SLEEP", "0.01")  # UBT ปลอมรัน ~30s ถ้าไม่โดน kill
+    repos = B.make_repos(str(tmp_path), commits=5, branches=0, behind=0, ahead=1)
+    editor = str(tmp_path / "UnrealEditor")
+    open(editor, "w").close()
+    settings = {"uproject": repos["uproject"], "ubt": B.make_stub_tool(str(tmp_path), "UnrealBuildTool"),
+                "editor": editor, "engine_dir": "", "autogen": True, "autobuild": True}
+    return repos, settings
+
+
+def _checked_graph(settings):
+    g = L.open_graph(settings, None)
+    g.add("git_check", lambda n: L.git_check(settings["uproject"], None, silent=True, worktree=False))
+    assert g.wait(["git_check"], timeout=30)
+    return g, g.result("git_check")
+
+
+def _running_ubt(node, timeout=10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        for sp in L.SUPERVISOR.active():
+            if sp.cancel is node.cancel:
+                return sp
+        time.sleep(0.01)
+    return None
+
+
+def test_speculative_steps_cancelled_by_pull(project):
+    repos, settings = project
+    g, res = _checked_graph(settings)
+    try:
+        assert (res["behind_upstream"], res["ahead_origin"]) == (0, 1)
+        assert L.speculate_open_steps(g, res, None)
+        assert "launch" not in g.nodes  # ล่วงหน้าแค่ generate/build ไม่เปิด editor ก่อนผู้ใช้ตอบ
+        sp = _running_ubt(g.nodes["generate"])  # generate เริ่มเองระหว่างรอ dialog
+        assert sp is not None and g.nodes["generate"].status == "running"
+
+        t0 = time.monotonic()
+        L.cancel_speculative_steps(g)  # ผู้ใช้เลือก Pull
+        assert time.monotonic() - t0 < 10
+        assert sp.p.poll() is not None and sp.reason == "cancelled"
+        assert sp not in L.SUPERVISOR.active()
+        assert g.nodes["generate"].status == "cancelled"
+        assert g.nodes["build"].status in ("cancelled", "skipped")
+        assert g.result("build") is None
+    finally:
+        L.finish_graph(g, None)
+
+
+def test_no_speculation_when_behind(project):
+    repos, settings = project
+    B.advance_upstream(repos, 1)
+    B._git(["fetch", "-q", "upstream"], repos["work"])
+    g, res = _checked_graph(settings)
+    try:
+        assert res["behind_upstream"] == 1
+        assert not L.speculate_open_steps(g, res, None)
+        assert "generate" not in g.nodes and not L.SUPERVISOR.active()
+    finally:
+        L.finish_graph(g, None)
@@ -0,0 +1,109 @@
+import os, sys, time, hashlib, threading
+
+import pytest
+
+import RNDLauncher as L
+import RNDLauncherBench as B
+
+# UBT ปลอม: -ProjectFiles -> .sln, build -> Binaries ของโปรเจกต์และ plugin = hash ของ Source; จด nice ของตัวเอง
+STUB_UBT = '''import hashlib, os, sys
+proj = [a.split("=", 1)[1] for a in sys.argv if a.startswith("-Project=")][0]
+d = os.path.dirname(proj)
+with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), "calls.log"), "a") as f:
+    f.write("%s %s %d\\n" % (sys.argv[1], d, os.nice(0)))
+if "-ProjectFiles" in sys.argv:
+    open(os.path.join(d, "Game.sln"), "w").close()
+    sys.exit(0)
+h = hashlib.sha1()
+for root, _, files in sorted(os.walk(os.path.join(d, "Source"))):
+    for name in sorted(files):
+        with open(os.path.join(root, name), "rb") as f:
+            h.update(f.read())
+print("[1/1] Compile Module.Game.cpp")
+for sub in ("Binaries/Linux", "Plugins/P/Binaries/Linux"):
+    os.makedirs(os.path.join(d, sub), exist_ok=True)
+    with open(os.path.join(d, sub, "built.txt"), "w") as f:
+        f.write(h.hexdigest())
+'''
+
+
+def _write(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(text)
+
+
+def test_request_skips_last_completed_sha(tmp_path, monkeypatch):
+    repos = B.make_repos(str(tmp_path), commits=3, branches=0, behind=2, ahead=1)
+    calls, done = [], threading.Event()
+
+    def fake_prebuild(settings, repo, sha, logbox=None):
+        calls.append(sha)
+        done.set()
+        return {"sha": sha, "ok": True}
+
+    monkeypatch.setattr(L, "prebuild_upstream", fake_prebuild)
+    res = {"repo": repos["work"], "upstream_target": "upstream/main"}
+    pb = L.ShadowPrebuilder()
+    assert pb.request({}, res)
+    assert done.wait(10)
+    deadline = time.time() + 10
+    while pb.busy() and time.time() < deadline:
+        time.sleep(0.01)
+    assert pb.target is None
+    assert not pb.request({}, res)  # tick ถัดไปของ auto-check
+    assert calls == [B._git(["rev-parse", "upstream/main"], repos["work"])]
+
+
+@pytest.mark.skipif(os.name == "nt", reason="UBT ปลอมเป็นสคริปต์ shebang")
+def test_prebuild_then_pull_adopts_binaries(tmp_path):
+    root = str(tmp_path)
+    up, seed, work = (os.path.join(root, n) for n in ("up.git", "seed", "work"))
+    B._git(["init", "-q", "--bare", up], root)
+    B._git(["symbolic-ref", "HEAD", "refs/heads/main"], up)
+    B._git(["init", "-q", seed], root)
+    B._git(["checkout", "-q", "-b", "main"], seed)
+    for rel, text in (("Game.uproject", "{}"), ("Source/Game/a.cpp", "int a;"), ("Content/Map.umap", "big"),
+                      ("Config/DefaultEngine.ini", "[x]"), ("Plugins/P/P.uplugin", "{}"),
+                      ("Plugins/P/Source/p.cpp", "int p;"), (".gitignore", "Binaries/\nIntermediate/\n*.sln\n")):
+        _write(os.path.join(seed, rel), text)
+    commit = ["-c", "user.name=T", "-c", "user.email=t@local", "commit", "-q", "-m"]
+    B._git(["add", "."], seed)
+    B._git(commit + ["c1"], seed)
+    B._git(["push", "-q", up, "main"], seed)
+    B._git(["clone", "-q", "-o", "upstream", up, work], root)
+    _write(os.path.join(seed, "Source/Game/b.cpp"), "int b;")
+    B._git(["add", "."], seed)
+    B._git(commit + ["u2"], seed)
+    B._git(["push", "-q", up, "main"], seed)
+    B._git(["fetch", "-q", "upstream"], work)
+
+    ubt = os.path.join(root, "UnrealBuildTool")
+    _write(ubt, f"#!{sys.executable}\n" + STUB_UBT)
+    os.chmod(ubt, 0o755)
+    uproject = os.path.join(work, "Game.uproject")
+    settings = {"uproject": uproject, "ubt": ubt, "engine_dir": ""}
+    engine_key = f"|{ubt}"
+    sha = B._git(["rev-parse", "upstream/main"], work)
+
+    state = L.prebuild_upstream(settings, work, sha)
+    assert state["ok"] and state["sha"] == sha
+    assert not os.path.exists(os.path.join(work, "Source/Game/b.cpp"))  # working tree ของผู้ใช้ไม่ถูกแตะ
+    assert not os.path.exists(os.path.join(work + L.PREBUILD_SUFFIX, "Content"))  # sparse: ไม่ checkout Content
+    with open(os.path.join(root, "calls.log")) as f:
+        calls = f.read().split("\n")[:-1]
+    assert len(calls) == 2 and all(int(c.split()[-1]) >= L.PREBUILD_NICE for c in calls)
+
+    B._git(["merge", "-q", "--ff-only", "upstream/main"], work)  # pull
+    up_to_date, fp = L.build_up_to_date(uproject, engine_key)
+    assert not up_to_date and fp == state["fp"]
+    assert L.adopt_prebuild(uproject, fp)
+    built = hashlib.sha1(b"int a;int b;").hexdigest()  # build จาก Source ของ upstream (มี b.cpp)
+    for rel in ("Binaries/Linux/built.txt", "Plugins/P/Binaries/Linux/built.txt"):
+        with open(os.path.join(work, rel)) as f:
+            assert f.read() == built
+    assert L.build_up_to_date(uproject, engine_key) == (True, fp)
+    assert "prebuild" not in L.load_json_file(L.BUILD_CACHE_FILE, {})[os.path.normcase(os.path.abspath(uproject))]
+    assert not L.adopt_prebuild(uproject, fp)  # เงาถือ Binaries เก่าแล้ว ใช้ซ้ำไม่ได้
+    with open(os.path.join(root, "calls.log")) as f:
+        assert len(f.read().split("\n")[:-1]) == 2  # หลัง pull ไม่ต้องเรียก UBT อีก
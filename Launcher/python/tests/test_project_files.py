@@ -0,0 +1,117 @@
+import os
+
+import pytest
+
+import RNDLauncher as L
+import RNDLauncherBench as B
+
+
+def _write(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(text)
+
+
+@pytest.fixture
+def repo(tmp_path):
+    work = str(tmp_path / "work")
+    os.makedirs(work)
+    B._git(["init", "-q", work], str(tmp_path))
+    for rel, text in (("Game.uproject", "{}"), (".gitignore", "*.sln\n"), ("Source/Game.Target.cs", "// t"),
+                      ("Source/Game/Game.Build.cs", "// rules"), ("Source/Game/Private/Door.cpp", "int door;"),
+                      ("Content/Map.umap", "big")):
+        _write(os.path.join(work, rel), text)
+    open(os.path.join(work, "Game.sln"), "w").close()
+    _commit(work)
+    return work
+
+
+def _commit(work, msg="c"):
+    B._git(["add", "-A"], work)
+    B._git(["-c", "user.name=T", "-c", "user.email=t@local", "commit", "-q", "--allow-empty", "-m", msg], work)
+    return B._git(["rev-parse", "HEAD"], work)
+
+
+def _generated(work):
+    """สถานะหลัง generate: บันทึก state ของ HEAD ปัจจุบัน"""
+    uproject = os.path.join(work, "Game.uproject")
+    needed, reason, state = L.project_files_needed(uproject)
+    L.record_project_files(uproject, state)
+    return uproject
+
+
+@pytest.mark.parametrize("entries,expected", [
+    ([("M", "Source/Game/Private/Door.cpp"), ("M", "Content/Map.umap")], []),
+    ([("A", "Source/Game/Private/Window.cpp")], ["เพิ่ม/ลบไฟล์ใน Source"]),
+    ([("D", "Plugins/P/Source/P/Private/p.cpp")], ["เพิ่ม/ลบไฟล์ใน Source"]),
+    ([("R", "Source/Game/Private/Gate.cpp")], ["เพิ่ม/ลบไฟล์ใน Source"]),
+    ([("M", "Source/Game/Game.Build.cs"), ("M", "Source/Game.Target.cs")], [".Build.cs/.Target.cs เปลี่ยน"]),
+    ([("M", "Game.uproject")], [".uproject เปลี่ยน"]),
+    ([("A", "Plugins/P/P.uplugin")], ["เพิ่ม plugin"]),
+])
+def test_classify(entries, expected):
+    assert [r.split(" (")[0] for r in L.classify_project_changes(entries)] == expected
+
+
+def test_content_only_edit_skips_generate(repo):
+    uproject = _generated(repo)
+    _write(os.path.join(repo, "Source/Game/Private/Door.cpp"), "int door = 2;")
+    needed, reason, _ = L.project_files_needed(uproject)
+    assert not needed  # แก้เนื้อหา (ยังไม่ commit)
+    _commit(repo)
+    needed, reason, _ = L.project_files_needed(uproject)
+    assert not needed and reason.startswith("module layout ไม่เปลี่ยน")
+
+
+@pytest.mark.parametrize("change", ["add", "remove", "rename", "build_cs", "target_cs", "uproject"])
+def test_layout_change_needs_generate(repo, change):
+    uproject = _generated(repo)
+    src = os.path.join(repo, "Source/Game/Private")
+    if change == "add":
+        _write(os.path.join(src, "Window.cpp"), "int w;")
+    elif change == "remove":
+        B._git(["rm", "-q", "Source/Game/Private/Door.cpp"], repo)
+    elif change == "rename":
+        B._git(["mv", "Source/Game/Private/Door.cpp", "Source/Game/Private/Gate.cpp"], repo)
+    else:
+        rel = {"build_cs": "Source/Game/Game.Build.cs", "target_cs": "Source/Game.Target.cs",
+               "uproject": "Game.uproject"}[change]
+        with open(os.path.join(repo, rel), "a") as f:
+            f.write("\n// edit")
+    needed, reason, state = L.project_files_needed(uproject)
+    assert needed and reason.startswith("working tree: ")
+    _commit(repo)
+    needed, reason, _ = L.project_files_needed(uproject)
+    assert needed and not reason.startswith("working tree: ")  # มาจาก diff gen..HEAD
+    L.record_project_files(uproject, L.project_files_needed(uproject)[2])
+    assert not L.project_files_needed(uproject)[0]
+
+
+def test_dirty_change_already_generated_is_not_counted_again(repo):
+    uproject = os.path.join(repo, "Game.uproject")
+    _generated(repo)
+    _write(os.path.join(repo, "Source/Game/Private/Window.cpp"), "int w;")
+    assert L.project_files_needed(uproject)[0]
+    _generated(repo)  # generate ตอนที่ Window.cpp ยังเป็น untracked
+    _commit(repo)
+    assert not L.project_files_needed(uproject)[0]
+
+
+def test_falls_back_to_pre_pull_commit(repo):
+    uproject = os.path.join(repo, "Game.uproject")
+    assert L.project_files_needed(uproject)[1] == "ไม่มีประวัติการ generate"
+    pre = B._git(["rev-parse", "HEAD"], repo)
+    _write(os.path.join(repo, "Source/Game/Private/Door.cpp"), "int door = 3;")
+    post = _commit(repo, "pulled")
+    needed, reason, _ = L.project_files_needed(uproject, (pre, post))
+    assert not needed and pre[:10] in reason
+    _write(os.path.join(repo, "Source/Game/Private/Window.cpp"), "int w;")
+    post = _commit(repo, "pulled 2")
+    needed, reason, _ = L.project_files_needed(uproject, (pre, post))
+    assert needed and "Window.cpp" in reason
+
+
+def test_missing_solution_forces_generate(repo):
+    uproject = _generated(repo)
+    os.remove(os.path.join(repo, "Game.sln"))
+    assert L.project_files_needed(uproject)[:2] == (True, "ยังไม่มีไฟล์ project/solution")
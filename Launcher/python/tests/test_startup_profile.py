@@ -0,0 +1,98 @@
+import os, time
+
+import RNDLauncher as L
+
+
+class _Proc:
+    pid = 4242
+    def __init__(self): self.rc = None
+    def poll(self): return self.rc
+
+
+def _line(sec, text, frame=0):
+    return f"[2026.10.16-10.00.{sec:02d}:{500 if sec % 2 else 0:03d}][{frame:3d}]{text}\n"
+
+
+STARTUP_LOG = [
+    "\ufeffLog file open, 10/16/26 10:00:00\n",
+    _line(0, "LogInit: Display: Running engine for game: Game"),
+    _line(1, "LogPluginManager: Mounting Engine plugin Paper2D"),
+    _line(2, "LogPluginManager: Mounted Project plugin P"),
+    _line(3, "LogDerivedDataCache: Display: Local: cache miss on ShaderMap"),
+    _line(4, "LogShaderCompilers: Display: Shaders left to compile: 340"),
+    _line(5, "LogDerivedDataCache: Display: Shared: cache miss on Texture"),
+    _line(6, "LogAssetRegistry: Display: Asset registry cache written, search completed"),
+    _line(7, "LogShaderCompilers: Display: Shaders left to compile: 12"),
+    _line(8, "LogInit: Display: Engine is initialized. Leaving FEngineLoop::Init()"),
+    _line(9, "LogBlueprint: Error: Missing node on BP_Door"),
+    _line(11, "LogLoad: Took 1.25 seconds to LoadMap(/Game/Maps/Main)"),
+    _line(15, "LogLoad: (Engine Initialization) Total time: 15.50 seconds"),
+]
+
+
+def _project(tmp_path):
+    uproject = tmp_path / "Game.uproject"
+    uproject.write_text("{}")
+    logs = tmp_path / "Saved" / "Logs"
+    logs.mkdir(parents=True)
+    old = logs / "Game.log"
+    old.write_text(_line(0, "LogLoad: (Engine Initialization) Total time: 1.00 seconds"))  # launch ก่อนหน้า
+    past = time.time() - 3600
+    os.utime(str(old), (past, past))
+    return str(uproject), logs
+
+
+def test_profiles_synthetic_log(tmp_path):
+    uproject, logs = _project(tmp_path)
+    prof = L.EditorStartupProfiler(uproject, poll=0.01, timeout=30)
+    proc = _Proc()
+    prof.start(proc)
+    time.sleep(0.1)
+    os.replace(str(logs / "Game.log"), str(logs / "Game-backup-2026.10.16-09.00.00.log"))  # UE หมุน log เดิม
+    with open(str(logs / "Game.log"), "w", encoding="utf-8") as f:
+        for i, line in enumerate(STARTUP_LOG):
+            if i == 5:  # บรรทัดที่เขียนไม่จบในรอบ poll เดียว
+                f.write(line[:20]); f.flush(); time.sleep(0.05)
+                line = line[20:]
+            f.write(line); f.flush()
+            time.sleep(0.02)
+    profile = prof.wait(10)
+    assert profile["status"] == "ok"
+    assert profile["log"] == str(logs / "Game.log")
+    ms = profile["milestones"]
+    assert [name for name, _ in profile["phases"]] == \
+        ["log_open", "plugins", "asset_registry", "shaders", "engine_init", "map_load", "ready"]
+    # เวลามาจาก timestamp ใน log (ไม่ใช่รอบ poll): plugins = Mounted ตัวสุดท้ายที่ 2.0s, shaders ตัวสุดท้ายที่ 7.5s
+    assert round(ms["asset_registry"] - ms["plugins"], 3) == 4.0
+    assert round(ms["shaders"] - ms["plugins"], 3) == 5.5
+    assert round(ms["ready"] - ms["plugins"], 3) == 13.5
+    assert profile["ready_s"] == ms["ready"]
+    assert abs(sum(secs for _, secs in profile["phases"]) - profile["ready_s"]) < 0.01  # waterfall ต่อกันพอดี
+    assert profile["counts"] == {"shader_jobs": 340, "ddc_miss": 2, "errors": 1}
+
+
+def test_editor_exit_before_ready(tmp_path):
+    uproject, logs = _project(tmp_path)
+    prof = L.EditorStartupProfiler(uproject, poll=0.01, timeout=30)
+    proc = _Proc()
+    prof.start(proc)
+    with open(str(logs / "Game_2.log"), "w", encoding="utf-8") as f:  # Game.log ถูก editor อีกตัวถืออยู่
+        f.writelines(STARTUP_LOG[:4])
+    time.sleep(0.1)
+    proc.rc = 3
+    profile = prof.wait(10)
+    assert profile["status"] == "exited" and profile["exit_code"] == 3
+    assert profile["log"].endswith("Game_2.log")
+    assert profile["ready_s"] is None and "plugins" in profile["milestones"]
+
+
+def test_shader_counter_reads_both_forms(tmp_path):
+    uproject, _ = _project(tmp_path)
+    prof = L.EditorStartupProfiler(uproject)
+    for i, text in enumerate(("LogShaderCompilers: Display: Shaders left to compile: 40",
+                              "LogShaderCompilers: Display: 812 Shaders left to compile",
+                              "LogShaderCompilers: Display: Shaders left to compile 7",
+                              "LogShaderCompilers: Display: 12 shaders left to compile")):
+        prof.feed(_line(i, text), 0.0)
+    assert prof.counts["shader_jobs"] == 812
+    assert "shaders" in prof.milestones
@@ -0,0 +1,71 @@
+import os, subprocess
+
+import RNDLauncher as L
+import RNDLauncherBench as B
+
+COMMIT = ["-c", "user.name=T", "-c", "user.email=t@local", "commit", "-q", "--allow-empty", "-m"]
+
+
+def _snapshot(uproject):
+    res = L.git_check(uproject, None, silent=True, fetch=False, worktree=False)
+    assert res["ok"]
+    L.save_status_snapshot(res)
+    snap, stale = L.load_status_snapshot(uproject)
+    assert snap["res"]["behind_upstream"] == res["behind_upstream"] and stale == []
+    return res
+
+
+def test_head_and_branch_moves(tmp_path):
+    r = B.make_repos(str(tmp_path), commits=10, branches=1, behind=2, ahead=1)
+    _snapshot(r["uproject"])
+    B._git(COMMIT + ["local"], r["work"])
+    _, stale = L.load_status_snapshot(r["uproject"])
+    assert len(stale) == 1 and stale[0].startswith("HEAD ")
+    _snapshot(r["uproject"])
+    B._git(["checkout", "-q", "-b", "topic"], r["work"])
+    assert L.load_status_snapshot(r["uproject"])[1] == ["branch main -> topic"]
+
+
+def test_remote_ref_moves_loose_and_packed(tmp_path):
+    r = B.make_repos(str(tmp_path), commits=10, branches=1, behind=2, ahead=1)
+    B._git(["pack-refs", "--all"], r["work"])  # ref ทั้งหมดอยู่ใน packed-refs อย่างเดียว
+    assert not os.path.exists(os.path.join(r["work"], ".git", "refs", "remotes", "upstream", "main"))
+    _snapshot(r["uproject"])
+    B.advance_upstream(r, 1)
+    B._git(["fetch", "-q", "upstream"], r["work"])  # ref ใหม่เป็นไฟล์ loose ทับ packed
+    assert L.load_status_snapshot(r["uproject"])[1] == ["upstream/main ขยับ"]
+    _snapshot(r["uproject"])
+    B.advance_upstream(r, 1)
+    B._git(["fetch", "-q", "upstream"], r["work"])
+    B._git(["pack-refs", "--all"], r["work"])  # ขยับแล้วถูก pack -> อ่านจาก packed-refs
+    assert L.load_status_snapshot(r["uproject"])[1] == ["upstream/main ขยับ"]
+
+
+def test_linked_worktree(tmp_path):
+    r = B.make_repos(str(tmp_path), commits=10, branches=1, behind=2, ahead=1)
+    wt = str(tmp_path / "wt")
+    B._git(["worktree", "add", "-q", "-b", "side", wt], r["work"])
+    uproject = os.path.join(wt, "Game.uproject")
+    with open(uproject, "w") as f:
+        f.write("{}")
+    git_dir = L.git_dir_of(wt)
+    assert os.path.isfile(os.path.join(wt, ".git")) and git_dir.endswith(os.path.join("worktrees", "wt"))
+    assert os.path.samefile(L.git_common_dir(git_dir), os.path.join(r["work"], ".git"))
+    res = _snapshot(uproject)
+    assert res["branch"] == "side"
+    B._git(COMMIT + ["main moves"], r["work"])  # HEAD ของ worktree หลักไม่เกี่ยว
+    assert L.load_status_snapshot(uproject)[1] == []
+    B._git(COMMIT + ["side moves"], wt)
+    assert L.load_status_snapshot(uproject)[1][0].startswith("HEAD ")
+
+
+def test_load_spawns_no_process(tmp_path, monkeypatch):
+    r = B.make_repos(str(tmp_path), commits=10, branches=1, behind=2, ahead=1)
+    _snapshot(r["uproject"])
+    B._git(COMMIT + ["local"], r["work"])
+    L._repo_root_cache.clear()
+    def no_spawn(*args, **kwargs):
+        raise AssertionError("load_status_snapshot ไม่ควร spawn process")
+    monkeypatch.setattr(subprocess, "Popen", no_spawn)
+    snap, stale = L.load_status_snapshot(r["uproject"])
+    assert snap is not None and stale[0].startswith("HEAD ")
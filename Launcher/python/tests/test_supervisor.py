@@ -0,0 +1,73 @@
+import os, sys, time, threading
+
+import pytest
+
+import RNDLauncher as L
+
+SLEEP = [sys.executable, "-c", "import time; time.sleep(60)"]
+
+# leader พิมพ์ pid ของหลานแล้วออกไป ทิ้งหลานที่ถือ stdout pipe ไว้โดยไม่พิมพ์อะไรอีก
+ORPHAN = [sys.executable, "-c", (
+    "import subprocess, sys\n"
+    "p = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(60)'])\n"
+    "print(p.pid, flush=True)\n"
+)]
+
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except OSError:
+        return False
+    try:  # zombie ที่ init ยังไม่เก็บนับว่าตายแล้ว
+        with open(f"/proc/{pid}/stat") as f:
+            return f.read().rsplit(")", 1)[1].split()[0] != "Z"
+    except OSError:
+        return True
+
+
+def test_timeout_kills_with_rc_124():
+    t0 = time.monotonic()
+    rc, out, err = L.run_cmd(SLEEP, timeout=0.5)
+    assert rc == L.RC_TIMEOUT
+    assert "timeout" in err
+    assert time.monotonic() - t0 < 10
+
+
+@pytest.mark.skipif(os.name == "nt", reason="ตรวจ pid ผ่าน signal 0 / /proc")
+def test_idle_hang_kills_orphaned_tree_with_rc_124():
+    lines = []
+    t0 = time.monotonic()
+    rc, tail = L.run_cmd_stream(ORPHAN, on_line=lines.append, idle_timeout=1)
+    assert rc == L.RC_TIMEOUT
+    assert time.monotonic() - t0 < 15
+    assert "no output" in tail[-1]
+    grandchild = int(lines[0])
+    deadline = time.monotonic() + 5
+    while _alive(grandchild) and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert not _alive(grandchild)
+
+
+def test_cancel_scope_kills_with_rc_130():
+    cancel = threading.Event()
+    threading.Timer(0.3, cancel.set).start()
+    t0 = time.monotonic()
+    with L.cancel_scope(cancel):
+        rc, tail = L.run_cmd_stream(SLEEP)
+    assert rc == L.RC_CANCELLED
+    assert time.monotonic() - t0 < 10
+
+
+def test_cancel_only_hits_its_own_scope():
+    fg, bg = threading.Event(), threading.Event()
+    out = {}
+    def run(name, event):
+        with L.cancel_scope(event):
+            out[name] = L.run_cmd_stream([sys.executable, "-c", "import time; time.sleep(1.5)"])[0]
+    ts = [threading.Thread(target=run, args=a) for a in (("fg", fg), ("bg", bg))]
+    for t in ts: t.start()
+    time.sleep(0.3)
+    fg.set()
+    for t in ts: t.join(15)
+    assert out == {"fg": L.RC_CANCELLED, "bg": 0}
@@ -0,0 +1,68 @@
+import sys, time, threading
+
+import pytest
+
+import RNDLauncher as L
+
+
+@pytest.fixture
+def graph():
+    g = L.TaskGraph()
+    yield g
+    g.cancel()
+    g.wait(timeout=10)
+    g.shutdown()
+
+
+def test_runs_in_dependency_order(graph):
+    spans, lock = {}, threading.Lock()
+    def step(n):
+        t0 = time.perf_counter()
+        time.sleep(0.05)
+        with lock:
+            spans[n.name] = (t0, time.perf_counter())
+        return n.name
+    graph.add("a", step)
+    graph.add("b", step, deps=["a"])
+    graph.add("c", step, deps=["a"])
+    graph.add("d", step, deps=["b", "c"])
+    assert graph.wait()
+    assert spans["b"][0] >= spans["a"][1] and spans["c"][0] >= spans["a"][1]
+    assert spans["d"][0] >= max(spans["b"][1], spans["c"][1])
+    assert spans["c"][0] < spans["b"][1]  # b กับ c ไม่ขึ้นต่อกัน -> รันพร้อมกัน
+    assert [n for n, st, _ in graph.timings()] == ["a", "b", "c", "d"]
+    assert graph.result("d") == "d"
+
+
+def test_failure_skips_dependents(graph):
+    graph.add("a", lambda n: False)
+    graph.add("b", lambda n: True, deps=["a"])
+    graph.add("c", lambda n: True)
+    assert not graph.wait(["b"])
+    assert graph.wait(["c"])
+    assert graph.nodes["a"].status == "failed"
+    assert graph.nodes["b"].status == "skipped"
+
+
+def test_cancel_kills_running_command_and_dependents(graph):
+    started = threading.Event()
+    def slow(n):
+        started.set()
+        return L.run_cmd_stream([sys.executable, "-c", "import time; time.sleep(60)"])[0] == 0
+    graph.add("slow", slow)
+    graph.add("after", lambda n: True, deps=["slow"])
+    assert started.wait(10)
+    t0 = time.monotonic()
+    graph.cancel()
+    assert graph.wait(timeout=10) is False
+    assert time.monotonic() - t0 < 10
+    assert graph.nodes["slow"].status == "cancelled"
+    assert graph.nodes["after"].status == "cancelled"
+
+
+def test_unknown_dependency_is_rejected(graph):
+    graph.add("a", lambda n: True)
+    with pytest.raises(ValueError):
+        graph.add("b", lambda n: True, deps=["a", "typo"])
+    assert "b" not in graph.nodes
+    assert graph.wait(timeout=10)
@@ -0,0 +1,75 @@
+import os, json
+
+import pytest
+
+import RNDLauncher as L
+
+
+def _touch(root, rel):
+    path = os.path.join(str(root), *rel.split("/"))
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    open(path, "w").close()
+    return path
+
+
+@pytest.fixture(autouse=True)
+def _fresh_cache():
+    L._tool_cache.clear()
+    yield
+    L._tool_cache.clear()
+
+
+def _no_walk(*args, **kwargs):
+    raise AssertionError("ไม่ควรต้อง walk")
+
+
+def test_known_location_is_probed_before_walking(tmp_path, monkeypatch):
+    ubt = _touch(tmp_path, "Engine/Binaries/DotNET/UnrealBuildTool/UnrealBuildTool.exe")
+    editor = _touch(tmp_path, "Engine/Binaries/Win64/UnrealEditor.exe")
+    _touch(tmp_path, "Engine/Binaries/DotNET/AutomationTool/UnrealBuildTool.exe")
+    monkeypatch.setattr(L, "find_tool_walk", _no_walk)
+    assert L.autodetect_tools(str(tmp_path)) == (ubt, editor)
+
+
+def test_pruned_walk_finds_nonstandard_layout(tmp_path):
+    ubt = _touch(tmp_path, "Engine/Binaries/DotNET/net8/UnrealBuildTool.exe")
+    editor = _touch(tmp_path, "Engine/Binaries/Custom/Win64/UnrealEditor.exe")
+    _touch(tmp_path, "Engine/Content/Win64/UnrealEditor.exe")         # โฟลเดอร์ที่ถูกตัดทิ้ง
+    _touch(tmp_path, "Engine/Binaries/A/UnrealEditor.exe")            # parent ไม่ใช่ Win64
+    _touch(tmp_path, "Engine/Binaries/DotNET/a/b/c/d/e/UnrealBuildTool.exe")  # ลึกเกิน depth
+    assert L.autodetect_tools(str(tmp_path)) == (ubt, editor)
+    assert L.find_tool_walk(str(tmp_path / "Engine"), "UnrealEditor.exe", 6, "win64") == editor
+
+
+def test_cache_hit_until_binaries_change(tmp_path, monkeypatch):
+    ubt = _touch(tmp_path, "Engine/Binaries/DotNET/net8/UnrealBuildTool.exe")
+    os.makedirs(str(tmp_path / "Engine/Binaries/Win64"))
+    assert L.autodetect_tools(str(tmp_path)) == (ubt, None)
+    with monkeypatch.context() as m:
+        m.setattr(L, "discover_tool", _no_walk)
+        assert L.autodetect_tools(str(tmp_path)) == (ubt, None)  # stamp เดิม -> ใช้ cache
+    editor = _touch(tmp_path, "Engine/Binaries/Win64/UnrealEditor.exe")  # mtime ของ Win64 เปลี่ยน
+    assert L.autodetect_tools(str(tmp_path)) == (ubt, editor)
+    os.remove(ubt)  # binary ที่ cache ไว้หายไป -> ค้นใหม่
+    assert L.autodetect_tools(str(tmp_path)) == (None, editor)
+
+
+def test_many_installs_at_once(tmp_path):
+    a, b, missing = (str(tmp_path / n) for n in ("UE_5.3", "UE_5.4", "UE_none"))
+    ubt_a = _touch(a, "Engine/Binaries/DotNET/UnrealBuildTool.exe")
+    ubt_b = _touch(b, "Engine/Binaries/DotNET/net8/UnrealBuildTool.exe")
+    found = L.autodetect_tools_many([a, b, a, "", missing])
+    assert found == {a: (ubt_a, None), b: (ubt_b, None), missing: (None, None)}
+
+
+def test_cli_tools_registers_engines(tmp_path, capsys, monkeypatch):
+    monkeypatch.setattr(L, "CONFIG_FILE", L.CONFIG_FILE)  # cli_main เปลี่ยน global ตาม --config
+    a, b = str(tmp_path / "UE_5.3"), str(tmp_path / "UE_5.4")
+    ubt_a = _touch(a, "Engine/Binaries/DotNET/UnrealBuildTool.exe")
+    _touch(b, "Engine/Binaries/Win64/UnrealEditor.exe")
+    cfg = str(tmp_path / "cfg.json")
+    rc = L.cli_main(["--config", cfg, "tools", "--engine", a, "--engine", b, "--register", "--json"])
+    assert rc == 1  # UE_5.4 ไม่มี UBT
+    assert json.loads(capsys.readouterr().out)[a]["ubt"] == ubt_a
+    assert L.load_json_file(cfg, {})["engines"] == [a, b]
+    assert L.cli_main(["--config", cfg, "tools", "--engine", a]) == 0
@@ -0,0 +1,38 @@
+import sys, threading
+
+import RNDLauncher as L
+
+PY = [sys.executable, "-c", "pass"]
+
+
+def _cmd_events(tracer):
+    return [e for e in tracer.events if e["cat"] == "cmd"]
+
+
+def test_command_on_other_thread_not_recorded():
+    tracer = L.begin_trace("open")
+    try:
+        t = threading.Thread(target=L.run_cmd, args=(PY,))
+        t.start(); t.join()
+        assert _cmd_events(tracer) == []
+        L.run_cmd(PY)
+        assert len(_cmd_events(tracer)) == 1
+    finally:
+        L.end_trace(tracer)
+
+
+def test_scoped_and_task_graph_propagate_trace():
+    tracer = L.begin_trace("open")
+    try:
+        t = threading.Thread(target=L.scoped(L.run_cmd), args=(PY,))
+        t.start(); t.join()
+        g = L.TaskGraph()
+        g.add("a", lambda n: L.run_cmd(PY)[0] == 0)
+        assert g.wait()
+        g.shutdown()
+        names = [(e["cat"], e["name"]) for e in tracer.events]
+        assert names.count(("cmd", L._cmd_name(PY))) == 2
+        assert ("node", "a") in names
+    finally:
+        L.end_trace(tracer)
+    assert L.current_tracer() is None